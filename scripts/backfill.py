@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Backfill Script for LV Project
+Parses and normalizes many CSV snapshots in parallel, then loads them through a
+single ordered loader
+"""
+
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from csv_normalize import normalize_frame
+from migrate_csv_data import CSVDataMigrator
+from weekly_update import get_csv_files
+
+
+def load_normalized_file(csv_file):
+    """Parse and normalize one CSV file (runs in a worker process)"""
+    return normalize_frame(pd.read_csv(csv_file, dtype=str))
+
+
+def resolve_conflicts(frames):
+    """Merge per-file frames, keeping each item number from the newest file that has it
+
+    frames must be ordered oldest to newest. Rows of the winning file are kept in
+    their original order, so the result does not depend on worker scheduling.
+    """
+    merged = pd.concat(
+        [df.assign(file_rank=rank) for rank, df in enumerate(frames)],
+        ignore_index=True
+    )
+    newest = merged.groupby('item_number', dropna=False)['file_rank'].transform('max')
+    merged = merged[merged['file_rank'] == newest]
+
+    return merged.drop(columns='file_rank').reset_index(drop=True)
+
+
+def main(inputs_dir="data/inputs", workers=None, incremental=False):
+    """Main backfill process"""
+    print("📚 LV Project Backfill")
+    print("=" * 50)
+
+    csv_files = get_csv_files(inputs_dir)
+    if not csv_files:
+        print(f"❌ No CSV files found in {inputs_dir}")
+        return False
+
+    print(f"📁 Found {len(csv_files)} CSV files")
+
+    # Parse and normalize every file in parallel; map() keeps oldest-to-newest order
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        frames = list(executor.map(load_normalized_file, csv_files))
+
+    for csv_file, df in zip(csv_files, frames):
+        print(f"  ✅ {os.path.basename(csv_file)}: {len(df)} records")
+
+    merged = resolve_conflicts(frames)
+    print(f"📊 {len(merged)} records after resolving item_inventory_number conflicts")
+
+    # One ordered loader for the merged snapshot
+    migrator = CSVDataMigrator(inputs_dir, bulk=True, incremental=incremental)
+    migrator.df = merged
+    success = migrator.run_migration()
+
+    if success:
+        print("\n✅ Backfill completed successfully!")
+    else:
+        print("\n❌ Backfill failed!")
+
+    return success
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Backfill the database from every CSV in a directory"
+    )
+    parser.add_argument("--inputs-dir", default="data/inputs")
+    parser.add_argument(
+        "--workers", type=int,
+        help="Worker processes for parsing (defaults to the number of CPUs)"
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Apply only changes against the previous load instead of reloading"
+    )
+    args = parser.parse_args()
+
+    success = main(
+        inputs_dir=args.inputs_dir, workers=args.workers,
+        incremental=args.incremental
+    )
+    sys.exit(0 if success else 1)
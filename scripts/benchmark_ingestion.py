@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Ingestion throughput benchmark for LV Project
+Runs the CSV migrators against synthetic Platform Luxx files and reports rows/sec
+and peak RSS for each stage (parse, normalize, keys, load)
+
+The database stages wipe products, inventory, sales, brands and sellers, so they only
+run against a database named explicitly with --db-name.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+from datetime import datetime
+
+import pandas as pd
+
+from csv_normalize import normalize_frame
+from generate_synthetic_data import write_synthetic_csv
+from migrate_csv_data import CSVDataMigrator
+import simple_csv_migrate
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+TARGETS = ['csv-bulk', 'csv-rows', 'simple-bulk', 'simple-rows']
+
+
+def reset_peak_rss():
+    """Reset the process high-water mark so the next reading covers one stage
+
+    Only Linux supports this.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """Peak resident set size in MB, from VmHWM when available, else getrusage"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class StageTimer:
+    """Collects one result per (target, size, stage)"""
+
+    def __init__(self, verbose=False):
+        self.results = []
+        self.verbose = verbose
+
+    @contextlib.contextmanager
+    def stage(self, target, size, name):
+        """Time a stage, silencing migrator output unless verbose"""
+        reset_peak_rss()
+        started = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            if not self.verbose:
+                devnull = stack.enter_context(open(os.devnull, 'w'))
+                stack.enter_context(contextlib.redirect_stdout(devnull))
+            yield
+        seconds = time.perf_counter() - started
+
+        result = {
+            'target': target,
+            'rows': size,
+            'stage': name,
+            'seconds': round(seconds, 3),
+            'rows_per_sec': round(size / seconds) if seconds > 0 else None,
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        }
+        self.results.append(result)
+        print(f"  {target:<12} {size:>9,} {name:<10} {result['seconds']:>9.2f}s "
+              f"{result['rows_per_sec'] or 0:>12,} rows/s "
+              f"{result['peak_rss_mb']:>9.1f} MB")
+
+
+def benchmark_csv_migrator(timer, csv_file, size, bulk, use_db):
+    """Stage-by-stage run of CSVDataMigrator (row batches or COPY)"""
+    target = 'csv-bulk' if bulk else 'csv-rows'
+    migrator = CSVDataMigrator(csv_file, bulk=bulk)
+
+    with timer.stage(target, size, 'parse'):
+        raw = pd.read_csv(csv_file, dtype=str)
+    with timer.stage(target, size, 'normalize'):
+        migrator.df = normalize_frame(raw)
+    del raw
+
+    if not use_db:
+        return
+
+    if not migrator.connect_db():
+        raise RuntimeError("Database connection failed")
+    try:
+        # Clearing the previous run is setup, not part of any stage
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            migrator.prepare_run()
+
+        with timer.stage(target, size, 'keys'):
+            migrator.migrate_sellers()
+            migrator.migrate_brands()
+        with timer.stage(target, size, 'load'):
+            if bulk:
+                migrator.bulk_load()
+            else:
+                migrator.migrate_products()
+                migrator.migrate_inventory()
+                migrator.migrate_sales()
+    finally:
+        migrator.connection.close()
+
+
+def benchmark_simple_migrate(timer, csv_file, size, bulk):
+    """End-to-end run of simple_csv_migrate, which does not expose separate stages"""
+    target = 'simple-bulk' if bulk else 'simple-rows'
+    with timer.stage(target, size, 'total'):
+        if not simple_csv_migrate.main(bulk=bulk, csv_file=csv_file):
+            raise RuntimeError("simple_csv_migrate did not complete")
+
+
+def main(sizes=None, targets=None, data_dir='data/synthetic', db_name=None,
+         regenerate=False, output=None, verbose=False):
+    """Generate synthetic files as needed and benchmark each target at each size"""
+    print("⏱️  LV Project Ingestion Benchmark")
+    print("=" * 50)
+
+    sizes = sizes or DEFAULT_SIZES
+    targets = targets or ['csv-bulk', 'csv-rows', 'simple-bulk']
+
+    use_db = db_name is not None
+    if use_db:
+        # Point both migrators at the benchmark database;
+        # DATABASE_URL would take precedence
+        os.environ.pop('DATABASE_URL', None)
+        os.environ['POSTGRES_DB'] = db_name
+        print(f"⚠️  Benchmark database '{db_name}' will be cleared before each run")
+    else:
+        print("ℹ️  No --db-name given; measuring parse and normalize only")
+        targets = [t for t in targets if t.startswith('csv-')][:1]
+
+    if not reset_peak_rss():
+        print("ℹ️  Peak RSS cannot be reset on this platform; "
+              "values are cumulative maxima")
+
+    timer = StageTimer(verbose=verbose)
+    for size in sizes:
+        csv_file = os.path.join(data_dir, f'platform_luxx_synthetic_{size}.csv')
+        if regenerate or not os.path.exists(csv_file):
+            print(f"\n🧪 Generating {size:,} synthetic rows...")
+            csv_file = write_synthetic_csv(size, data_dir)
+
+        print(f"\n📁 {csv_file}")
+        for target in targets:
+            try:
+                if target.startswith('csv-'):
+                    benchmark_csv_migrator(
+                        timer, csv_file, size, target == 'csv-bulk', use_db
+                    )
+                else:
+                    benchmark_simple_migrate(
+                        timer, csv_file, size, target == 'simple-bulk'
+                    )
+            except Exception as e:
+                print(f"❌ {target} failed at {size:,} rows: {e}")
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(),
+                'database': db_name,
+                'results': timer.results,
+            }, f, indent=2)
+        print(f"\n💾 Results saved to {output}")
+
+    return timer.results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark CSV ingestion throughput")
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=DEFAULT_SIZES,
+        help="Synthetic file sizes"
+    )
+    parser.add_argument(
+        "--targets", nargs="+", choices=TARGETS,
+        help="Loaders to benchmark (default: csv-bulk csv-rows simple-bulk)"
+    )
+    parser.add_argument(
+        "--data-dir", default="data/synthetic", help="Where synthetic files are kept"
+    )
+    parser.add_argument(
+        "--db-name",
+        help="Scratch Postgres database for the keys and load stages "
+             "(its data is deleted)"
+    )
+    parser.add_argument(
+        "--regenerate", action="store_true",
+        help="Rewrite synthetic files even if present"
+    )
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--verbose", action="store_true", help="Show migrator output")
+    args = parser.parse_args()
+
+    main(sizes=args.rows, targets=args.targets, data_dir=args.data_dir,
+         db_name=args.db_name, regenerate=args.regenerate, output=args.output,
+         verbose=args.verbose)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for the LV Project API list routes
+Compares FastAPI's default path (validate rows against response_model, then encode
+with the standard JSON encoder) with TrustedJSONResponse on large row sets
+"""
+
+import os
+import sys
+import time
+import uuid
+import argparse
+from decimal import Decimal
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+# The backend is a single module in src/backend
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/backend'))
+
+import main  # noqa: E402
+from main import Inventory, Product, Sale, TrustedJSONResponse  # noqa: E402
+
+
+def product_rows(count):
+    """Rows shaped like the /api/products query result"""
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "item_inventory_number": str(i),
+            "name": f"Louis Vuitton Speedy {i}",
+            "description": "Louis Vuitton Speedy Quality: Excellent",
+            "brand_id": str(uuid.uuid4()),
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+def inventory_rows(count):
+    """Rows shaped like inventory records, with DECIMAL money columns"""
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "product_id": str(uuid.uuid4()),
+            "quantity": 1,
+            "purchase_price": Decimal("120.02"),
+            "goal_earnings": None,
+            "floor_earnings": None,
+            "need_to_make": None,
+            "list_price": Decimal("249.00"),
+            "purchase_date": now.date(),
+            "is_listed": True,
+            "notes": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for _ in range(count)
+    ]
+
+
+def sale_rows(count):
+    """Rows shaped like sales records, with DECIMAL money columns"""
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "product_id": str(uuid.uuid4()),
+            "quantity_sold": 1,
+            "sell_price": Decimal("45.00"),
+            "gross_amount_earned": Decimal("39.83"),
+            "net_profit_loss": Decimal("-9.21"),
+            "percent_profit": Decimal("-19.00"),
+            "date_sold": now,
+            "days_held": 52,
+            "comps": None,
+            "notes": None,
+            "created_at": now,
+        }
+        for _ in range(count)
+    ]
+
+
+def validated_body(adapter, rows):
+    """What FastAPI does for a response_model: validate, dump to JSON, json.dumps"""
+    content = adapter.dump_python(adapter.validate_python(rows), mode="json")
+    return JSONResponse(content).body
+
+
+def trusted_body(rows):
+    """The trusted path: encode the rows as they are"""
+    return TrustedJSONResponse(rows).body
+
+
+def best_time(func, repeat):
+    """Fastest of repeat runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main_benchmark(rows=10000, repeat=5):
+    """Time both paths for products, inventory and sales"""
+    print("⏱️  LV Project Serialization Benchmark")
+    print("=" * 50)
+    print(f"📊 {rows:,} rows per response, best of {repeat}; encoder: "
+          f"{'orjson' if main.orjson is not None else 'json (orjson not installed)'}\n")
+
+    cases = [
+        ("products", Product, product_rows(rows)),
+        ("inventory", Inventory, inventory_rows(rows)),
+        ("sales", Sale, sale_rows(rows)),
+    ]
+
+    results = []
+    for name, model, data in cases:
+        adapter = TypeAdapter(List[model])
+        validated = best_time(lambda: validated_body(adapter, data), repeat)
+        trusted = best_time(lambda: trusted_body(data), repeat)
+        results.append((name, validated, trusted))
+        print(f"  {name:<10} validated {validated * 1000:>8.1f} ms   "
+              f"trusted {trusted * 1000:>8.1f} ms   "
+              f"{validated / trusted:>5.1f}x faster")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark list response serialization"
+    )
+    parser.add_argument("--rows", type=int, default=10000, help="Rows per response")
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Runs per measurement (best is reported)"
+    )
+    args = parser.parse_args()
+
+    main_benchmark(rows=args.rows, repeat=args.repeat)
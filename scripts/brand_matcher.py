@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Brand matcher for product names
+Compiles every brand name and alias into one trie-shaped regex, so a name is scanned
+once no matter how many brands there are, and the longest brand wins
+("Christian Dior" over "Dior")
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Brands recognised in "Brand + Product Name"
+KNOWN_BRANDS = [
+    'Louis Vuitton', 'Chanel', 'Gucci', 'Prada', 'Hermès', 'Fendi', 'Bottega Veneta',
+    'Saint Laurent', 'Balenciaga', 'Celine', 'Dior', 'Christian Dior', 'Givenchy',
+    'Chloé',
+    'Tory Burch', 'MCM', 'Furla', 'Badgley Mischka', 'DKNY', 'Valentino',
+    'Morroccan Oil', 'Disney', 'Tiffany', 'Ferragamo'
+]
+
+# Alternate spellings and abbreviations mapped to the canonical brand
+BRAND_ALIASES = {
+    'YSL': 'Saint Laurent',
+    'Yves Saint Laurent': 'Saint Laurent',
+    'Chloe': 'Chloé',
+    'Hermes': 'Hermès',
+}
+
+
+def _trie_pattern(node):
+    """Render a character trie as a regex
+
+    Optional tails are greedy, so longer names win.
+    """
+    ends_here = '' in node
+    branches = [
+        re.escape(char) + _trie_pattern(child)
+        for char, child in sorted(node.items()) if char
+    ]
+    if not branches:
+        return ''
+    if len(branches) == 1 and not ends_here:
+        return branches[0]
+    group = '(?:' + '|'.join(branches) + ')'
+    return group + '?' if ends_here else group
+
+
+def compile_brand_pattern(names):
+    """Compile names into a single whole-word regex over casefolded text"""
+    trie = {}
+    for name in names:
+        node = trie
+        for char in name:
+            node = node.setdefault(char, {})
+        node[''] = True
+    return re.compile(r'(?<!\w)(' + _trie_pattern(trie) + r')(?!\w)')
+
+
+class BrandMatcher:
+    """Find the brand in product names, one name at a time or a whole column at once"""
+
+    def __init__(self, brands=KNOWN_BRANDS, aliases=BRAND_ALIASES,
+                 guess_first_word=False, cache_size=100000):
+        # Casefolded spelling -> canonical brand; duplicates collapse here
+        self.lookup = {brand.casefold(): brand for brand in brands}
+        self.lookup.update(
+            {alias.casefold(): brand for alias, brand in aliases.items()}
+        )
+        self.pattern = compile_brand_pattern(self.lookup)
+        self.guess_first_word = guess_first_word
+        # Catalogs repeat names heavily, so remember recent answers
+        self.match = lru_cache(maxsize=cache_size)(self._match)
+
+    def _match(self, product_name):
+        """Canonical brand for one product name, or None"""
+        if not isinstance(product_name, str) or not product_name.strip():
+            return None
+
+        found = self.pattern.search(product_name.casefold())
+        if found:
+            return self.lookup[found.group(1)]
+
+        if self.guess_first_word:
+            # Unknown brand: fall back to a capitalised first word
+            words = product_name.split()
+            if words and len(words[0]) > 2 and words[0][0].isupper():
+                return words[0]
+
+        return None
+
+    def match_column(self, names):
+        """Brands for a whole Series; each distinct name is matched once"""
+        codes, uniques = pd.factorize(names)
+        # Missing names have code -1, which picks the trailing None
+        brands = np.array([self.match(name) for name in uniques] + [None], dtype=object)
+        return pd.Series(brands[codes], index=names.index, dtype=object)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Bulk loader for CSV migrations
+Streams prepared rows into unlogged staging tables with COPY FROM STDIN and
+merges them into the schema_v2 tables with set-based SQL
+"""
+
+import csv
+import io
+
+# Staging tables mirror the prepared row layout; seq keeps CSV order for de-duplication
+STAGING_TABLES = {
+    'staging_products': """
+        seq BIGSERIAL,
+        item_inventory_number VARCHAR(50),
+        name VARCHAR(255),
+        description TEXT,
+        brand VARCHAR(100)
+    """,
+    'staging_inventory': """
+        seq BIGSERIAL,
+        item_inventory_number VARCHAR(50),
+        quantity INTEGER,
+        purchase_price DECIMAL(10,2),
+        list_price DECIMAL(10,2),
+        is_listed BOOLEAN,
+        purchase_date DATE
+    """,
+    'staging_sales': """
+        seq BIGSERIAL,
+        item_inventory_number VARCHAR(50),
+        quantity_sold INTEGER,
+        sell_price DECIMAL(10,2),
+        gross_amount_earned DECIMAL(10,2),
+        net_profit_loss DECIMAL(10,2),
+        percent_profit DECIMAL(5,2),
+        date_sold DATE,
+        days_held INTEGER
+    """,
+}
+
+PRODUCT_COLUMNS = ['item_inventory_number', 'name', 'description', 'brand']
+INVENTORY_COLUMNS = [
+    'item_inventory_number', 'quantity', 'purchase_price', 'list_price', 'is_listed',
+    'purchase_date'
+]
+SALES_COLUMNS = [
+    'item_inventory_number', 'quantity_sold', 'sell_price', 'gross_amount_earned',
+    'net_profit_loss', 'percent_profit', 'date_sold', 'days_held'
+]
+
+
+class _RowStream(io.TextIOBase):
+    """File-like adapter that renders rows as CSV lines on demand for COPY"""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = ''
+        self._line = io.StringIO()
+        self._writer = csv.writer(self._line, lineterminator='\n')
+
+    def _render(self, row):
+        self._line.seek(0)
+        self._line.truncate()
+        # None becomes an unquoted empty field, which COPY reads as NULL
+        self._writer.writerow(['' if value is None else value for value in row])
+        return self._line.getvalue()
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += self._render(next(self._rows))
+            except StopIteration:
+                break
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+
+class BulkLoader:
+    """COPY-based loader for products, inventory and sales"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def prepare_staging(self):
+        """Create empty unlogged staging tables
+
+        They are recreated on every load so tables left by an older loader version
+        always get the current columns.
+        """
+        cursor = self.connection.cursor()
+        for table, columns in STAGING_TABLES.items():
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            cursor.execute(f"CREATE UNLOGGED TABLE {table} ({columns})")
+        cursor.close()
+
+    def copy_rows(self, table, columns, rows):
+        """Stream rows into a staging table with COPY FROM STDIN"""
+        cursor = self.connection.cursor()
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            _RowStream(rows)
+        )
+        copied = cursor.rowcount
+        cursor.close()
+        return copied
+
+    def merge_products(self, keep_existing=False):
+        """Upsert staged products, resolving brand names to ids in the same statement
+
+        The first staged row of each item number wins. With keep_existing, products
+        already in the table are left alone, so a file loaded in chunks keeps the
+        same (first) row as one loaded whole.
+        """
+        if keep_existing:
+            on_conflict = "DO NOTHING"
+        else:
+            on_conflict = """DO UPDATE
+            SET name = EXCLUDED.name,
+                description = EXCLUDED.description,
+                brand_id = EXCLUDED.brand_id"""
+        cursor = self.connection.cursor()
+        cursor.execute(f"""
+            INSERT INTO products (item_inventory_number, name, description, brand_id)
+            SELECT DISTINCT ON (s.item_inventory_number)
+                   s.item_inventory_number, s.name, s.description, b.id
+            FROM staging_products s
+            LEFT JOIN brands b ON b.name = s.brand
+            ORDER BY s.item_inventory_number, s.seq
+            ON CONFLICT (item_inventory_number) {on_conflict}
+        """)
+        merged = cursor.rowcount
+        cursor.close()
+        return merged
+
+    def merge_inventory(self):
+        """Insert staged inventory rows joined to their products"""
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            INSERT INTO inventory (
+                product_id, quantity, purchase_price, list_price, is_listed,
+                purchase_date
+            )
+            SELECT p.id, s.quantity, s.purchase_price, s.list_price, s.is_listed,
+                   s.purchase_date
+            FROM staging_inventory s
+            JOIN products p ON p.item_inventory_number = s.item_inventory_number
+            ORDER BY s.seq
+        """)
+        merged = cursor.rowcount
+        cursor.close()
+        return merged
+
+    def merge_sales(self):
+        """Insert staged sales rows joined to their products"""
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            INSERT INTO sales
+                (product_id, quantity_sold, sell_price, gross_amount_earned,
+                 net_profit_loss, percent_profit, date_sold, days_held)
+            SELECT p.id, s.quantity_sold, s.sell_price, s.gross_amount_earned,
+                   s.net_profit_loss, s.percent_profit, s.date_sold, s.days_held
+            FROM staging_sales s
+            JOIN products p ON p.item_inventory_number = s.item_inventory_number
+            ORDER BY s.seq
+        """)
+        merged = cursor.rowcount
+        cursor.close()
+        return merged
+
+    def load(self, products=(), inventory=(), sales=(), commit=True,
+             keep_existing=False):
+        """Stage and merge all three entities in one transaction; returns merged counts
+
+        With commit=False the caller owns the transaction (and the rollback).
+        keep_existing is passed to merge_products.
+        """
+        try:
+            self.prepare_staging()
+            self.copy_rows('staging_products', PRODUCT_COLUMNS, products)
+            self.copy_rows('staging_inventory', INVENTORY_COLUMNS, inventory)
+            self.copy_rows('staging_sales', SALES_COLUMNS, sales)
+
+            counts = {
+                'products': self.merge_products(keep_existing),
+                'inventory': self.merge_inventory(),
+                'sales': self.merge_sales(),
+            }
+            if commit:
+                self.connection.commit()
+            return counts
+        except Exception:
+            if commit:
+                self.connection.rollback()
+            raise
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Checkpoints for resumable CSV migrations
+Each stage records a durable watermark (rows committed so far) in the same
+transaction as the batch it covers, and batch sizes can adapt to commit latency
+"""
+
+import os
+import time
+
+
+class CheckpointStore:
+    """Per-source, per-stage watermarks stored in ingest_checkpoints"""
+
+    def __init__(self, connection, source):
+        self.connection = connection
+        self.source = os.path.abspath(source) if source else ''
+
+    def ensure_table(self):
+        """Create the checkpoint table if it is missing"""
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+                source VARCHAR(500) NOT NULL,
+                stage VARCHAR(50) NOT NULL,
+                watermark BIGINT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (source, stage)
+            )
+        """)
+        self.connection.commit()
+        cursor.close()
+
+    def load(self):
+        """Return {stage: watermark} for this source"""
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "SELECT stage, watermark FROM ingest_checkpoints WHERE source = %s",
+            (self.source,)
+        )
+        watermarks = dict(cursor.fetchall())
+        cursor.close()
+        return watermarks
+
+    def save(self, cursor, stage, watermark):
+        """Record a watermark inside the caller's transaction
+
+        It is committed together with the batch.
+        """
+        cursor.execute("""
+            INSERT INTO ingest_checkpoints (source, stage, watermark)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (source, stage) DO UPDATE
+            SET watermark = EXCLUDED.watermark, updated_at = CURRENT_TIMESTAMP
+        """, (self.source, stage, watermark))
+
+    def clear(self):
+        """Forget every watermark for this source (fresh start or finished run)"""
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "DELETE FROM ingest_checkpoints WHERE source = %s", (self.source,)
+        )
+        self.connection.commit()
+        cursor.close()
+
+
+class BatchSizer:
+    """Batch size that is fixed or adapts to keep each commit near a target time"""
+
+    def __init__(self, size=1000, adaptive=False, target_seconds=1.0, minimum=100,
+                 maximum=50000):
+        self.size = size
+        self.adaptive = adaptive
+        self.target_seconds = target_seconds
+        self.minimum = minimum
+        self.maximum = maximum
+        self._started = None
+
+    def start(self):
+        """Mark the start of a batch"""
+        self._started = time.perf_counter()
+
+    def finish(self, rows):
+        """Record a committed batch of rows and adjust the size for the next one"""
+        elapsed = (
+            time.perf_counter() - self._started if self._started is not None else 0
+        )
+        if self.adaptive and rows and elapsed > 0:
+            # Scale toward the target, at most doubling or halving per batch
+            scale = min(2.0, max(0.5, self.target_seconds / elapsed))
+            self.size = int(min(self.maximum, max(self.minimum, self.size * scale)))
+        self._started = None
+        return self.size
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Vectorized column normalization for Platform Luxx CSV exports
+Turns whole columns of accounting-formatted text (' $ 120.02 ', ' $ -   ',
+' $ (9.21)', '11%', '5/9/2025', '  52.00 ') into typed arrays in one call
+"""
+
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+# Platform Luxx export headers mapped to the normalized column names
+CSV_COLUMNS = {
+    'Item Inventory #': 'item_number',
+    'Purchase_Date': 'purchase_date',
+    'seller': 'seller',
+    'Brand + Product Name': 'brand_product_name',
+    'Brand': 'brand',
+    'Product_Name': 'product_name',
+    'product description': 'description',
+    'Quality': 'quality',
+    'Purchase Price': 'purchase_price',
+    'List Price': 'list_price',
+    'Sell price': 'sell_price',
+    'Gross Amount Earned': 'gross_amount',
+    'Net Profit/Loss': 'net_profit',
+    'Percent Profit': 'percent_profit',
+    'Date Sold': 'date_sold',
+    'Days Held': 'days_held',
+}
+
+MONEY_COLUMNS = [
+    'purchase_price', 'list_price', 'sell_price', 'gross_amount', 'net_profit'
+]
+DATE_COLUMNS = ['purchase_date', 'date_sold']
+
+# Dates in the export are written as M/D/YYYY
+DATE_FORMAT = '%m/%d/%Y'
+
+
+def _clean_money_text(series):
+    """Strip currency decoration, returning (signed number text, valid mask)"""
+    text = series.astype('string').str.replace(r'[\s$,]', '', regex=True)
+    negative = text.str.startswith('(') & text.str.endswith(')')
+    text = text.str.strip('()')
+    text = text.where(~negative.fillna(False), '-' + text)
+    valid = pd.to_numeric(text, errors='coerce').notna()
+    return text, valid
+
+
+def parse_money_column(series, as_decimal=False):
+    """Parse a money column into float64 (NaN for blanks/dashes)
+
+    With as_decimal, returns Decimal objects and None instead.
+    """
+    text, valid = _clean_money_text(series)
+    if as_decimal:
+        decimals = text[valid].map(Decimal).reindex(series.index).astype(object)
+        return decimals.where(valid, None)
+    return pd.to_numeric(text, errors='coerce').astype('float64')
+
+
+def parse_percent_column(series, default=0.0):
+    """Parse '11%' / '-48%' style values into float64, using default for blanks"""
+    text = series.astype('string').str.replace(r'[\s%]', '', regex=True)
+    return pd.to_numeric(text, errors='coerce').fillna(default).astype('float64')
+
+
+def parse_date_column(series, date_format=DATE_FORMAT):
+    """Parse a date column with an explicit format into datetime64 (NaT when invalid)"""
+    return pd.to_datetime(
+        series.astype('string').str.strip(), format=date_format, errors='coerce'
+    )
+
+
+def parse_days_held_column(series):
+    """Parse '  52.00 ' style day counts into nullable integers
+
+    0 and blanks become NA.
+    """
+    values = pd.to_numeric(series.astype('string').str.strip(), errors='coerce')
+    return np.trunc(values.where(values != 0)).astype('Int64')
+
+
+def normalize_frame(df):
+    """Rename export headers, trim text and convert typed columns
+
+    Every step is a whole-column operation.
+    """
+    # Rename the export headers (some padded with spaces) to stable keys
+    df = df.rename(columns=lambda c: CSV_COLUMNS.get(c.strip(), c.strip()))
+
+    # Trim every cell and treat blanks as missing
+    df = df.apply(lambda column: column.astype('string').str.strip()).astype(object)
+    df = df.where(df.notna() & (df != ''), None)
+
+    for column in MONEY_COLUMNS:
+        if column in df:
+            df[column] = parse_money_column(df[column])
+    for column in DATE_COLUMNS:
+        if column in df:
+            df[column] = parse_date_column(df[column])
+    if 'percent_profit' in df:
+        df['percent_profit'] = parse_percent_column(df['percent_profit'])
+    if 'days_held' in df:
+        df['days_held'] = parse_days_held_column(df['days_held'])
+
+    return df
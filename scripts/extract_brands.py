@@ -6,8 +6,9 @@ Extract brands from Brand + Product Name column and update database
 import pandas as pd
 import psycopg2
 import os
-import re
 from dotenv import load_dotenv
+from key_maps import ensure_key_map
+from brand_matcher import BrandMatcher
 
 # Load environment variables
 load_dotenv()
@@ -22,36 +23,12 @@ def get_db_config():
         'port': int(os.getenv('DB_PORT', '5432'))
     }
 
+# Known brands first, then a capitalised first word for anything unrecognised
+brand_matcher = BrandMatcher(guess_first_word=True)
+
 def extract_brand_from_name(product_name):
     """Extract brand name from product name"""
-    if pd.isna(product_name) or not product_name:
-        return None
-    
-    # Common luxury brands to look for
-    luxury_brands = [
-        'Louis Vuitton', 'Chanel', 'Gucci', 'Prada', 'Hermès', 'Fendi', 'Bottega Veneta',
-        'Saint Laurent', 'YSL', 'Balenciaga', 'Celine', 'Dior', 'Givenchy', 'Chloé',
-        'Tory Burch', 'MCM', 'Furla', 'Badgley Mischka', 'DKNY', 'Valentino',
-        'Bottega Veneta', 'Balenciaga', 'Celine', 'Dior', 'Givenchy', 'Chloé',
-        'Morroccan Oil', 'Disney', 'Tiffany', 'Christian Dior', 'Ferragamo'
-    ]
-    
-    product_name = str(product_name).strip()
-    
-    # Check for exact brand matches
-    for brand in luxury_brands:
-        if brand.lower() in product_name.lower():
-            return brand
-    
-    # If no exact match, try to extract the first word as brand
-    words = product_name.split()
-    if words:
-        # Common patterns for brand names
-        potential_brand = words[0]
-        if len(potential_brand) > 2 and potential_brand[0].isupper():
-            return potential_brand
-    
-    return None
+    return brand_matcher.match(product_name)
 
 def main():
     """Main function to extract brands and update database"""
@@ -61,16 +38,11 @@ def main():
     csv_file = "/Users/makaminski1337/Developer/LV/data/inputs/Platform Luxx Base Data.csv"
     df = pd.read_csv(csv_file)
     
-    # Extract brands from product names
-    brands_found = set()
-    brand_mapping = {}
-    
-    for _, row in df.iterrows():
-        product_name = row['Brand + Product Name']
-        brand = extract_brand_from_name(product_name)
-        if brand:
-            brands_found.add(brand)
-            brand_mapping[row['Item Inventory #']] = brand
+    # Extract brands from the whole product name column at once
+    brands = brand_matcher.match_column(df['Brand + Product Name'])
+    found = brands.notna()
+    brand_mapping = dict(zip(df.loc[found, 'Item Inventory #'], brands[found]))
+    brands_found = set(brands[found])
     
     print(f"📊 Found {len(brands_found)} unique brands:")
     for brand in sorted(brands_found):
@@ -82,16 +54,14 @@ def main():
     
     # Insert brands
     print(f"\n💾 Inserting {len(brands_found)} brands into database...")
-    brands_inserted = 0
     
-    for brand in brands_found:
-        try:
-            cursor.execute("INSERT INTO brands (name, description) VALUES (%s, %s)", 
-                         (brand, f"Brand: {brand}"))
-            brands_inserted += 1
-        except Exception as e:
-            print(f"  ⚠️  Error inserting brand {brand}: {e}")
-            continue
+    # Existing brands are fetched once and new ones inserted in one statement
+    brand_ids, inserted = ensure_key_map(
+        cursor, 'brands', ['name', 'description'],
+        [(brand, f"Brand: {brand}") for brand in brands_found],
+        'name'
+    )
+    brands_inserted = len(inserted)
     
     conn.commit()
     print(f"✅ Inserted {brands_inserted} brands")
@@ -102,13 +72,9 @@ def main():
     
     for item_number, brand in brand_mapping.items():
         try:
-            # Get brand ID
-            cursor.execute("SELECT id FROM brands WHERE name = %s", (brand,))
-            brand_result = cursor.fetchone()
+            brand_id = brand_ids.get(brand)
             
-            if brand_result:
-                brand_id = brand_result[0]
-                
+            if brand_id:
                 # Update product
                 cursor.execute("UPDATE products SET brand_id = %s WHERE item_inventory_number = %s", 
                              (brand_id, str(item_number)))
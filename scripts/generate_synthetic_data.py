@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for ingestion and load benchmarks
+Writes CSV files in the Platform Luxx Base Data.csv format (same headers, accounting-
+formatted prices, blank sale fields for unsold items) at any row count, either generated
+from scratch or scaled up from a real export
+"""
+
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+HEADERS = [
+    'Item Inventory #', 'Purchase_Date', 'seller', 'Brand + Product Name', 'Brand',
+    'Product_Name', 'product description', ' Quality ', ' Purchase Price ',
+    ' List Price ', ' Sell price ', ' Gross Amount Earned ', ' Net Profit/Loss ',
+    'Percent Profit', 'Date Sold', 'Days Held'
+]
+
+BRANDS = [
+    'Louis Vuitton', 'Chanel', 'Gucci', 'Prada', 'Hermès', 'Fendi', 'Bottega Veneta',
+    'Saint Laurent', 'YSL', 'Balenciaga', 'Celine', 'Dior', 'Christian Dior',
+    'Givenchy', 'Chloé', 'Tory Burch', 'MCM', 'Furla', 'Badgley Mischka', 'DKNY',
+    'Valentino', 'Tiffany', 'Ferragamo', 'Coach', 'Kate Spade', 'Michael Kors',
+    'Bulgari', 'Burberry'
+]
+COLORS = [
+    'Black', 'Brown', 'Pink', 'Cream', 'Red', 'Navy', 'Green', 'White', 'Tan', 'Gold'
+]
+ITEMS = [
+    'Crossbody', 'Backpack', 'Wallet', 'Tote', 'Clutch', 'Shoulder Bag', 'Hobo',
+    'Key Pouch', 'Camera Bag', 'Card Holder', 'Belt Bag', 'Satchel'
+]
+DESCRIPTIONS = [
+    'SOLD AS IS.  NO CANCELLATION or RETURN. BID RESPONSIBLY THANK YOU',
+    '100% Authentic Guaranteed - Please listen to conditions and call outs.  '
+    'All sales are final.',
+    'No cancelations or returns.',
+    'Listen For the Callouts and Condition',
+    'Condition shown',
+    None,
+]
+SELLER_PREFIXES = [
+    'golden', 'kream', 'luxe', 'silhouette', 'house_of_', 'limitless', 'gold', 'cookie'
+]
+SELLER_SUFFIXES = [
+    'boutique', 'house', 'pawnership', 'closet', 'luxury', 'luxx', 'deals', 'paris'
+]
+
+
+def format_money(values):
+    """Format floats like the export: ' $ 120.02 ', ' $ (9.21)', ' $ -   ', or blank"""
+    def fmt(value):
+        if np.isnan(value):
+            return None
+        if round(value, 2) == 0:
+            return ' $ -   '
+        if value < 0:
+            return f' $ ({-value:,.2f})'
+        return f' $ {value:,.2f} '
+    return [fmt(value) for value in values]
+
+
+def format_dates(dates):
+    """Format datetimes as M/D/YYYY, blank for NaT"""
+    return [None if pd.isna(d) else f'{d.month}/{d.day}/{d.year}' for d in dates]
+
+
+def generate_frame(rows, seed=42, sold_ratio=0.6):
+    """Build a DataFrame of synthetic export rows"""
+    rng = np.random.default_rng(seed)
+
+    # Roughly one seller per 500 rows, at least 50
+    seller_count = max(50, rows // 500)
+    sellers = np.array([
+        SELLER_PREFIXES[i % len(SELLER_PREFIXES)]
+        + SELLER_SUFFIXES[(i // len(SELLER_PREFIXES)) % len(SELLER_SUFFIXES)]
+        + str(i)
+        for i in range(seller_count)
+    ])
+
+    brand = np.array(BRANDS)[rng.integers(0, len(BRANDS), rows)]
+    color = np.array(COLORS)[rng.integers(0, len(COLORS), rows)]
+    item = np.array(ITEMS)[rng.integers(0, len(ITEMS), rows)]
+    names = pd.Series(brand) + ' ' + pd.Series(color) + ' ' + pd.Series(item)
+
+    purchase_dates = pd.Timestamp('2023-01-01') + pd.to_timedelta(
+        rng.integers(0, 900, rows), unit='D'
+    )
+    purchase_price = np.round(rng.lognormal(4.3, 0.7, rows), 2)
+    list_price = np.where(
+        rng.random(rows) < 0.15,
+        np.round(purchase_price * rng.uniform(1.2, 3.0, rows)),
+        np.nan,
+    )
+
+    # Sold rows get a sell price, fees, profit/loss, percent, sale date, days held
+    sold = rng.random(rows) < sold_ratio
+    days_held = rng.integers(1, 180, rows)
+    sell_price = np.where(
+        sold, np.round(purchase_price * rng.uniform(0.3, 2.5, rows)), np.nan
+    )
+    gross = np.round(sell_price * 0.885, 2)
+    net = np.where(sold, np.round(gross - purchase_price, 2), 0.0)
+    percent = np.where(sold, np.round(net / purchase_price * 100), 0).astype(int)
+    date_sold = pd.Series(
+        purchase_dates + pd.to_timedelta(days_held, unit='D')
+    ).where(sold)
+
+    # The real export leaves Brand mostly blank; fill it for most rows so brand
+    # keys are exercised
+    brand_column = pd.Series(brand).where(rng.random(rows) < 0.7)
+
+    seller_column = sellers[rng.integers(0, seller_count, rows)]
+    descriptions = np.array(DESCRIPTIONS, dtype=object)[
+        rng.integers(0, len(DESCRIPTIONS), rows)
+    ]
+
+    return pd.DataFrame({
+        'Item Inventory #': np.arange(1, rows + 1),
+        'Purchase_Date': format_dates(purchase_dates),
+        'seller': seller_column,
+        'Brand + Product Name': names,
+        'Brand': brand_column,
+        'Product_Name': None,
+        'product description': descriptions,
+        ' Quality ': None,
+        ' Purchase Price ': format_money(purchase_price),
+        ' List Price ': format_money(list_price),
+        ' Sell price ': format_money(sell_price),
+        ' Gross Amount Earned ': format_money(gross),
+        ' Net Profit/Loss ': format_money(net),
+        'Percent Profit': [f'{p}%' for p in percent],
+        'Date Sold': format_dates(date_sold),
+        'Days Held': [f'  {d:.2f} ' for d in days_held],
+    }, columns=HEADERS)
+
+
+def scale_frame(source, rows):
+    """Repeat a real export's rows up to the given count, renumbering the items"""
+    repeats = -(-rows // len(source))
+    scaled = pd.concat([source] * repeats, ignore_index=True).iloc[:rows].copy()
+    scaled['Item Inventory #'] = np.arange(1, rows + 1)
+    return scaled
+
+
+def write_synthetic_csv(rows, output_dir='data/synthetic', seed=42, source=None):
+    """Write a synthetic CSV with the given row count, returning its path
+
+    With source (a Platform Luxx export), its rows are repeated instead of generated,
+    so the file keeps the real names, sellers and price distribution.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if source:
+        path = os.path.join(output_dir, f'platform_luxx_scaled_{rows}.csv')
+        scale_frame(pd.read_csv(source, dtype=str), rows).to_csv(path, index=False)
+    else:
+        path = os.path.join(output_dir, f'platform_luxx_synthetic_{rows}.csv')
+        generate_frame(rows, seed=seed).to_csv(path, index=False)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic Platform Luxx CSV exports"
+    )
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10000, 100000, 1000000]
+    )
+    parser.add_argument("--output-dir", default="data/synthetic")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--source", help="Scale up this Platform Luxx export instead of generating rows"
+    )
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        path = write_synthetic_csv(rows, args.output_dir, args.seed, args.source)
+        print(f"✅ Wrote {rows} rows to {path}")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Surrogate key maps for CSV migrations
+Resolve natural keys (seller username, brand name, item inventory number) to
+database ids with a constant number of queries per entity instead of one per row
+"""
+
+from psycopg2.extras import execute_values
+
+
+def fetch_key_map(cursor, table, key_column, keys=None):
+    """Map key_column -> id for a table (optionally limited to keys) in one query"""
+    if keys is None:
+        cursor.execute(f"SELECT {key_column}, id FROM {table}")
+    else:
+        cursor.execute(
+            f"SELECT {key_column}, id FROM {table} WHERE {key_column} = ANY(%s)",
+            (list(keys),)
+        )
+    return dict(cursor.fetchall())
+
+
+def insert_key_map(cursor, table, columns, rows, key_column, page_size=1000):
+    """Multi-row insert that skips existing keys
+
+    Returns key_column -> id for the new rows.
+    """
+    rows = list(rows)
+    if not rows:
+        return {}
+
+    inserted = execute_values(
+        cursor,
+        f"""INSERT INTO {table} ({', '.join(columns)}) VALUES %s
+            ON CONFLICT ({key_column}) DO NOTHING
+            RETURNING {key_column}, id""",
+        rows,
+        page_size=page_size,
+        fetch=True
+    )
+    return dict(inserted)
+
+
+def ensure_key_map(cursor, table, columns, rows, key_column):
+    """Resolve ids for rows, inserting the missing ones
+
+    Returns (key_map, inserted_keys) where key_map covers every row's key.
+    """
+    rows = list(rows)
+    key_index = columns.index(key_column)
+
+    key_map = fetch_key_map(cursor, table, key_column, {row[key_index] for row in rows})
+    missing = [row for row in rows if row[key_index] not in key_map]
+    inserted = insert_key_map(cursor, table, columns, missing, key_column)
+
+    key_map.update(inserted)
+    return key_map, list(inserted)
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+HTTP load test for the LV Project API
+Seeds a scratch Postgres database from a scaled-up Platform Luxx Base Data.csv,
+drives every /api/* route at a fixed concurrency with async HTTP clients, and reports
+throughput and p50/p95/p99 latency per endpoint. Results can be saved as a baseline
+and later runs compared against it, so regressions show up between releases.
+
+Seeding wipes products, inventory, sales, brands and sellers, so it only runs against
+a database named explicitly with --db-name. Only GET routes are driven unless
+--include-writes is given, and writes need --start-server so they land in that
+scratch database rather than whatever the running API points at.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import asyncio
+import argparse
+import contextlib
+import subprocess
+from datetime import datetime
+
+import httpx
+
+from generate_synthetic_data import write_synthetic_csv
+from migrate_csv_data import CSVDataMigrator
+
+BACKEND_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '../src/backend'
+)
+DEFAULT_SOURCE = 'data/inputs/Platform Luxx Base Data.csv'
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(name, latencies, errors, seconds):
+    """Throughput and latency percentiles (ms) for one endpoint"""
+    latencies = sorted(latencies)
+
+    def to_ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        'endpoint': name,
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'rps': round(len(latencies) / seconds, 1) if seconds > 0 else None,
+        'p50_ms': to_ms(percentile(latencies, 50)),
+        'p95_ms': to_ms(percentile(latencies, 95)),
+        'p99_ms': to_ms(percentile(latencies, 99)),
+        'max_ms': to_ms(latencies[-1] if latencies else None),
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance=0.2):
+    """Endpoints whose p95 rose, or whose throughput fell, by more than tolerance"""
+    previous = {result['endpoint']: result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        name = result['endpoint']
+        before = previous.get(name)
+        if not before:
+            continue
+        if (before['p95_ms'] and result['p95_ms']
+                and result['p95_ms'] > before['p95_ms'] * (1 + tolerance)):
+            regressions.append((name, 'p95_ms', before['p95_ms'], result['p95_ms']))
+        if (before['rps'] and result['rps'] is not None
+                and result['rps'] < before['rps'] * (1 - tolerance)):
+            regressions.append((name, 'rps', before['rps'], result['rps']))
+        if result['errors'] > before['errors']:
+            regressions.append((name, 'errors', before['errors'], result['errors']))
+    return regressions
+
+
+def build_endpoints(product_ids, run_id, include_writes=False):
+    """(name, method, build) for every /api/* route; build(i) returns (url, body)"""
+    def product(i):
+        return product_ids[i % len(product_ids)]
+
+    def inventory_row(i):
+        return {
+            "product_id": product(i), "quantity": 1,
+            "purchase_price": 120.0, "list_price": 249.0,
+        }
+
+    def sale_row(i):
+        return {
+            "product_id": product(i), "sell_price": 180.0, "gross_amount_earned": 159.3
+        }
+
+    def get(path, query=""):
+        return (f"GET {path}", "GET", lambda i: (path + query, None))
+
+    endpoints = [
+        get("/api/products", "?limit=100"),
+        ("GET /api/products/{id}", "GET",
+         lambda i: (f"/api/products/{product(i)}", None)),
+        get("/api/inventory", "?limit=100"),
+        get("/api/sales", "?limit=100"),
+        get("/api/inventory/export", "?format=ndjson"),
+        get("/api/sales/export", "?format=csv"),
+        get("/api/analytics/top-products"),
+        get("/api/analytics/profit-analysis"),
+        get("/api/analytics/summary"),
+        get("/api/analytics/sales/daily", "?window=7"),
+        get("/api/analytics/inventory/aging"),
+        get("/api/admin/pool"),
+        get("/api/admin/cache"),
+        get("/api/admin/slow-queries"),
+    ]
+    if include_writes:
+        endpoints += [
+            ("POST /api/products", "POST", lambda i: ("/api/products", {
+                "item_inventory_number": f"LOAD-{run_id}-{i}",
+                "name": f"Load Test Product {i}",
+            })),
+            ("POST /api/inventory", "POST",
+             lambda i: ("/api/inventory", inventory_row(i))),
+            ("POST /api/sales", "POST", lambda i: ("/api/sales", sale_row(i))),
+            ("POST /api/inventory/bulk", "POST", lambda i: (
+                "/api/inventory/bulk", [inventory_row(i * 50 + j) for j in range(50)]
+            )),
+            ("POST /api/sales/bulk", "POST", lambda i: (
+                "/api/sales/bulk", [sale_row(i * 50 + j) for j in range(50)]
+            )),
+            ("POST /api/admin/refresh-analytics", "POST",
+             lambda i: ("/api/admin/refresh-analytics", None)),
+        ]
+    return endpoints
+
+
+async def run_endpoint(client, endpoint, requests, concurrency, warmup):
+    """Send requests to one endpoint from concurrency workers; returns its summary"""
+    name, method, build = endpoint
+    latencies = []
+    errors = 0
+
+    async def send(i):
+        url, body = build(i)
+        started = time.perf_counter()
+        response = await client.request(method, url, json=body)
+        response.raise_for_status()
+        return time.perf_counter() - started
+
+    async def worker(indices, record):
+        nonlocal errors
+        for i in indices:
+            try:
+                latency = await send(i)
+            except httpx.HTTPError:
+                if record:
+                    errors += 1
+                continue
+            if record:
+                latencies.append(latency)
+
+    async def run(indices, record):
+        # Workers share one iterator, so each index is sent exactly once
+        indices = iter(indices)
+        await asyncio.gather(*(worker(indices, record) for _ in range(concurrency)))
+
+    # Warm-up requests open connections and fill caches; they are not recorded
+    await run(range(warmup), record=False)
+    started = time.perf_counter()
+    await run(range(warmup, warmup + requests), record=True)
+    return summarize(name, latencies, errors, time.perf_counter() - started)
+
+
+async def run_load_test(base_url, requests, concurrency, warmup, include_writes,
+                        only=None):
+    """Drive each endpoint in turn and collect per-endpoint summaries"""
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60.0
+    ) as client:
+        page = await client.get("/api/products", params={"limit": 100})
+        page.raise_for_status()
+        product_ids = [product["id"] for product in page.json()]
+        if not product_ids:
+            raise RuntimeError("No products found; seed the database first")
+
+        endpoints = build_endpoints(product_ids, int(time.time()), include_writes)
+        if only:
+            endpoints = [
+                endpoint for endpoint in endpoints
+                if any(term in endpoint[0] for term in only)
+            ]
+
+        results = []
+        for endpoint in endpoints:
+            result = await run_endpoint(client, endpoint, requests, concurrency, warmup)
+            results.append(result)
+            print(f"  {result['endpoint']:<38} {result['rps'] or 0:>8.1f} req/s "
+                  f"p50 {result['p50_ms'] or 0:>8.1f}  "
+                  f"p95 {result['p95_ms'] or 0:>8.1f}  "
+                  f"p99 {result['p99_ms'] or 0:>8.1f} ms  "
+                  f"{result['errors']:>4} errors")
+        return results
+
+
+def seed_database(rows, data_dir, source):
+    """Load a scaled-up export into the POSTGRES_DB database; returns its config"""
+    csv_file = write_synthetic_csv(
+        rows, data_dir, source=source if os.path.exists(source) else None
+    )
+    print(f"🌱 Seeding {rows:,} rows from {csv_file}...")
+    migrator = CSVDataMigrator(csv_file, bulk=True)
+    if not migrator.run_migration():
+        raise RuntimeError("Seeding failed")
+    return migrator.db_config
+
+
+@contextlib.contextmanager
+def api_server(database_url, port):
+    """Run the API under uvicorn against database_url until the block exits"""
+    env = {**os.environ, "DATABASE_URL": database_url}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                if httpx.get(f"{base_url}/health").status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if process.poll() is not None or time.time() > deadline:
+                raise RuntimeError("API server did not start")
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main(base_url='http://localhost:8000', db_name=None, rows=10000,
+         data_dir='data/synthetic', source=DEFAULT_SOURCE, start_server=False,
+         port=8765, requests=200, concurrency=10, warmup=10, include_writes=False,
+         only=None, output=None, baseline=None, tolerance=0.2):
+    """Seed (optionally), run the load test and compare with a baseline
+
+    Returns False when the run regressed against the baseline.
+    """
+    print("🏋️  LV Project API Load Test")
+    print("=" * 50)
+
+    with contextlib.ExitStack() as stack:
+        if start_server and not db_name:
+            raise ValueError(
+                "--start-server needs --db-name so the API uses the seeded database"
+            )
+        if include_writes and not start_server:
+            # POSTs create thousands of rows; never send them to an API we did not start
+            raise ValueError(
+                "--include-writes needs --start-server so writes hit the scratch "
+                "database"
+            )
+
+        if db_name:
+            # Point the migrator at the scratch database; DATABASE_URL would win
+            os.environ.pop('DATABASE_URL', None)
+            os.environ['POSTGRES_DB'] = db_name
+            print(f"⚠️  Load test database '{db_name}' will be cleared and reseeded")
+            config = seed_database(rows, data_dir, source)
+
+        if start_server:
+            database_url = (f"postgresql://{config['user']}:{config['password']}@"
+                            f"{config['host']}:{config['port']}/{config['database']}")
+            base_url = stack.enter_context(api_server(database_url, port))
+
+        print(f"\n🎯 {base_url}: {requests} requests per endpoint, "
+              f"concurrency {concurrency}\n")
+        results = asyncio.run(run_load_test(
+            base_url, requests, concurrency, warmup, include_writes, only
+        ))
+
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'base_url': base_url,
+        'rows': rows if db_name else None,
+        'requests': requests,
+        'concurrency': concurrency,
+        'results': results,
+    }
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results saved to {output}")
+
+    if not baseline:
+        return True
+
+    with open(baseline) as f:
+        previous = json.load(f)
+    if (previous.get('concurrency') != concurrency
+            or previous.get('requests') != requests):
+        print("⚠️  Baseline was recorded with different --requests/--concurrency; "
+              "comparison is approximate")
+
+    regressions = compare_to_baseline(results, previous, tolerance)
+    if not regressions:
+        print(f"\n✅ No regressions against {baseline} (tolerance {tolerance:.0%})")
+        return True
+
+    print(f"\n❌ {len(regressions)} regression(s) against {baseline}:")
+    for endpoint, metric, before, after in regressions:
+        print(f"  {endpoint:<38} {metric:<7} {before} -> {after}")
+    return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the LV Project API")
+    parser.add_argument("--base-url", default="http://localhost:8000",
+                        help="Running API to test")
+    parser.add_argument("--db-name",
+                        help="Scratch Postgres database to seed first "
+                        "(its data is deleted)")
+    parser.add_argument("--rows", type=int, default=10000, help="Rows to seed")
+    parser.add_argument("--data-dir", default="data/synthetic",
+                        help="Where the scaled CSV is written")
+    parser.add_argument("--source", default=DEFAULT_SOURCE,
+                        help="Export to scale up (synthetic rows if it is missing)")
+    parser.add_argument("--start-server", action="store_true",
+                        help="Start the API under uvicorn against the seeded database")
+    parser.add_argument("--port", type=int, default=8765,
+                        help="Port for --start-server")
+    parser.add_argument("--requests", type=int, default=200,
+                        help="Measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10,
+                        help="Concurrent clients")
+    parser.add_argument("--warmup", type=int, default=10,
+                        help="Unmeasured requests per endpoint")
+    parser.add_argument("--include-writes", action="store_true",
+                        help="Also drive the POST routes (needs --start-server)")
+    parser.add_argument("--only", nargs="+",
+                        help="Only endpoints whose name contains one of these")
+    parser.add_argument("--output",
+                        help="Write results as JSON (use as a later --baseline)")
+    parser.add_argument("--baseline",
+                        help="Results file from a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed p95/throughput change")
+    args = parser.parse_args()
+
+    passed = main(
+        base_url=args.base_url, db_name=args.db_name, rows=args.rows,
+        data_dir=args.data_dir,
+        source=args.source, start_server=args.start_server, port=args.port,
+        requests=args.requests, concurrency=args.concurrency, warmup=args.warmup,
+        include_writes=args.include_writes, only=args.only, output=args.output,
+        baseline=args.baseline, tolerance=args.tolerance
+    )
+    sys.exit(0 if passed else 1)
@@ -6,21 +6,42 @@ Updated for Platform Luxx Base Data.csv format
 
 import pandas as pd
 import psycopg2
+from psycopg2.extras import execute_values
 import os
 import json
 from datetime import datetime
 import uuid
 from dotenv import load_dotenv
 import re
+import argparse
+from bulk_loader import BulkLoader
+from key_maps import ensure_key_map, fetch_key_map
+from checkpoints import BatchSizer, CheckpointStore
+from csv_normalize import normalize_frame
 
 # Load environment variables
 load_dotenv()
 
 class CSVDataMigrator:
-    def __init__(self, csv_file_path):
+    def __init__(self, csv_file_path, bulk=False, incremental=False, chunk_size=None,
+                 batch_size=1000, adaptive_batches=False, resume=False):
         self.csv_file_path = csv_file_path
+        self.bulk = bulk
+        self.incremental = incremental
+        self.chunk_size = chunk_size
+        self.resume = resume
+        # Streaming uses chunk_size as its starting batch size
+        self.batch_sizer = BatchSizer(
+            chunk_size or batch_size, adaptive=adaptive_batches
+        )
+        self.checkpoints = None
+        self.watermarks = {}
         self.db_config = self._get_db_config()
         self.connection = None
+        self.df = None
+        self.seller_ids = {}
+        self.brand_ids = {}
+        self.product_ids = {}
 
     def _get_db_config(self):
         """Get database configuration from environment variables"""
@@ -73,65 +94,104 @@ class CSVDataMigrator:
             cursor.execute("DELETE FROM sales")
             cursor.execute("DELETE FROM inventory")
             cursor.execute("DELETE FROM products")
-            cursor.execute("DELETE FROM categories")
             cursor.execute("DELETE FROM brands")
+            cursor.execute("DELETE FROM ingest_fingerprints")
             
             self.connection.commit()
             cursor.close()
             print("✅ Cleared existing data")
         except Exception as e:
+            self.connection.rollback()
             print(f"❌ Error clearing data: {str(e)}")
 
-    def parse_money_value(self, value_str):
-        """Parse money values from CSV, handling various formats"""
-        if pd.isna(value_str) or value_str == '' or str(value_str).strip() == '':
-            return None
-        
-        value_str = str(value_str).strip()
-        
-        # Handle empty or dash values
-        if value_str == '-' or value_str == '':
-            return None
-        
-        # Handle parentheses (negative values)
-        if value_str.startswith('(') and value_str.endswith(')'):
-            # Extract the number and make it negative
-            number_str = value_str[1:-1].replace('$', '').replace(',', '').strip()
-            try:
-                return -float(number_str)
-            except:
-                return None
-        
-        # Handle regular positive values
-        try:
-            # Remove $ and commas
-            clean_value = value_str.replace('$', '').replace(',', '').strip()
-            return float(clean_value) if clean_value else None
-        except:
-            return None
+    def load_data(self):
+        """Parse the CSV once into the shared normalized frame used by every stage"""
+        if self.df is None:
+            self.df = normalize_frame(pd.read_csv(self.csv_file_path, dtype=str))
+            print(f"📊 Loaded {len(self.df)} records from CSV")
+        return self.df
+
+    def sellers_frame(self, df=None):
+        """Unique sellers projection"""
+        df = self.load_data() if df is None else df
+        sellers = df['seller'].dropna()
+        return sellers[sellers.str.lower() != 'na'].drop_duplicates()
+
+    def brands_frame(self, df=None):
+        """Unique brands projection"""
+        df = self.load_data() if df is None else df
+        return df['brand'].dropna().drop_duplicates()
+
+    def products_frame(self, df=None):
+        """Products projection, one row per item inventory number"""
+        df = self.load_data() if df is None else df
+        df = df[df['item_number'].notna() & df['brand_product_name'].notna()]
+        df = df.drop_duplicates('item_number')
+
+        # Combine description with quality
+        description = df['description'].fillna('')
+        quality = df['quality'].fillna('')
+        with_quality = (description + ' Quality: ' + quality).str.strip()
+
+        return pd.DataFrame({
+            'item_inventory_number': df['item_number'],
+            # Use Brand + Product Name if available, otherwise Product_Name
+            'name': df['brand_product_name'].fillna(df['product_name']).fillna(''),
+            'description': description.where(df['quality'].isna(), with_quality),
+            'brand': df['brand'],
+        })
+
+    def inventory_frame(self, df=None):
+        """Inventory projection"""
+        df = self.load_data() if df is None else df
+        df = df[df['item_number'].notna()]
+        return pd.DataFrame({
+            'item_inventory_number': df['item_number'],
+            'quantity': 1,
+            'purchase_price': df['purchase_price'],
+            'list_price': df['list_price'],
+            'is_listed': True,
+            'purchase_date': df['purchase_date'].dt.date,
+        })
+
+    def sales_frame(self, df=None):
+        """Sales projection, limited to rows with a positive sell price"""
+        df = self.load_data() if df is None else df
+        df = df[df['item_number'].notna() & (df['sell_price'] > 0)]
+        return pd.DataFrame({
+            'item_inventory_number': df['item_number'],
+            'quantity_sold': 1,
+            'sell_price': df['sell_price'],
+            'gross_amount_earned': df['gross_amount'],
+            'net_profit_loss': df['net_profit'],
+            'percent_profit': df['percent_profit'],
+            'date_sold': df['date_sold'].dt.date,
+            'days_held': df['days_held'],
+        })
+
+    @staticmethod
+    def rows(df, named=True):
+        """Iterate a prepared frame as tuples with missing values as None"""
+        df = df.astype(object).where(df.notna(), None)
+        return df.itertuples(index=False, name='Row' if named else None)
 
     def migrate_sellers(self):
         """Migrate unique sellers from CSV"""
         print("\n👥 Migrating sellers...")
         
         try:
-            df = pd.read_csv(self.csv_file_path)
-            
-            # Extract unique sellers
-            sellers = df['seller'].dropna().unique()
+            sellers = self.sellers_frame()
             
             cursor = self.connection.cursor()
             
-            for seller in sellers:
-                if seller and str(seller).strip() and str(seller).lower() != 'na':
-                    # Check if seller already exists
-                    cursor.execute("SELECT id FROM users WHERE username = %s", (str(seller),))
-                    if not cursor.fetchone():
-                        cursor.execute(
-                            "INSERT INTO users (username, user_type, full_name) VALUES (%s, %s, %s)",
-                            (str(seller), 'seller', f"Seller: {str(seller)}")
-                        )
-                        print(f"  ✅ Added seller: {seller}")
+            # One lookup for existing sellers plus one multi-row insert for new ones
+            self.seller_ids, added = ensure_key_map(
+                cursor, 'users', ['username', 'user_type', 'full_name'],
+                [(seller, 'seller', f"Seller: {seller}") for seller in sellers],
+                'username'
+            )
+            for seller in added:
+                print(f"  ✅ Added seller: {seller}")
 
             self.connection.commit()
             cursor.close()
@@ -145,22 +205,18 @@ class CSVDataMigrator:
         print("\n🏷️  Migrating brands...")
 
         try:
-            df = pd.read_csv(self.csv_file_path)
-            
-            # Extract unique brands
-            brands = df['Brand'].dropna().unique()
+            brands = self.brands_frame()
 
             cursor = self.connection.cursor()
 
-            for brand in brands:
-                if brand and str(brand).strip():
-                    cursor.execute("SELECT id FROM brands WHERE name = %s", (brand,))
-                    if not cursor.fetchone():
-                        cursor.execute(
-                            "INSERT INTO brands (name, description) VALUES (%s, %s)",
-                            (brand, f"Brand: {brand}")
-                        )
-                        print(f"  ✅ Added brand: {brand}")
+            # One lookup for existing brands plus one multi-row insert for new ones
+            self.brand_ids, added = ensure_key_map(
+                cursor, 'brands', ['name', 'description'],
+                [(brand, f"Brand: {brand}") for brand in brands],
+                'name'
+            )
+            for brand in added:
+                print(f"  ✅ Added brand: {brand}")
 
             self.connection.commit()
             cursor.close()
@@ -169,186 +225,446 @@ class CSVDataMigrator:
         except Exception as e:
             print(f"❌ Error migrating brands: {str(e)}")
 
-    def migrate_products(self):
-        """Migrate products from CSV"""
-        print("\n📦 Migrating products...")
+    def load_in_batches(self, stage, rows, insert_batch):
+        """Insert rows in checkpointed batches, resuming after the last watermark
+
+        Each batch and its watermark are committed together, so a crash loses at
+        most the batch in flight. Returns the number of rows inserted by this run.
+        """
+        start = self.watermarks.get(stage, 0)
+        if start:
+            print(f"  ⏩ Resuming {stage} after {start} rows")
 
+        cursor = self.connection.cursor()
+        position = start
         try:
-            df = pd.read_csv(self.csv_file_path)
-            cursor = self.connection.cursor()
+            while position < len(rows):
+                self.batch_sizer.start()
+                batch = rows[position:position + self.batch_sizer.size]
+                insert_batch(cursor, batch)
+                position += len(batch)
+                self.checkpoints.save(cursor, stage, position)
+                self.connection.commit()
+                self.batch_sizer.finish(len(batch))
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
 
-            products_migrated = 0
+        return position - start
 
-            for _, row in df.iterrows():
-                try:
-                    item_number = str(row['Item Inventory #']) if pd.notna(row['Item Inventory #']) else None
-                    brand_product_name = str(row['Brand + Product Name']) if pd.notna(row['Brand + Product Name']) else ''
-                    brand = str(row['Brand']) if pd.notna(row['Brand']) else ''
-                    product_name = str(row['Product_Name']) if pd.notna(row['Product_Name']) else ''
-                    description = str(row['product description']) if pd.notna(row['product description']) else ''
-                    quality = str(row[' Quality ']) if pd.notna(row[' Quality ']) else ''
-
-                    if item_number and brand_product_name:
-                        # Get brand ID
-                        brand_id = None
-                        if brand:
-                            cursor.execute("SELECT id FROM brands WHERE name = %s", (brand,))
-                            brand_result = cursor.fetchone()
-                            if brand_result:
-                                brand_id = brand_result[0]
-
-                        # Create product name (use Brand + Product Name if available, otherwise Product_Name)
-                        name = brand_product_name if brand_product_name else product_name
-                        
-                        # Combine description with quality
-                        full_description = description
-                        if quality:
-                            full_description = f"{description} Quality: {quality}".strip()
-
-                        cursor.execute(
-                            """INSERT INTO products 
-                               (item_inventory_number, name, description, brand_id)
-                               VALUES (%s, %s, %s, %s)""",
-                            (item_number, name, full_description, brand_id)
-                        )
-                        products_migrated += 1
-
-                except Exception as e:
-                    print(f"  ⚠️  Error processing product {row.get('Item Inventory #', 'Unknown')}: {str(e)}")
-                    continue
+    def migrate_products(self):
+        """Migrate products from CSV"""
+        print("\n📦 Migrating products...")
 
-            self.connection.commit()
-            cursor.close()
-            print(f"✅ Migrated {products_migrated} products")
+        try:
+            df = self.products_frame()
+            columns = ['item_inventory_number', 'name', 'description', 'brand_id']
+
+            # Brand ids are resolved from the in-memory map built by migrate_brands
+            rows = [
+                (row.item_inventory_number, row.name, row.description,
+                 self.brand_ids.get(row.brand))
+                for row in self.rows(df)
+            ]
+
+            def insert_batch(cursor, batch):
+                product_ids, _ = ensure_key_map(
+                    cursor, 'products', columns, batch, 'item_inventory_number'
+                )
+                self.product_ids.update(product_ids)
+
+            migrated = self.load_in_batches('products', rows, insert_batch)
+
+            # Products committed by an interrupted run are fetched in one query
+            missing = [row[0] for row in rows if row[0] not in self.product_ids]
+            if missing:
+                cursor = self.connection.cursor()
+                self.product_ids.update(fetch_key_map(
+                    cursor, 'products', 'item_inventory_number', missing
+                ))
+                cursor.close()
+
+            print(f"✅ Migrated {migrated} products")
 
         except Exception as e:
             print(f"❌ Error migrating products: {str(e)}")
+            raise
 
     def migrate_inventory(self):
         """Migrate inventory data from CSV"""
         print("\n📊 Migrating inventory...")
 
         try:
-            df = pd.read_csv(self.csv_file_path)
-            cursor = self.connection.cursor()
-
-            inventory_migrated = 0
-
-            for _, row in df.iterrows():
-                try:
-                    item_number = str(row['Item Inventory #']) if pd.notna(row['Item Inventory #']) else None
-                    
-                    # Parse purchase price
-                    purchase_price = self.parse_money_value(row[' Purchase Price '])
-                    
-                    # Parse list price
-                    list_price = self.parse_money_value(row[' List Price '])
-
-                    if item_number:
-                        # Get product ID
-                        cursor.execute("SELECT id FROM products WHERE item_inventory_number = %s", (item_number,))
-                        product_result = cursor.fetchone()
-
-                        if product_result:
-                            product_id = product_result[0]
-
-                            cursor.execute(
-                                """INSERT INTO inventory 
-                                   (product_id, quantity, purchase_price, list_price, is_listed)
-                                   VALUES (%s, %s, %s, %s, %s)""",
-                                (product_id, 1, purchase_price, list_price, True)
-                            )
-                            inventory_migrated += 1
-
-                except Exception as e:
-                    print(f"  ⚠️  Error processing inventory for {row.get('Item Inventory #', 'Unknown')}: {str(e)}")
-                    continue
-
-            self.connection.commit()
-            cursor.close()
-            print(f"✅ Migrated {inventory_migrated} inventory records")
+            df = self.inventory_frame()
+
+            # Product ids are resolved from the in-memory map built by migrate_products
+            rows = [
+                (self.product_ids[row.item_inventory_number], row.quantity,
+                 row.purchase_price, row.list_price, row.is_listed, row.purchase_date)
+                for row in self.rows(df)
+                if row.item_inventory_number in self.product_ids
+            ]
+
+            def insert_batch(cursor, batch):
+                execute_values(
+                    cursor,
+                    """INSERT INTO inventory
+                       (product_id, quantity, purchase_price, list_price, is_listed,
+                        purchase_date)
+                       VALUES %s""",
+                    batch,
+                    page_size=1000
+                )
+
+            migrated = self.load_in_batches('inventory', rows, insert_batch)
+            print(f"✅ Migrated {migrated} inventory records")
 
         except Exception as e:
             print(f"❌ Error migrating inventory: {str(e)}")
+            raise
 
     def migrate_sales(self):
         """Migrate sales data from CSV"""
         print("\n💰 Migrating sales...")
 
         try:
-            df = pd.read_csv(self.csv_file_path)
+            df = self.sales_frame()
+
+            # Product ids are resolved from the in-memory map built by migrate_products
+            rows = [
+                (self.product_ids[row.item_inventory_number], row.quantity_sold,
+                 row.sell_price, row.gross_amount_earned, row.net_profit_loss,
+                 row.percent_profit, row.date_sold, row.days_held)
+                for row in self.rows(df)
+                if row.item_inventory_number in self.product_ids
+            ]
+
+            def insert_batch(cursor, batch):
+                execute_values(
+                    cursor,
+                    """INSERT INTO sales
+                       (product_id, quantity_sold, sell_price, gross_amount_earned,
+                        net_profit_loss, percent_profit, date_sold, days_held)
+                       VALUES %s""",
+                    batch,
+                    page_size=1000
+                )
+
+            migrated = self.load_in_batches('sales', rows, insert_batch)
+            print(f"✅ Migrated {migrated} sales records")
+
+        except Exception as e:
+            print(f"❌ Error migrating sales: {str(e)}")
+            raise
+
+    def bulk_load(self):
+        """Load products, inventory and sales through COPY staging tables"""
+        print("\n🚚 Bulk loading products, inventory and sales...")
+
+        if self.watermarks.get('bulk'):
+            print("  ⏩ Bulk load already committed by the interrupted run")
+            return
+
+        try:
+            counts = BulkLoader(self.connection).load(
+                products=self.rows(self.products_frame(), named=False),
+                inventory=self.rows(self.inventory_frame(), named=False),
+                sales=self.rows(self.sales_frame(), named=False),
+                commit=False,
+            )
+            # The whole load is one transaction; its checkpoint commits with it
             cursor = self.connection.cursor()
+            self.checkpoints.save(cursor, 'bulk', 1)
+            self.connection.commit()
+            cursor.close()
 
-            sales_migrated = 0
+            print(f"✅ Migrated {counts['products']} products")
+            print(f"✅ Migrated {counts['inventory']} inventory records")
+            print(f"✅ Migrated {counts['sales']} sales records")
 
-            for _, row in df.iterrows():
+        except Exception as e:
+            self.connection.rollback()
+            print(f"❌ Error bulk loading data: {str(e)}")
+            raise
+
+    def iter_chunks(self):
+        """Parse stage: yield raw CSV chunks, sized by the batch sizer
+
+        Rows up to the stream watermark are skipped.
+        """
+        start = self.watermarks.get('stream', 0)
+        if start:
+            print(f"  ⏩ Resuming stream after {start} rows")
+
+        # Keep the header row, skip rows already committed by an interrupted run
+        reader = pd.read_csv(
+            self.csv_file_path, dtype=str, iterator=True,
+            skiprows=range(1, start + 1) if start else None
+        )
+        self.stream_position = start
+        with reader:
+            while True:
                 try:
-                    item_number = str(row['Item Inventory #']) if pd.notna(row['Item Inventory #']) else None
-                    
-                    # Parse sell price
-                    sell_price = self.parse_money_value(row[' Sell price '])
-                    
-                    # Parse gross amount
-                    gross_amount = self.parse_money_value(row[' Gross Amount Earned '])
-                    
-                    # Parse net profit
-                    net_profit = self.parse_money_value(row[' Net Profit/Loss '])
-                    
-                    # Parse percent profit
-                    percent_profit_str = str(row['Percent Profit']) if pd.notna(row['Percent Profit']) else '0%'
-                    percent_profit = 0
-                    if percent_profit_str and percent_profit_str != '0%':
-                        try:
-                            percent_profit = float(percent_profit_str.replace('%', '').strip())
-                        except:
-                            percent_profit = 0
-                    
-                    # Parse date sold
-                    date_sold_str = str(row['Date Sold']) if pd.notna(row['Date Sold']) else None
-                    date_sold = None
-                    if date_sold_str and date_sold_str.strip():
-                        try:
-                            date_sold = pd.to_datetime(date_sold_str).date()
-                        except:
-                            pass
-                    
-                    # Parse days held
-                    days_held_str = str(row['Days Held']) if pd.notna(row['Days Held']) else '0'
-                    days_held = None
-                    if days_held_str and days_held_str.strip() != '0':
-                        try:
-                            days_held = int(float(days_held_str.strip()))
-                        except:
-                            days_held = None
-
-                    if item_number and sell_price and sell_price > 0:
-                        # Get product ID
-                        cursor.execute("SELECT id FROM products WHERE item_inventory_number = %s", (item_number,))
-                        product_result = cursor.fetchone()
-
-                        if product_result:
-                            product_id = product_result[0]
-
-                            cursor.execute(
-                                """INSERT INTO sales
-                                   (product_id, quantity_sold, sell_price, gross_amount_earned,
-                                    net_profit_loss, percent_profit, date_sold, days_held)
-                                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
-                                (product_id, 1, sell_price, gross_amount, net_profit,
-                                 percent_profit, date_sold, days_held)
-                            )
-                            sales_migrated += 1
-
-                except Exception as e:
-                    print(f"  ⚠️  Error processing sale for {row.get('Item Inventory #', 'Unknown')}: {str(e)}")
-                    continue
-
+                    chunk = reader.get_chunk(self.batch_sizer.size)
+                except StopIteration:
+                    return
+                self.batch_sizer.start()
+                yield chunk
+
+    def resolve_chunk_keys(self, chunk):
+        """Key stage: add ids for sellers and brands first seen in this chunk"""
+        cursor = self.connection.cursor()
+
+        new_sellers = [
+            seller for seller in self.sellers_frame(chunk)
+            if seller not in self.seller_ids
+        ]
+        if new_sellers:
+            seller_ids, _ = ensure_key_map(
+                cursor, 'users', ['username', 'user_type', 'full_name'],
+                [(seller, 'seller', f"Seller: {seller}") for seller in new_sellers],
+                'username'
+            )
+            self.seller_ids.update(seller_ids)
+
+        new_brands = [
+            brand for brand in self.brands_frame(chunk)
+            if brand not in self.brand_ids
+        ]
+        if new_brands:
+            brand_ids, _ = ensure_key_map(
+                cursor, 'brands', ['name', 'description'],
+                [(brand, f"Brand: {brand}") for brand in new_brands],
+                'name'
+            )
+            self.brand_ids.update(brand_ids)
+
+        cursor.close()
+        return chunk
+
+    def stream_migration(self):
+        """Load the CSV through a parse -> normalize -> resolve keys -> load pipeline
+
+        Only one chunk is held in memory at a time; each chunk is committed on its
+        own together with the stream watermark.
+        """
+        print(f"\n🌊 Streaming migration in chunks of {self.batch_sizer.size} rows...")
+
+        parsed = self.iter_chunks()
+        normalized = (normalize_frame(chunk) for chunk in parsed)
+        resolved = (self.resolve_chunk_keys(chunk) for chunk in normalized)
+
+        loader = BulkLoader(self.connection)
+        totals = {'rows': 0, 'products': 0, 'inventory': 0, 'sales': 0}
+        cursor = self.connection.cursor()
+
+        for chunk in resolved:
+            counts = loader.load(
+                products=self.rows(self.products_frame(chunk), named=False),
+                inventory=self.rows(self.inventory_frame(chunk), named=False),
+                sales=self.rows(self.sales_frame(chunk), named=False),
+                commit=False,
+                # A repeated item number keeps its first row, as in a whole-file load
+                keep_existing=True,
+            )
+            # An item's rows can span chunks; add this chunk's share to what is stored
+            fingerprints = self.compute_fingerprints(chunk)
+            self.record_fingerprints(
+                cursor, self.accumulate_fingerprints(cursor, fingerprints)
+            )
+            self.stream_position += len(chunk)
+            self.checkpoints.save(cursor, 'stream', self.stream_position)
+            self.connection.commit()
+            self.batch_sizer.finish(len(chunk))
+
+            totals['rows'] += len(chunk)
+            for entity, count in counts.items():
+                totals[entity] += count
+            print(f"  ✅ Loaded {totals['rows']} rows so far...")
+
+        cursor.close()
+        print(f"✅ Migrated {len(self.seller_ids)} sellers and "
+              f"{len(self.brand_ids)} brands")
+        print(f"✅ Migrated {totals['products']} products")
+        print(f"✅ Migrated {totals['inventory']} inventory records")
+        print(f"✅ Migrated {totals['sales']} sales records")
+
+    def ensure_fingerprint_table(self):
+        """Create the fingerprint table used by incremental syncs if it is missing"""
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ingest_fingerprints (
+                item_inventory_number VARCHAR(50) PRIMARY KEY,
+                row_hash BIGINT NOT NULL,
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.connection.commit()
+        cursor.close()
+
+    def compute_fingerprints(self, df=None):
+        """Hash every CSV row and combine rows sharing an item number into one hash"""
+        df = self.load_data() if df is None else df
+        df = df[df['item_number'].notna()]
+        row_hashes = pd.util.hash_pandas_object(df, index=False)
+        # uint64 sums wrap around; store the bit pattern as a signed BIGINT
+        combined = row_hashes.groupby(df['item_number'].values).sum()
+        signed = combined.values.astype('uint64').view('int64')
+        return dict(zip(combined.index, signed.tolist()))
+
+    @staticmethod
+    def combine_fingerprints(left, right):
+        """Add two fingerprints as uint64 sums, wrapped into the signed BIGINT range"""
+        return (left + right + 2 ** 63) % 2 ** 64 - 2 ** 63
+
+    def accumulate_fingerprints(self, cursor, fingerprints):
+        """Combine partial fingerprints with those already stored for the same items
+
+        A fingerprint is a sum of row hashes, so summing per-chunk sums gives the same
+        value compute_fingerprints returns for the whole file.
+        """
+        cursor.execute(
+            """SELECT item_inventory_number, row_hash FROM ingest_fingerprints
+               WHERE item_inventory_number = ANY(%s)""",
+            (list(fingerprints),)
+        )
+        combined = dict(fingerprints)
+        for item_number, stored in cursor.fetchall():
+            combined[item_number] = self.combine_fingerprints(
+                combined[item_number], stored
+            )
+        return combined
+
+    def record_fingerprints(self, cursor, fingerprints, removed=()):
+        """Upsert fingerprints for loaded items and drop those of removed items"""
+        if removed:
+            cursor.execute(
+                "DELETE FROM ingest_fingerprints WHERE item_inventory_number = ANY(%s)",
+                (list(removed),)
+            )
+        execute_values(
+            cursor,
+            """INSERT INTO ingest_fingerprints (item_inventory_number, row_hash)
+               VALUES %s
+               ON CONFLICT (item_inventory_number) DO UPDATE
+               SET row_hash = EXCLUDED.row_hash, updated_at = CURRENT_TIMESTAMP""",
+            list(fingerprints.items()),
+            page_size=1000
+        )
+
+    def sync_incremental(self):
+        """Apply only the inserts, updates and deletes since the previous run
+
+        Everything is applied in one transaction.
+        """
+        print("\n🔁 Computing incremental changes...")
+
+        self.ensure_fingerprint_table()
+        df = self.load_data()
+        current = self.compute_fingerprints(df)
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(
+                "SELECT item_inventory_number, row_hash FROM ingest_fingerprints"
+            )
+            previous = dict(cursor.fetchall())
+
+            added = [key for key in current if key not in previous]
+            changed = [
+                key for key in current
+                if key in previous and previous[key] != current[key]
+            ]
+            removed = [key for key in previous if key not in current]
+            print(f"  ➕ {len(added)} new, ✏️  {len(changed)} changed, "
+                  f"➖ {len(removed)} removed")
+
+            if not (added or changed or removed):
+                print("✅ Database already up to date")
+                return
+
+            # Inventory and sales are rebuilt from the CSV for every touched item.
+            # New items are included in case they were loaded before fingerprints
+            # existed.
+            touched = added + changed + removed
+            cursor.execute("""
+                DELETE FROM sales WHERE product_id IN (
+                    SELECT id FROM products WHERE item_inventory_number = ANY(%s))
+            """, (touched,))
+            cursor.execute("""
+                DELETE FROM inventory WHERE product_id IN (
+                    SELECT id FROM products WHERE item_inventory_number = ANY(%s))
+            """, (touched,))
+            cursor.execute(
+                "DELETE FROM products WHERE item_inventory_number = ANY(%s)",
+                (removed,)
+            )
+
+            subset = df[df['item_number'].isin(added + changed)]
+            self.seller_ids, _ = ensure_key_map(
+                cursor, 'users', ['username', 'user_type', 'full_name'],
+                [(seller, 'seller', f"Seller: {seller}")
+                 for seller in self.sellers_frame(subset)],
+                'username'
+            )
+            self.brand_ids, _ = ensure_key_map(
+                cursor, 'brands', ['name', 'description'],
+                [(brand, f"Brand: {brand}") for brand in self.brands_frame(subset)],
+                'name'
+            )
+            counts = BulkLoader(self.connection).load(
+                products=self.rows(self.products_frame(subset), named=False),
+                inventory=self.rows(self.inventory_frame(subset), named=False),
+                sales=self.rows(self.sales_frame(subset), named=False),
+                commit=False,
+            )
+
+            self.record_fingerprints(
+                cursor, {key: current[key] for key in added + changed}, removed
+            )
             self.connection.commit()
+            print(f"✅ Synced {counts['products']} products, "
+                  f"{counts['inventory']} inventory records, {counts['sales']} sales "
+                  f"and removed {len(removed)} products")
+
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
             cursor.close()
-            print(f"✅ Migrated {sales_migrated} sales records")
 
+    def refresh_analytics_views(self):
+        """Refresh the materialized analytics views the API reads from"""
+        print("\n📈 Refreshing analytics views...")
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("SELECT refresh_analytics_views()")
+            self.connection.commit()
+            cursor.close()
+            print("✅ Refreshed analytics views")
         except Exception as e:
-            print(f"❌ Error migrating sales: {str(e)}")
+            # The load itself succeeded; the API falls back to live queries without
+            # the views
+            self.connection.rollback()
+            print(f"⚠️  Could not refresh analytics views: {str(e)}")
+
+    def prepare_run(self):
+        """Load checkpoints when resuming, otherwise clear existing data"""
+        self.ensure_fingerprint_table()
+        self.checkpoints = CheckpointStore(self.connection, self.csv_file_path)
+        self.checkpoints.ensure_table()
+
+        self.watermarks = self.checkpoints.load() if self.resume else {}
+        if self.watermarks:
+            print(f"\n⏩ Resuming from checkpoint: {self.watermarks}")
+            return
+        if self.resume:
+            print("\nℹ️  No checkpoint found, starting fresh")
+
+        self.clear_existing_data()
+        self.checkpoints.clear()
 
     def run_migration(self):
         """Run the complete migration process"""
@@ -359,15 +675,49 @@ class CSVDataMigrator:
             return False
 
         try:
-            # Clear existing data
-            self.clear_existing_data()
+            if self.incremental:
+                self.sync_incremental()
+                self.refresh_analytics_views()
+                print("\n" + "=" * 60)
+                print("✅ Incremental sync completed successfully!")
+                return True
+
+            if self.chunk_size:
+                # Clear existing data (unless resuming), then stream the file chunk
+                # by chunk
+                self.prepare_run()
+                self.stream_migration()
+                self.checkpoints.clear()
+                self.refresh_analytics_views()
+                print("\n" + "=" * 60)
+                print("✅ Migration completed successfully!")
+                return True
+
+            # Parse the CSV once; every stage reads its own projection
+            self.load_data()
+
+            # Clear existing data (unless resuming)
+            self.prepare_run()
             
             # Run migrations in order
             self.migrate_sellers()
             self.migrate_brands()
-            self.migrate_products()
-            self.migrate_inventory()
-            self.migrate_sales()
+            if self.bulk:
+                self.bulk_load()
+            else:
+                self.migrate_products()
+                self.migrate_inventory()
+                self.migrate_sales()
+
+            # Fingerprint the full load so the next run can be incremental
+            cursor = self.connection.cursor()
+            self.record_fingerprints(cursor, self.compute_fingerprints())
+            self.connection.commit()
+            cursor.close()
+
+            # The run finished; the next one starts fresh
+            self.checkpoints.clear()
+            self.refresh_analytics_views()
 
             print("\n" + "=" * 60)
             print("✅ Migration completed successfully!")
@@ -382,7 +732,44 @@ class CSVDataMigrator:
                 self.connection.close()
 
 if __name__ == "__main__":
-    csv_file = "/Users/makaminski1337/Developer/LV/data/inputs/Platform Luxx Base Data.csv"
-
-    migrator = CSVDataMigrator(csv_file)
-    migrator.run_migration() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(
+        description="Migrate Platform Luxx CSV data to PostgreSQL"
+    )
+    parser.add_argument(
+        "csv_file", nargs="?",
+        default=(
+            "/Users/makaminski1337/Developer/LV/data/inputs/"
+            "Platform Luxx Base Data.csv"
+        )
+    )
+    parser.add_argument(
+        "--bulk", action="store_true", help="Load through COPY staging tables"
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Apply only rows that changed since the previous run instead of reloading"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int,
+        help="Stream the file in chunks of this many rows to keep memory flat"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=1000,
+        help="Rows per committed, checkpointed batch"
+    )
+    parser.add_argument(
+        "--adaptive-batches", action="store_true",
+        help="Grow or shrink batches to keep each commit near one second"
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Continue from the last committed batch of an interrupted run"
+    )
+    args = parser.parse_args()
+
+    migrator = CSVDataMigrator(
+        args.csv_file, bulk=args.bulk, incremental=args.incremental,
+        chunk_size=args.chunk_size, batch_size=args.batch_size,
+        adaptive_batches=args.adaptive_batches, resume=args.resume
+    )
+    migrator.run_migration()
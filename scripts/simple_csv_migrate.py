@@ -7,7 +7,12 @@ Handles errors better and processes data in smaller batches
 import pandas as pd
 import psycopg2
 import os
+import argparse
 from dotenv import load_dotenv
+from bulk_loader import BulkLoader
+from csv_normalize import parse_date_column, parse_money_column
+from checkpoints import BatchSizer, CheckpointStore
+from key_maps import fetch_key_map
 
 # Load environment variables
 load_dotenv()
@@ -22,36 +27,62 @@ def get_db_config():
         'port': int(os.getenv('DB_PORT', '5432'))
     }
 
-def parse_money_value(value_str):
-    """Parse money values from CSV, handling various formats"""
-    if pd.isna(value_str) or value_str == '' or str(value_str).strip() == '':
-        return None
-    
-    value_str = str(value_str).strip()
-    
-    # Handle empty or dash values
-    if value_str == '-' or value_str == '':
-        return None
-    
-    # Handle parentheses (negative values)
-    if value_str.startswith('(') and value_str.endswith(')'):
-        # Extract the number and make it negative
-        number_str = value_str[1:-1].replace('$', '').replace(',', '').strip()
-        try:
-            return -float(number_str)
-        except:
-            return None
-    
-    # Handle regular positive values
+# Money columns parsed once per load with whole-column operations
+MONEY_COLUMNS = [
+    ' Purchase Price ', ' List Price ', ' Sell price ', ' Gross Amount Earned ',
+    ' Net Profit/Loss '
+]
+
+def bulk_rows(df):
+    """Prepare product, inventory and sales rows for the COPY bulk loader
+
+    Money columns must already be parsed.
+    """
+    products, inventory, sales = [], [], []
+
+    for row in df.itertuples(index=False, name=None):
+        (item_number, brand_product_name, brand, purchase_price, list_price, sell_price,
+         gross_amount, net_profit, purchase_date) = row
+        item_number = str(item_number) if pd.notna(item_number) else None
+        if not item_number:
+            continue
+
+        if pd.notna(brand_product_name) and str(brand_product_name):
+            name = str(brand_product_name)
+            brand = str(brand) if pd.notna(brand) else None
+            products.append((item_number, name, f"Product: {name}", brand))
+
+        inventory.append(
+            (item_number, 1, purchase_price, list_price, True, purchase_date)
+        )
+
+        # Only create sales records if there's a sell price
+        if sell_price and sell_price > 0:
+            sales.append(
+                (item_number, 1, sell_price, gross_amount, net_profit, None, None, None)
+            )
+
+    return products, inventory, sales
+
+def execute_row(cursor, query, params):
+    """Run one row's statement inside a savepoint; returns its RETURNING row, if any
+
+    A failing row is rolled back on its own, so the rest of the batch (and the
+    checkpoint saved with it) still commits.
+    """
+    cursor.execute("SAVEPOINT migrate_row")
     try:
-        # Remove $ and commas
-        clean_value = value_str.replace('$', '').replace(',', '').strip()
-        return float(clean_value) if clean_value else None
-    except:
-        return None
-
-def main():
-    """Main migration function"""
+        cursor.execute(query, params)
+        returned = cursor.fetchone() if cursor.description else None
+    except Exception:
+        cursor.execute("ROLLBACK TO SAVEPOINT migrate_row")
+        raise
+    cursor.execute("RELEASE SAVEPOINT migrate_row")
+    return returned
+
+def main(bulk=False, batch_size=500, adaptive_batches=False, resume=False,
+         csv_file=None):
+    """Main migration function; returns True when the migration completes"""
     print("🚀 Starting Simple CSV Migration")
     print("=" * 50)
     
@@ -61,42 +92,94 @@ def main():
         print("✅ Connected to database")
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
-        return
+        return False
     
     cursor = conn.cursor()
     
     # Read CSV file
-    csv_file = "/Users/makaminski1337/Developer/LV/data/inputs/Platform Luxx Base Data.csv"
+    csv_file = csv_file or (
+        "/Users/makaminski1337/Developer/LV/data/inputs/Platform Luxx Base Data.csv"
+    )
     try:
         df = pd.read_csv(csv_file)
         print(f"📊 Loaded {len(df)} records from CSV")
+        
+        # Decimal/None values can be passed straight to psycopg2
+        for column in MONEY_COLUMNS:
+            df[column] = parse_money_column(df[column], as_decimal=True)
+        purchase_dates = parse_date_column(df['Purchase_Date'])
+        df['Purchase_Date'] = purchase_dates.dt.date.astype(object).where(
+            purchase_dates.notna(), None
+        )
     except Exception as e:
         print(f"❌ Error reading CSV: {e}")
-        return
+        return False
     
-    # Clear existing data
-    print("\n🧹 Clearing existing data...")
-    try:
-        cursor.execute("DELETE FROM sales")
-        cursor.execute("DELETE FROM inventory")
-        cursor.execute("DELETE FROM products")
-        cursor.execute("DELETE FROM brands")
-        conn.commit()
-        print("✅ Cleared existing data")
-    except Exception as e:
-        print(f"❌ Error clearing data: {e}")
-        return
+    # Each stage commits its rows together with a watermark so --resume can pick up
+    # from there
+    checkpoints = CheckpointStore(conn, csv_file)
+    checkpoints.ensure_table()
+    watermarks = checkpoints.load() if resume else {}
+    sizer = BatchSizer(batch_size, adaptive=adaptive_batches)
+    
+    def commit_batch(stage, position, pending):
+        """Commit a batch with its watermark; False (and nothing saved) on failure"""
+        try:
+            checkpoints.save(cursor, stage, position)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Error committing {stage} batch: {e}")
+            return False
+        sizer.finish(pending)
+        sizer.start()
+        return True
+    
+    # Brand and product ids are kept in memory so later stages never look them up
+    # per row
+    brand_ids = {}
+    product_ids = {}
+    
+    if watermarks:
+        print(f"\n⏩ Resuming from checkpoint: {watermarks}")
+        brand_ids = fetch_key_map(cursor, 'brands', 'name')
+        product_ids = fetch_key_map(cursor, 'products', 'item_inventory_number')
+    else:
+        if resume:
+            print("\nℹ️  No checkpoint found, starting fresh")
+        
+        # Clear existing data
+        print("\n🧹 Clearing existing data...")
+        try:
+            cursor.execute("DELETE FROM sales")
+            cursor.execute("DELETE FROM inventory")
+            cursor.execute("DELETE FROM products")
+            cursor.execute("DELETE FROM brands")
+            conn.commit()
+            checkpoints.clear()
+            print("✅ Cleared existing data")
+        except Exception as e:
+            print(f"❌ Error clearing data: {e}")
+            return False
     
     # Migrate brands first
     print("\n🏷️  Migrating brands...")
     brands_migrated = 0
-    unique_brands = df['Brand'].dropna().unique()
+    unique_brands = [
+        brand for brand in df['Brand'].dropna().unique()
+        if str(brand) not in brand_ids
+    ]
     
     for brand in unique_brands:
         if brand and str(brand).strip():
             try:
-                cursor.execute("INSERT INTO brands (name, description) VALUES (%s, %s)", 
-                             (brand, f"Brand: {brand}"))
+                inserted = execute_row(
+                    cursor,
+                    "INSERT INTO brands (name, description) VALUES (%s, %s) "
+                    "RETURNING id",
+                    (brand, f"Brand: {brand}")
+                )
+                brand_ids[str(brand)] = inserted[0]
                 brands_migrated += 1
             except Exception as e:
                 print(f"  ⚠️  Error adding brand {brand}: {e}")
@@ -105,123 +188,173 @@ def main():
     conn.commit()
     print(f"✅ Migrated {brands_migrated} brands")
     
+    if bulk:
+        # Stream everything through COPY staging tables in one transaction
+        print("\n🚚 Bulk loading products, inventory and sales...")
+        products, inventory, sales = bulk_rows(df[[
+            'Item Inventory #', 'Brand + Product Name', 'Brand', ' Purchase Price ',
+            ' List Price ', ' Sell price ', ' Gross Amount Earned ',
+            ' Net Profit/Loss ', 'Purchase_Date'
+        ]])
+        try:
+            counts = BulkLoader(conn).load(
+                products=products, inventory=inventory, sales=sales
+            )
+        except Exception as e:
+            print(f"❌ Error bulk loading data: {e}")
+            return False
+        
+        print("\n" + "=" * 50)
+        print("📊 Migration Summary:")
+        print(f"  🏷️  Brands: {brands_migrated}")
+        print(f"  📦 Products: {counts['products']}")
+        print(f"  📊 Inventory: {counts['inventory']}")
+        print(f"  💰 Sales: {counts['sales']}")
+        print("✅ Migration completed successfully!")
+        
+        cursor.close()
+        conn.close()
+        return True
+    
     # Migrate products
     print("\n📦 Migrating products...")
     products_migrated = 0
+    start, pending = watermarks.get('products', 0), 0
+    sizer.start()
     
-    for _, row in df.iterrows():
+    for position, (_, row) in enumerate(df.iterrows()):
+        if position < start:
+            continue
         try:
             item_number = str(row['Item Inventory #']) if pd.notna(row['Item Inventory #']) else None
             brand_product_name = str(row['Brand + Product Name']) if pd.notna(row['Brand + Product Name']) else ''
             brand = str(row['Brand']) if pd.notna(row['Brand']) else ''
             
             if item_number and brand_product_name:
-                # Get brand ID
-                brand_id = None
-                if brand:
-                    cursor.execute("SELECT id FROM brands WHERE name = %s", (brand,))
-                    brand_result = cursor.fetchone()
-                    if brand_result:
-                        brand_id = brand_result[0]
+                brand_id = brand_ids.get(brand)
                 
                 # Create product name
                 name = brand_product_name if brand_product_name else ''
                 
-                cursor.execute(
-                    "INSERT INTO products (item_inventory_number, name, description, brand_id) VALUES (%s, %s, %s, %s)",
+                # Repeated item numbers keep the first product instead of aborting
+                # the batch
+                inserted = execute_row(
+                    cursor,
+                    "INSERT INTO products "
+                    "(item_inventory_number, name, description, brand_id) "
+                    "VALUES (%s, %s, %s, %s) "
+                    "ON CONFLICT (item_inventory_number) DO NOTHING RETURNING id",
                     (item_number, name, f"Product: {name}", brand_id)
                 )
-                products_migrated += 1
-                
-                # Commit every 10 products to avoid long transactions
-                if products_migrated % 10 == 0:
-                    conn.commit()
-                    print(f"  ✅ Migrated {products_migrated} products so far...")
+                if inserted:
+                    product_ids[item_number] = inserted[0]
+                    products_migrated += 1
                 
         except Exception as e:
             print(f"  ⚠️  Error processing product {row.get('Item Inventory #', 'Unknown')}: {e}")
-            continue
+        
+        # Commit in batches to avoid long transactions
+        pending += 1
+        if pending >= sizer.size:
+            if not commit_batch('products', position + 1, pending):
+                return False
+            pending = 0
+            print(f"  ✅ Migrated {products_migrated} products so far...")
     
-    conn.commit()
+    if not commit_batch('products', len(df), pending):
+        return False
     print(f"✅ Migrated {products_migrated} products")
     
     # Migrate inventory
     print("\n📊 Migrating inventory...")
     inventory_migrated = 0
+    start, pending = watermarks.get('inventory', 0), 0
+    sizer.start()
     
-    for _, row in df.iterrows():
+    for position, (_, row) in enumerate(df.iterrows()):
+        if position < start:
+            continue
         try:
             item_number = str(row['Item Inventory #']) if pd.notna(row['Item Inventory #']) else None
             
             if item_number:
-                # Get product ID
-                cursor.execute("SELECT id FROM products WHERE item_inventory_number = %s", (item_number,))
-                product_result = cursor.fetchone()
+                product_id = product_ids.get(item_number)
                 
-                if product_result:
-                    product_id = product_result[0]
+                if product_id:
                     
-                    # Parse prices
-                    purchase_price = parse_money_value(row[' Purchase Price '])
-                    list_price = parse_money_value(row[' List Price '])
+                    purchase_price = row[' Purchase Price ']
+                    list_price = row[' List Price ']
+                    purchase_date = row['Purchase_Date']
                     
-                    cursor.execute(
-                        "INSERT INTO inventory (product_id, quantity, purchase_price, list_price, is_listed) VALUES (%s, %s, %s, %s, %s)",
-                        (product_id, 1, purchase_price, list_price, True)
+                    execute_row(
+                        cursor,
+                        "INSERT INTO inventory (product_id, quantity, purchase_price, "
+                        "list_price, is_listed, purchase_date) "
+                        "VALUES (%s, %s, %s, %s, %s, %s)",
+                        (product_id, 1, purchase_price, list_price, True, purchase_date)
                     )
                     inventory_migrated += 1
-                    
-                    # Commit every 10 records
-                    if inventory_migrated % 10 == 0:
-                        conn.commit()
-                        print(f"  ✅ Migrated {inventory_migrated} inventory records so far...")
                 
         except Exception as e:
             print(f"  ⚠️  Error processing inventory for {row.get('Item Inventory #', 'Unknown')}: {e}")
-            continue
+        
+        # Commit in batches to avoid long transactions
+        pending += 1
+        if pending >= sizer.size:
+            if not commit_batch('inventory', position + 1, pending):
+                return False
+            pending = 0
+            print(f"  ✅ Migrated {inventory_migrated} inventory records so far...")
     
-    conn.commit()
+    if not commit_batch('inventory', len(df), pending):
+        return False
     print(f"✅ Migrated {inventory_migrated} inventory records")
     
     # Migrate sales
     print("\n💰 Migrating sales...")
     sales_migrated = 0
+    start, pending = watermarks.get('sales', 0), 0
+    sizer.start()
     
-    for _, row in df.iterrows():
+    for position, (_, row) in enumerate(df.iterrows()):
+        if position < start:
+            continue
         try:
             item_number = str(row['Item Inventory #']) if pd.notna(row['Item Inventory #']) else None
             
             if item_number:
-                # Get product ID
-                cursor.execute("SELECT id FROM products WHERE item_inventory_number = %s", (item_number,))
-                product_result = cursor.fetchone()
+                product_id = product_ids.get(item_number)
                 
-                if product_result:
-                    product_id = product_result[0]
+                if product_id:
                     
-                    # Parse sales data
-                    sell_price = parse_money_value(row[' Sell price '])
-                    gross_amount = parse_money_value(row[' Gross Amount Earned '])
-                    net_profit = parse_money_value(row[' Net Profit/Loss '])
+                    sell_price = row[' Sell price ']
+                    gross_amount = row[' Gross Amount Earned ']
+                    net_profit = row[' Net Profit/Loss ']
                     
                     # Only create sales records if there's a sell price
                     if sell_price and sell_price > 0:
-                        cursor.execute(
-                            "INSERT INTO sales (product_id, quantity_sold, sell_price, gross_amount_earned, net_profit_loss) VALUES (%s, %s, %s, %s, %s)",
+                        execute_row(
+                            cursor,
+                            "INSERT INTO sales (product_id, quantity_sold, sell_price, "
+                            "gross_amount_earned, net_profit_loss) "
+                            "VALUES (%s, %s, %s, %s, %s)",
                             (product_id, 1, sell_price, gross_amount, net_profit)
                         )
                         sales_migrated += 1
-                        
-                        # Commit every 10 records
-                        if sales_migrated % 10 == 0:
-                            conn.commit()
-                            print(f"  ✅ Migrated {sales_migrated} sales records so far...")
                 
         except Exception as e:
             print(f"  ⚠️  Error processing sale for {row.get('Item Inventory #', 'Unknown')}: {e}")
-            continue
+        
+        # Commit in batches to avoid long transactions
+        pending += 1
+        if pending >= sizer.size:
+            if not commit_batch('sales', position + 1, pending):
+                return False
+            pending = 0
+            print(f"  ✅ Migrated {sales_migrated} sales records so far...")
     
-    conn.commit()
+    if not commit_batch('sales', len(df), pending):
+        return False
     print(f"✅ Migrated {sales_migrated} sales records")
     
     # Final summary
@@ -233,8 +366,36 @@ def main():
     print(f"  💰 Sales: {sales_migrated}")
     print("✅ Migration completed successfully!")
     
+    # The run finished; the next one starts fresh
+    checkpoints.clear()
+    
     cursor.close()
     conn.close()
+    return True
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Simple CSV migration")
+    parser.add_argument(
+        "--csv-file",
+        help="CSV export to migrate (defaults to Platform Luxx Base Data.csv)"
+    )
+    parser.add_argument(
+        "--bulk", action="store_true", help="Load through COPY staging tables"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=500,
+        help="Rows per committed, checkpointed batch"
+    )
+    parser.add_argument(
+        "--adaptive-batches", action="store_true",
+        help="Grow or shrink batches to keep each commit near one second"
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Continue from the last committed batch of an interrupted run"
+    )
+    args = parser.parse_args()
+
+    main(bulk=args.bulk, batch_size=args.batch_size,
+         adaptive_batches=args.adaptive_batches, resume=args.resume,
+         csv_file=args.csv_file) 
\ No newline at end of file
@@ -6,9 +6,21 @@ Routine script to update database with new CSV data
 
 import os
 import sys
+import argparse
 import pandas as pd
 from datetime import datetime
-from csv_migrator import CSVDataMigrator
+from migrate_csv_data import CSVDataMigrator
+from csv_normalize import parse_money_column
+
+def get_csv_files(inputs_dir="data/inputs"):
+    """Get every CSV file in the inputs directory, oldest to newest by modification time"""
+    if not os.path.exists(inputs_dir):
+        return []
+    
+    csv_paths = [os.path.join(inputs_dir, f) for f in os.listdir(inputs_dir) if f.endswith('.csv')]
+    
+    # Ties on modification time fall back to the file name so the order is deterministic
+    return sorted(csv_paths, key=lambda path: (os.path.getmtime(path), os.path.basename(path)))
 
 def get_latest_csv_file():
     """Get the most recent CSV file from the inputs directory"""
@@ -18,17 +30,16 @@ def get_latest_csv_file():
         print(f"❌ Inputs directory not found: {inputs_dir}")
         return None
     
-    csv_files = [f for f in os.listdir(inputs_dir) if f.endswith('.csv')]
+    csv_files = get_csv_files(inputs_dir)
     
     if not csv_files:
         print(f"❌ No CSV files found in {inputs_dir}")
         return None
     
     # Get the most recent file by modification time
-    latest_file = max(csv_files, key=lambda f: os.path.getmtime(os.path.join(inputs_dir, f)))
-    latest_path = os.path.join(inputs_dir, latest_file)
+    latest_path = csv_files[-1]
     
-    print(f"📁 Found latest CSV file: {latest_file}")
+    print(f"📁 Found latest CSV file: {os.path.basename(latest_path)}")
     return latest_path
 
 def backup_database():
@@ -49,35 +60,37 @@ def backup_database():
         print(f"❌ Backup failed: {e}")
         return False
 
-def analyze_csv_data(csv_file):
-    """Analyze the CSV data before migration"""
+def analyze_csv_data(csv_file, chunk_size=50000):
+    """Analyze the CSV data before migration, reading it in fixed-size chunks"""
     print(f"\n📊 Analyzing CSV data: {csv_file}")
     
     try:
-        df = pd.read_csv(csv_file)
-        
-        print(f"  📈 Total records: {len(df)}")
-        print(f"  🏷️  Unique brands: {df['Brand'].nunique()}")
-        print(f"  👥 Unique sellers: {df['seller'].nunique()}")
+        total_records = 0
+        sold_count = 0
+        total_revenue = 0.0
+        total_profit = 0.0
+        brands = set()
+        sellers = set()
         
-        # Count sold items
-        sold_items = df[df[' Sell price '].notna() & (df[' Sell price '] != '')]
-        print(f"  💰 Sold items: {len(sold_items)}")
+        # Only running totals and the distinct brand/seller sets are kept between chunks
+        for df in pd.read_csv(csv_file, chunksize=chunk_size):
+            total_records += len(df)
+            brands.update(df['Brand'].dropna())
+            sellers.update(df['seller'].dropna())
+            
+            sold_items = df[df[' Sell price '].notna() & (df[' Sell price '] != '')]
+            sold_count += len(sold_items)
+            total_revenue += parse_money_column(sold_items[' Gross Amount Earned ']).sum()
+            total_profit += parse_money_column(sold_items[' Net Profit/Loss ']).sum()
         
-        # Count unsold items
-        unsold_items = df[df[' Sell price '].isna() | (df[' Sell price '] == '')]
-        print(f"  📦 Unsold items: {len(unsold_items)}")
+        print(f"  📈 Total records: {total_records}")
+        print(f"  🏷️  Unique brands: {len(brands)}")
+        print(f"  👥 Unique sellers: {len(sellers)}")
+        print(f"  💰 Sold items: {sold_count}")
+        print(f"  📦 Unsold items: {total_records - sold_count}")
         
         # Calculate total revenue and profit
-        if len(sold_items) > 0:
-            total_revenue = sold_items[' Gross Amount Earned '].apply(
-                lambda x: float(str(x).replace('$', '').replace(',', '')) if pd.notna(x) and str(x).strip() else 0
-            ).sum()
-            
-            total_profit = sold_items[' Net Profit/Loss '].apply(
-                lambda x: float(str(x).replace('$', '').replace(',', '')) if pd.notna(x) and str(x).strip() else 0
-            ).sum()
-            
+        if sold_count > 0:
             print(f"  💵 Total revenue: ${total_revenue:,.2f}")
             print(f"  💸 Total profit: ${total_profit:,.2f}")
         
@@ -87,7 +100,7 @@ def analyze_csv_data(csv_file):
         print(f"❌ Error analyzing CSV: {e}")
         return False
 
-def main():
+def main(full=False, chunk_size=None):
     """Main weekly update process"""
     print("🔄 LV Project Weekly Data Update")
     print("=" * 50)
@@ -106,10 +119,10 @@ def main():
     if not backup_database():
         print("⚠️  Continuing without backup...")
     
-    # Step 4: Run migration
-    print(f"\n🚀 Starting migration with: {csv_file}")
+    # Step 4: Run migration (incremental unless a full reload is requested)
+    print(f"\n🚀 Starting {'full' if full else 'incremental'} migration with: {csv_file}")
     
-    migrator = CSVDataMigrator(csv_file)
+    migrator = CSVDataMigrator(csv_file, incremental=not full, chunk_size=chunk_size)
     success = migrator.run_migration()
     
     if success:
@@ -123,5 +136,16 @@ def main():
     return success
 
 if __name__ == "__main__":
-    success = main()
+    parser = argparse.ArgumentParser(description="Weekly data update")
+    parser.add_argument(
+        "--full", action="store_true",
+        help="Wipe and reload everything instead of applying only changed rows"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int,
+        help="With --full, stream the file in chunks of this many rows to keep memory flat"
+    )
+    args = parser.parse_args()
+
+    success = main(full=args.full, chunk_size=args.chunk_size)
     sys.exit(0 if success else 1) 
\ No newline at end of file
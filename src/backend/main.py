@@ -4,18 +4,48 @@ LV Project Backend API
 Feature 2: Input Screen Replacement
 """
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import (
+    FastAPI, HTTPException, Depends, Query, Request, Response, BackgroundTasks
+)
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey, text
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import (
+    event, create_engine, Column, String, Integer, Float, Boolean, DateTime, Text,
+    ForeignKey, text, table, column, insert
+)
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import ProgrammingError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
+from pydantic import BaseModel, ValidationError
+from typing import List, Optional, Union
+from datetime import date, datetime, timedelta
+from collections import OrderedDict, deque
+import bisect
+import functools
+import hashlib
+import threading
+import time
 import uuid
 import os
+import json
+import random
+import re
+import base64
+import csv
+import io
+from decimal import Decimal
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # optional; the standard library encoder is used instead
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
@@ -33,13 +63,113 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Database configuration from environment variables
-DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://makaminski1337@localhost/lv_project")
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+DATABASE_URL = os.getenv(
+    "DATABASE_URL", "postgresql://makaminski1337@localhost/lv_project"
+)
+
+# DB_ASYNC=true serves every query through an asyncpg engine on the event loop;
+# otherwise queries run on the synchronous engine in the threadpool
+ASYNC_DB = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL",
+    make_url(DATABASE_URL)
+    .set(drivername="postgresql+asyncpg")
+    .render_as_string(hide_password=False)
+)
+
+# Pool sizing; pre-ping and recycle drop connections the server or a proxy has closed
+POOL_SETTINGS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    "pool_pre_ping": (
+        os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    ),
+}
+
+class PoolStats:
+    """Checkout counts and wait times, shared by whichever pool the engine uses"""
+
+    def __init__(self, window=1000):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent_waits = deque(maxlen=window)
+
+    def record(self, wait, timed_out=False):
+        with self.lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                self.recent_waits.append(wait)
+
+    def snapshot(self):
+        with self.lock:
+            recent = sorted(self.recent_waits)
+            average = self.total_wait / self.checkouts if self.checkouts else 0
+            p95 = recent[int(len(recent) * 0.95) - 1] if recent else 0
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(average * 1000, 3),
+                "wait_ms_p95": round(p95 * 1000, 3),
+                "wait_ms_max": round(self.max_wait * 1000, 3),
+            }
+
+pool_stats = PoolStats()
+
+class TimedPoolMixin:
+    """Times how long each checkout waits for a free connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            wait = time.perf_counter() - started
+            pool_stats.record(wait, timed_out=True)
+            metrics.db_session_wait(wait, timed_out=True)
+            raise
+        wait = time.perf_counter() - started
+        pool_stats.record(wait)
+        metrics.db_session_wait(wait)
+        return connection
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+if ASYNC_DB:
+    try:
+        engine = create_async_engine(
+            ASYNC_DATABASE_URL, poolclass=TimedAsyncQueuePool, **POOL_SETTINGS
+        )
+        SessionLocal = async_sessionmaker(
+            engine, autoflush=False, expire_on_commit=False
+        )
+    except ImportError as e:
+        print(f"⚠️  Async database driver unavailable ({e}); "
+              "using the synchronous engine")
+        ASYNC_DB = False
+
+if not ASYNC_DB:
+    engine = create_engine(DATABASE_URL, poolclass=TimedQueuePool, **POOL_SETTINGS)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
 Base = declarative_base()
+DBSession = Union[AsyncSession, Session]
 
 # Pydantic models for API
 class ProductBase(BaseModel):
@@ -67,6 +197,7 @@ class InventoryBase(BaseModel):
     floor_earnings: Optional[float] = None
     need_to_make: Optional[float] = None
     list_price: Optional[float] = None
+    purchase_date: Optional[date] = None
     is_listed: bool = False
     notes: Optional[str] = None
 
@@ -103,46 +234,725 @@ class Sale(SaleBase):
     class Config:
         from_attributes = True
 
-# Database dependency
-def get_db():
-    db = SessionLocal()
+# Fast JSON responses
+# List routes return rows straight from the database, which already match their
+# response_model; TrustedJSONResponse skips pydantic re-validation and encodes with
+# orjson when it is installed. response_model stays on the route for the OpenAPI schema.
+def json_default(value):
+    """Encode the database types the standard encoders do not handle"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dump_json(content) -> bytes:
+    """Compact UTF-8 JSON, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(content, default=json_default)
+    return json.dumps(
+        content, default=json_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+class TrustedJSONResponse(JSONResponse):
+    """JSON response for trusted rows
+
+    FastAPI passes Response objects through unvalidated.
+    """
+
+    def render(self, content) -> bytes:
+        return dump_json(content)
+
+def trusted_json(content, response: Response):
+    """TrustedJSONResponse carrying headers set on the route's response (cursors)"""
+    return TrustedJSONResponse(content, headers=dict(response.headers))
+
+# Metrics
+# Per-route latency, request, in-flight and error counts, errors that handlers swallow,
+# and how long sessions wait for a pooled connection; served at /metrics in the
+# Prometheus text exposition format
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Bucketed observations; the owning Metrics lock guards updates"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        # One slot per bucket plus +Inf; cumulated when rendered
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+def format_labels(labels):
+    """Render a label set as {name="value",...}"""
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        value = value.replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+class Metrics:
+    """Request and database metrics for the whole process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}        # (method, route, status) -> count
+        self.errors = {}          # (method, route) -> 5xx and unhandled exceptions
+        self.in_flight = {}       # (method, route) -> requests being served
+        self.latency = {}         # (method, route) -> Histogram
+        self.handler_errors = {}  # (handler, exception) -> errors caught and logged
+        self.db_wait = Histogram()
+        self.db_timeouts = 0
+        self.db_statements = Histogram()
+
+    def request_started(self, method, route):
+        with self.lock:
+            self.in_flight[(method, route)] = self.in_flight.get((method, route), 0) + 1
+
+    def request_finished(self, method, route, status, duration):
+        key = (method, route)
+        with self.lock:
+            self.in_flight[key] -= 1
+            counter = (method, route, status)
+            self.requests[counter] = self.requests.get(counter, 0) + 1
+            if status >= 500:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            if key not in self.latency:
+                self.latency[key] = Histogram()
+            self.latency[key].observe(duration)
+
+    def handler_error(self, handler, error):
+        key = (handler, type(error).__name__)
+        with self.lock:
+            self.handler_errors[key] = self.handler_errors.get(key, 0) + 1
+
+    def db_statement(self, duration):
+        with self.lock:
+            self.db_statements.observe(duration)
+
+    def db_session_wait(self, wait, timed_out=False):
+        with self.lock:
+            if timed_out:
+                self.db_timeouts += 1
+            else:
+                self.db_wait.observe(wait)
+
+    def render(self, gauges=()):
+        """Text exposition of every metric
+
+        gauges are extra (name, help, value) samples.
+        """
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{format_labels(labels)} {value}")
+
+        def histogram_samples(histogram, labels):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                cumulative += count
+                yield "_bucket", {**labels, "le": bound}, cumulative
+            yield "_sum", labels, histogram.sum
+            yield "_count", labels, histogram.count
+
+        with self.lock:
+            family("lv_http_requests_total", "counter", "HTTP requests served", [
+                ("", {"method": method, "route": route, "status": status}, count)
+                for (method, route, status), count in sorted(self.requests.items())
+            ])
+            family(
+                "lv_http_request_errors_total", "counter",
+                "HTTP requests ending in a 5xx or an unhandled exception", [
+                    ("", {"method": method, "route": route}, count)
+                    for (method, route), count in sorted(self.errors.items())
+                ]
+            )
+            family(
+                "lv_http_requests_in_flight", "gauge",
+                "HTTP requests currently being served", [
+                    ("", {"method": method, "route": route}, count)
+                    for (method, route), count in sorted(self.in_flight.items())
+                ]
+            )
+            family(
+                "lv_http_request_duration_seconds", "histogram",
+                "HTTP request latency, through the last body chunk", [
+                    sample
+                    for (method, route), histogram in sorted(self.latency.items())
+                    for sample in histogram_samples(
+                        histogram, {"method": method, "route": route}
+                    )
+                ]
+            )
+            family(
+                "lv_handler_errors_total", "counter",
+                "Errors caught and logged by a handler", [
+                    ("", {"handler": handler, "exception": exception}, count)
+                    for (handler, exception), count
+                    in sorted(self.handler_errors.items())
+                ]
+            )
+            family(
+                "lv_db_session_wait_seconds", "histogram",
+                "Time database sessions waited for a pooled connection",
+                list(histogram_samples(self.db_wait, {}))
+            )
+            family(
+                "lv_db_statement_duration_seconds", "histogram",
+                "Time spent executing SQL statements",
+                list(histogram_samples(self.db_statements, {}))
+            )
+            family(
+                "lv_db_session_timeouts_total", "counter",
+                "Sessions that gave up waiting for a pooled connection",
+                [("", {}, self.db_timeouts)]
+            )
+
+        for name, help_text, value in gauges:
+            family(name, "gauge", help_text, [("", {}, value)])
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+def report_error(handler, error):
+    """Log an error a handler catches, and count it so fallbacks stay visible"""
+    print(f"Error in {handler}: {error}")
+    metrics.handler_error(handler, error)
+
+def route_label(scope):
+    """Route template for a request, e.g. /api/products/{product_id}
+
+    Using templates rather than raw paths keeps label values bounded.
+    """
+    partial = None
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "unmatched"
+
+class MetricsMiddleware:
+    """Records every HTTP request
+
+    Timing runs until the body is sent, so streamed exports count in full.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, route = scope["method"], route_label(scope)
+        # Stays 500 if the app raises before starting a response
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        metrics.request_started(method, route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - started
+            metrics.request_finished(method, route, status["code"], duration)
+
+app.add_middleware(MetricsMiddleware)
+
+# Slow query log
+# Engine events time every statement; those over SLOW_QUERY_MS go into a bounded
+# buffer with their parameter types, and a sample of slow reads is explained so a
+# regressed plan can be seen without attaching a profiler. Only reads that cannot write
+# are re-run under EXPLAIN (ANALYZE, BUFFERS); every other SELECT gets a plain EXPLAIN
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "100"))
+EXPLAIN_SAMPLE_RATE = float(os.getenv("EXPLAIN_SAMPLE_RATE", "0.1"))
+
+def redact_parameters(parameters):
+    """Parameter names and types without their values, which can hold customer data"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany: one set of parameters per row
+            return {"rows": len(parameters), "first": redact_parameters(parameters[0])}
+        return [type(value).__name__ for value in parameters]
+    return None if parameters is None else type(parameters).__name__
+
+class SlowQueryLog:
+    """Ring buffer of the most recent slow statements"""
+
+    def __init__(self, size=SLOW_QUERY_LOG_SIZE):
+        self.lock = threading.Lock()
+        self.entries = deque(maxlen=size)
+
+    def record(self, statement, parameters, duration, plan=None):
+        entry = {
+            "statement": " ".join(statement.split()),
+            # The log is served over HTTP, so only the shape of the parameters is kept
+            "parameters": redact_parameters(parameters),
+            "duration_ms": round(duration * 1000, 3),
+            "timestamp": datetime.now(),
+            "plan": plan,
+        }
+        with self.lock:
+            self.entries.append(entry)
+
+    def slowest(self, limit):
+        with self.lock:
+            ranked = sorted(
+                self.entries, key=lambda entry: entry["duration_ms"], reverse=True
+            )
+            return ranked[:limit]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+slow_query_log = SlowQueryLog()
+
+# Relations EXPLAIN ANALYZE may read: tables and materialized views, never plain views
+EXPLAIN_ANALYZE_TABLES = frozenset([
+    "users", "brands", "products", "inventory", "sales", "data_versions",
+    "sales_daily_rollup", "mv_top_products", "mv_brand_profit", "mv_analytics_summary",
+])
+# Names allowed before "(": side-effect-free built-ins and SQL keywords
+EXPLAIN_ANALYZE_CALLS = frozenset([
+    "count", "sum", "avg", "min", "max", "coalesce", "nullif", "round", "cast",
+    "greatest", "least", "abs", "lower", "upper", "date_trunc", "generate_series",
+    "any", "all", "in", "exists", "over", "filter", "values", "as", "and", "or", "not",
+    "on", "where", "select", "from", "join", "using", "lateral",
+])
+SQL_LITERAL = re.compile(r"'(?:[^']|'')*'")
+SQL_CALL = re.compile(r"\b([a-z_][a-z0-9_.]*)\s*\(")
+SQL_RELATION = re.compile(r"\b(?:from|join)\s+([a-z_][a-z0-9_.]*)\b(?!\s*\()")
+# SELECT INTO, row locks, multiple statements and quoted names (which can hide calls)
+SQL_UNSAFE = re.compile(
+    r'\binto\b|\bfor\s+(?:no\s+key\s+|key\s+)?(?:update|share)\b|[;"]'
+)
+
+def explain_analyze_safe(statement):
+    """True for a SELECT that only reads known tables through built-in functions
+
+    EXPLAIN ANALYZE executes the statement, so function calls (which may write),
+    row locks, SELECT INTO and multiple statements all rule it out.
+    """
+    sql = statement.lower()
+    if not sql.lstrip().startswith("select") or SQL_UNSAFE.search(sql):
+        return False
+    if any(name not in EXPLAIN_ANALYZE_CALLS for name in SQL_CALL.findall(sql)):
+        return False
+    return all(name in EXPLAIN_ANALYZE_TABLES for name in SQL_RELATION.findall(sql))
+
+def capture_plan(conn, statement, parameters):
+    """EXPLAIN lines for a slow read, or None
+
+    Runs on the statement's own connection inside a savepoint, so a failed EXPLAIN
+    cannot abort the request's transaction. Only SELECTs are explained, and only those
+    explain_analyze_safe accepts get ANALYZE and BUFFERS, since ANALYZE executes the
+    statement again.
+    """
+    if conn.dialect.name != "postgresql":
+        return None
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return None
+    if explain_analyze_safe(statement):
+        explain = "EXPLAIN (ANALYZE, BUFFERS) "
+    else:
+        explain = "EXPLAIN "
+    cursor = conn.connection.cursor()
     try:
-        yield db
+        cursor.execute("SAVEPOINT explain_capture")
+        try:
+            cursor.execute(explain + statement, parameters)
+            # Bound values are inlined into the plan's conditions; mask string literals
+            plan = [SQL_LITERAL.sub("'?'", row[0]) for row in cursor.fetchall()]
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT explain_capture")
+            report_error("capture_plan", e)
+            return None
+        cursor.execute("RELEASE SAVEPOINT explain_capture")
+        return plan
+    except Exception as e:
+        report_error("capture_plan", e)
+        return None
     finally:
-        db.close()
+        cursor.close()
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.query_started = time.perf_counter()
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "query_started", None)
+    if started is None:
+        return
+    duration = time.perf_counter() - started
+    metrics.db_statement(duration)
+    if duration * 1000 < SLOW_QUERY_MS:
+        return
+    plan = None
+    if not executemany and random.random() < EXPLAIN_SAMPLE_RATE:
+        plan = capture_plan(conn, statement, parameters)
+    slow_query_log.record(statement, parameters, duration, plan)
+
+def watch_statements(target):
+    """Time every statement run through a (synchronous) engine"""
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    event.listen(target, "after_cursor_execute", after_cursor_execute)
+
+# Async engines emit their events on the synchronous engine they wrap
+watch_statements(engine.sync_engine if ASYNC_DB else engine)
+
+# Database dependency
+async def get_db():
+    if ASYNC_DB:
+        async with SessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+
+async def execute(db: DBSession, statement, params=None):
+    """Execute on either session type without blocking the event loop"""
+    if isinstance(db, AsyncSession):
+        return await db.execute(statement, params)
+    return await run_in_threadpool(db.execute, statement, params)
+
+async def commit(db: DBSession):
+    """Commit either session type"""
+    if isinstance(db, AsyncSession):
+        await db.commit()
+    else:
+        await run_in_threadpool(db.commit)
+
+async def rollback(db: DBSession):
+    """Roll back either session type, e.g. after a failed statement"""
+    if isinstance(db, AsyncSession):
+        await db.rollback()
+    else:
+        await run_in_threadpool(db.rollback)
+
+# Response caching and conditional GETs. Both are keyed on data_versions counters, so
+# ingestion (via the triggers) and API writes (via invalidate) make them stale without
+# waiting for the TTL
+ANALYTICS_TABLES = ["brands", "products", "inventory", "sales", "analytics_views"]
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+# How long one data_versions read is trusted; bounds version queries under heavy polling
+DATA_VERSION_INTERVAL = float(os.getenv("DATA_VERSION_INTERVAL", "1.0"))
+
+class ResponseCache:
+    """LRU + TTL cache of route results, keyed by route and query parameters"""
+
+    def __init__(self, maxsize=256, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, version):
+        entry = self.entries.get(key)
+        fresh = entry and entry[1] > time.monotonic()
+        if fresh and entry[0] == (version, self.generation):
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        return None
+
+    def set(self, key, version, value):
+        expires = time.monotonic() + self.ttl
+        self.entries[key] = ((version, self.generation), expires, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self):
+        """Make every entry stale; called by API write paths"""
+        self.generation += 1
+        data_version_memo["checked"] = 0.0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0,
+            "evictions": self.evictions,
+            "generation": self.generation,
+        }
+
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+data_version_memo = {"value": None, "checked": 0.0}
+
+async def table_versions(db: DBSession, request: Optional[Request] = None):
+    """{table: change counter} from data_versions
+
+    Re-read at most every DATA_VERSION_INTERVAL. None when the database has no change
+    tracking; caching and ETags are then skipped. Passing the request reuses one
+    reading for everything that handles it.
+    """
+    if request is not None and hasattr(request.state, "table_versions"):
+        return request.state.table_versions
+
+    now = time.monotonic()
+    versions = data_version_memo["value"]
+    if versions is None or now - data_version_memo["checked"] >= DATA_VERSION_INTERVAL:
+        try:
+            result = await execute(
+                db, text("SELECT table_name, version FROM data_versions")
+            )
+            versions = {name: int(version) for name, version in result.all()}
+            data_version_memo.update(value=versions, checked=now)
+        except Exception as e:
+            report_error("table_versions", e)
+            await rollback(db)
+            versions = None
+
+    if request is not None:
+        request.state.table_versions = versions
+    return versions
+
+async def data_version(db: DBSession, tables, request: Optional[Request] = None):
+    """Combined change counter of tables, or None if unavailable"""
+    versions = await table_versions(db, request)
+    if versions is None:
+        return None
+    return sum(versions.get(table, 0) for table in tables)
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+def conditional_get(*tables):
+    """Answer If-None-Match with 304 while tables are unchanged
+
+    The route is not run for a 304. The ETag covers the path, query parameters, the
+    tables' versions and the cache generation bumped by API writes. The route must
+    take request, response and db.
+    """
+    def decorator(route):
+        @functools.wraps(route)
+        async def wrapper(**kwargs):
+            request, response, db = kwargs["request"], kwargs["response"], kwargs["db"]
+            versions = await table_versions(db, request)
+            if versions is None:
+                return await route(**kwargs)
+
+            stamp = [
+                request.url.path,
+                sorted(request.query_params.multi_items()),
+                [versions.get(table, 0) for table in tables],
+                response_cache.generation
+            ]
+            digest = hashlib.blake2b(json.dumps(stamp).encode(), digest_size=12)
+            etag = 'W/"' + digest.hexdigest() + '"'
+            # no-cache lets browsers keep the body but revalidate on every fetch
+            headers = {"ETag": etag, "Cache-Control": "no-cache"}
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=headers)
+
+            # Validators go only on results the route returned; failures raise, so an
+            # error body never gets an ETag a client could revalidate
+            result = await route(**kwargs)
+            target = result if isinstance(result, Response) else response
+            target.headers.update(headers)
+            return result
+        return wrapper
+    return decorator
+
+def cached_response(route):
+    """Serve a route's result from response_cache until the data version changes
+
+    The route must take request and db parameters, and raise rather than return a
+    fallback when its queries fail, so errors are never cached.
+    """
+    @functools.wraps(route)
+    async def wrapper(**kwargs):
+        request, db = kwargs["request"], kwargs["db"]
+        key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+        version = await data_version(db, ANALYTICS_TABLES, request)
+        if version is not None:
+            cached = response_cache.get(key, version)
+            if cached is not None:
+                return cached
+
+        result = await route(**kwargs)
+        if version is not None:
+            response_cache.set(key, version, result)
+        return result
+    return wrapper
 
 # API Routes
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "LV Project API", "version": "1.0.0"}
 
 @app.get("/health")
-def health_check():
+async def health_check():
     return {"status": "healthy", "timestamp": datetime.now()}
 
+def engine_pool():
+    """The connection pool behind either engine"""
+    return engine.sync_engine.pool if ASYNC_DB else engine.pool
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus text exposition of request and database metrics"""
+    pool = engine_pool()
+    body = metrics.render(gauges=[
+        ("lv_db_pool_size", "Connections kept open by the pool", pool.size()),
+        ("lv_db_pool_checked_out", "Pooled connections currently in use",
+         pool.checkedout()),
+    ])
+    return Response(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Admin API
+@app.get("/api/admin/pool")
+async def get_pool_stats():
+    """Connection pool saturation and checkout wait times"""
+    pool = engine_pool()
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": POOL_SETTINGS["max_overflow"],
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # Negative until the base pool is fully in use
+        "overflow": pool.overflow(),
+        **pool_stats.snapshot()
+    }
+
+@app.post("/api/admin/refresh-analytics")
+async def refresh_analytics(db: DBSession = Depends(get_db)):
+    """Refresh the materialized analytics views, e.g. after manual SQL changes"""
+    if not await refresh_analytics_views(db):
+        raise HTTPException(
+            status_code=503, detail="Analytics views could not be refreshed"
+        )
+    return {"refreshed": True, "timestamp": datetime.now()}
+
+@app.get("/api/admin/cache")
+async def get_cache_stats():
+    """Analytics response cache hit and miss counts"""
+    return response_cache.stats()
+
+@app.get("/api/admin/slow-queries")
+async def get_slow_queries(limit: int = Query(20, ge=1, le=1000)):
+    """Slowest recent statements, with sampled EXPLAIN (ANALYZE, BUFFERS) plans"""
+    return {
+        "threshold_ms": SLOW_QUERY_MS,
+        "explain_sample_rate": EXPLAIN_SAMPLE_RATE,
+        "statements": slow_query_log.slowest(limit)
+    }
+
+@app.delete("/api/admin/slow-queries")
+async def clear_slow_queries():
+    """Empty the slow query log, e.g. after deploying a fix"""
+    slow_query_log.clear()
+    return {"cleared": True}
+
 # Products API
+def encode_cursor(created_at, product_id):
+    """Opaque cursor pointing just past the last row of a page"""
+    payload = json.dumps([created_at.isoformat(), product_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor):
+    """Decode a cursor from encode_cursor into (created_at, id)"""
+    try:
+        created_at, product_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), str(uuid.UUID(product_id))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @app.get("/api/products", response_model=List[Product])
-def get_products(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all products with pagination"""
-    # This would query the actual database
-    # For now, return mock data
-    return [
-        {
-            "id": str(uuid.uuid4()),
-            "item_inventory_number": "LV001",
-            "name": "Sample Product",
-            "description": "A sample product",
-            "brand_id": None,
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
-        }
-    ]
+@conditional_get("products")
+async def get_products(
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    brand_id: Optional[uuid.UUID] = None,
+    db: DBSession = Depends(get_db)
+):
+    """Get products in (created_at, id) order with keyset pagination
+
+    Pass the X-Next-Cursor header of one page as ?cursor= to fetch the next; the
+    header is absent on the last page.
+    """
+    filters = []
+    params = {"limit": limit + 1}
+    if brand_id:
+        filters.append("brand_id = CAST(:brand_id AS uuid)")
+        params["brand_id"] = str(brand_id)
+    if cursor:
+        # Seek past the previous page instead of OFFSET, so every page costs the same
+        params["after_created_at"], params["after_id"] = decode_cursor(cursor)
+        filters.append(
+            "(created_at, id) > (:after_created_at, CAST(:after_id AS uuid))"
+        )
+
+    try:
+        query = text(f"""
+        SELECT id::text AS id, item_inventory_number, name, description,
+               brand_id::text AS brand_id, created_at, updated_at
+        FROM products
+        {"WHERE " + " AND ".join(filters) if filters else ""}
+        ORDER BY created_at, id
+        LIMIT :limit
+        """)
+        rows = (await execute(db, query, params)).mappings().all()
+    except Exception as e:
+        # Fail loudly; an empty page would be cached by clients under its ETag
+        report_error("get_products", e)
+        raise HTTPException(status_code=500, detail="Products could not be loaded")
+
+    # One extra row tells us whether another page exists
+    products = [dict(row) for row in rows[:limit]]
+    if len(rows) > limit:
+        last = products[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+        response.headers["X-Next-Cursor"] = next_cursor
+    return trusted_json(products, response)
 
 @app.post("/api/products", response_model=Product)
-def create_product(product: ProductCreate, db: Session = Depends(get_db)):
+async def create_product(product: ProductCreate, db: DBSession = Depends(get_db)):
     """Create a new product"""
     # This would insert into the actual database
+    response_cache.invalidate()
     return {
         "id": str(uuid.uuid4()),
         **product.dict(),
@@ -151,7 +961,7 @@ def create_product(product: ProductCreate, db: Session = Depends(get_db)):
     }
 
 @app.get("/api/products/{product_id}", response_model=Product)
-def get_product(product_id: str, db: Session = Depends(get_db)):
+async def get_product(product_id: str, db: DBSession = Depends(get_db)):
     """Get a specific product by ID"""
     # This would query the actual database
     return {
@@ -164,11 +974,263 @@ def get_product(product_id: str, db: Session = Depends(get_db)):
         "updated_at": datetime.now()
     }
 
+# Exports
+# Rows come from a server-side cursor EXPORT_BATCH_SIZE at a time and are written out as
+# they arrive, so API memory does not depend on the size of the export
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+SALES_EXPORT_QUERY = """
+SELECT s.id, s.product_id, p.item_inventory_number, p.name AS product_name,
+       s.quantity_sold, s.sell_price, s.gross_amount_earned, s.net_profit_loss,
+       s.percent_profit, s.date_sold, s.days_held, s.notes, s.created_at
+FROM sales s
+JOIN products p ON p.id = s.product_id
+{where}
+ORDER BY s.created_at, s.id
+"""
+
+INVENTORY_EXPORT_QUERY = """
+SELECT i.id, i.product_id, p.item_inventory_number, p.name AS product_name,
+       i.quantity, i.purchase_price, i.list_price, i.purchase_date, i.is_listed,
+       i.notes, i.created_at, i.updated_at
+FROM inventory i
+JOIN products p ON p.id = i.product_id
+ORDER BY i.created_at, i.id
+"""
+
+def render_export_header(columns):
+    """CSV header line from the result's column names, written even for empty exports"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(columns)
+    return buffer.getvalue()
+
+def render_export_rows(rows, export_format):
+    """Render a batch of row mappings as CSV text or NDJSON bytes
+
+    NDJSON is encoded like the API responses, so money columns are numbers.
+    """
+    if export_format == "ndjson":
+        return b"".join(dump_json(dict(row)) + b"\n" for row in rows)
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(row.values() for row in rows)
+    return buffer.getvalue()
+
+def stream_export_sync(statement, params, export_format):
+    """Stream through a psycopg2 named cursor on a session of its own
+
+    Runs in the threadpool.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            statement, params,
+            execution_options={"stream_results": True, "yield_per": EXPORT_BATCH_SIZE}
+        )
+        if export_format == "csv":
+            yield render_export_header(result.keys())
+        for rows in result.mappings().partitions():
+            yield render_export_rows(rows, export_format)
+    except Exception as e:
+        # Headers are already sent; re-raising aborts the connection so the client
+        # sees a failed download rather than a truncated file that looks complete
+        report_error("stream_export", e)
+        raise
+    finally:
+        db.close()
+
+async def stream_export_async(statement, params, export_format):
+    """Stream through an asyncpg server-side cursor on a session of its own"""
+    try:
+        async with SessionLocal() as db:
+            result = await db.stream(
+                statement, params, execution_options={"yield_per": EXPORT_BATCH_SIZE}
+            )
+            if export_format == "csv":
+                yield render_export_header(result.keys())
+            async for rows in result.mappings().partitions():
+                yield render_export_rows(rows, export_format)
+    except Exception as e:
+        # See stream_export_sync: abort rather than end a truncated file cleanly
+        report_error("stream_export", e)
+        raise
+
+def export_response(name, statement, params, export_format):
+    """StreamingResponse for an export; the session lives as long as the stream"""
+    stream = stream_export_async if ASYNC_DB else stream_export_sync
+    media_type = "application/x-ndjson" if export_format == "ndjson" else "text/csv"
+    return StreamingResponse(
+        stream(statement, params, export_format),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{export_format}"'
+        }
+    )
+
+# Bulk create
+# Records are validated and inserted BULK_BATCH_SIZE at a time, one multi-row INSERT
+# and one transaction per batch
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "500"))
+
+# Columns written by the bulk endpoints; model fields without a schema_v2 column are
+# dropped
+inventory_table = table(
+    "inventory", column("id"), column("product_id"), column("quantity"),
+    column("purchase_price"), column("list_price"), column("purchase_date"),
+    column("is_listed"), column("notes")
+)
+sales_table = table(
+    "sales", column("id"), column("product_id"), column("quantity_sold"),
+    column("sell_price"), column("gross_amount_earned"), column("net_profit_loss"),
+    column("percent_profit"), column("date_sold"), column("days_held"), column("notes")
+)
+
+def parse_bulk_line(line):
+    """Parse one NDJSON line into (record, error)"""
+    try:
+        return json.loads(line), None
+    except ValueError as e:
+        return None, f"Invalid JSON: {e}"
+
+async def iter_bulk_records(request: Request):
+    """Yield (record, error) from a JSON array body
+
+    NDJSON bodies are read line by line as they stream in.
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        # Only the new chunk is scanned for line breaks, and the partial line grows
+        # in place, so a line spread over many chunks is not copied again each time
+        buffer = bytearray()
+        async for chunk in request.stream():
+            start = 0
+            end = chunk.find(b"\n")
+            while end != -1:
+                buffer += chunk[start:end]
+                if buffer.strip():
+                    yield parse_bulk_line(buffer)
+                buffer.clear()
+                start = end + 1
+                end = chunk.find(b"\n", start)
+            buffer += chunk[start:]
+        if buffer.strip():
+            yield parse_bulk_line(buffer)
+        return
+
+    try:
+        records = json.loads(await request.body())
+    except ValueError:
+        records = None
+    if not isinstance(records, list):
+        raise HTTPException(
+            status_code=400, detail="Body must be a JSON array or NDJSON"
+        )
+    for record in records:
+        yield record, None
+
+def describe_validation_error(error: ValidationError):
+    """Flatten a pydantic error into "field: message" pairs"""
+    return "; ".join(
+        f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors()
+    )
+
+async def insert_bulk_batch(db: DBSession, target, model, batch):
+    """Validate one batch of (index, record, error)
+
+    The valid rows are inserted in one statement.
+    """
+    results, rows = {}, []
+    columns = set(target.c.keys()) - {"id"}
+
+    for index, record, error in batch:
+        if error is None:
+            try:
+                row = model.model_validate(record).model_dump(include=columns)
+                row["product_id"] = str(uuid.UUID(row["product_id"]))
+                if isinstance(row.get("date_sold"), datetime):
+                    row["date_sold"] = row["date_sold"].date()
+                rows.append((index, row))
+                continue
+            except ValidationError as e:
+                error = describe_validation_error(e)
+            except ValueError:
+                error = "product_id: must be a UUID"
+        results[index] = {"index": index, "status": "error", "error": error}
+
+    try:
+        if rows:
+            # One lookup per batch instead of a foreign key failure aborting it
+            found = await execute(
+                db,
+                text("SELECT id::text FROM products "
+                     "WHERE id = ANY(CAST(:ids AS uuid[]))"),
+                {"ids": list({row["product_id"] for _, row in rows})}
+            )
+            known = set(found.scalars().all())
+            for index, row in rows:
+                if row["product_id"] not in known:
+                    results[index] = {
+                        "index": index, "status": "error",
+                        "error": "product_id: unknown product"
+                    }
+            rows = [(index, row) for index, row in rows if row["product_id"] in known]
+
+        if rows:
+            statement = (
+                insert(target).values([row for _, row in rows]).returning(target.c.id)
+            )
+            new_ids = (await execute(db, statement)).scalars().all()
+            await commit(db)
+            for (index, _), new_id in zip(rows, new_ids):
+                results[index] = {
+                    "index": index, "status": "created", "id": str(new_id)
+                }
+    except Exception as e:
+        report_error(f"bulk_insert_{target.name}", e)
+        await rollback(db)
+        for index, _ in rows:
+            results[index] = {
+                "index": index, "status": "error", "error": "batch insert failed"
+            }
+
+    return [results[index] for index, _, _ in batch]
+
+async def create_bulk(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: DBSession,
+    target,
+    model
+):
+    """Stream records from the body through batched inserts; returns per-row results"""
+    results, batch = [], []
+    index = 0
+    async for record, error in iter_bulk_records(request):
+        batch.append((index, record, error))
+        index += 1
+        if len(batch) >= BULK_BATCH_SIZE:
+            results.extend(await insert_bulk_batch(db, target, model, batch))
+            batch = []
+    if batch:
+        results.extend(await insert_bulk_batch(db, target, model, batch))
+
+    created = sum(result["status"] == "created" for result in results)
+    if created:
+        response_cache.invalidate()
+        background_tasks.add_task(refresh_analytics_in_background)
+    return {"created": created, "failed": len(results) - created, "results": results}
+
 # Inventory API
 @app.get("/api/inventory", response_model=List[Inventory])
-def get_inventory(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@conditional_get("inventory")
+async def get_inventory(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    db: DBSession = Depends(get_db)
+):
     """Get all inventory items"""
-    return [
+    return trusted_json([
         {
             "id": str(uuid.uuid4()),
             "product_id": str(uuid.uuid4()),
@@ -178,16 +1240,20 @@ def get_inventory(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
             "floor_earnings": 30.00,
             "need_to_make": 35.00,
             "list_price": 45.00,
+            "purchase_date": date.today(),
             "is_listed": True,
             "notes": "Sample inventory item",
             "created_at": datetime.now(),
             "updated_at": datetime.now()
         }
-    ]
+    ], response)
 
 @app.post("/api/inventory", response_model=Inventory)
-def create_inventory_item(inventory: InventoryCreate, db: Session = Depends(get_db)):
+async def create_inventory_item(
+    inventory: InventoryCreate, db: DBSession = Depends(get_db)
+):
     """Create a new inventory item"""
+    response_cache.invalidate()
     return {
         "id": str(uuid.uuid4()),
         **inventory.dict(),
@@ -195,11 +1261,36 @@ def create_inventory_item(inventory: InventoryCreate, db: Session = Depends(get_
         "updated_at": datetime.now()
     }
 
+@app.get("/api/inventory/export")
+async def export_inventory(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$")
+):
+    """Stream every inventory item as CSV or NDJSON"""
+    return export_response("inventory", text(INVENTORY_EXPORT_QUERY), {}, export_format)
+
+@app.post("/api/inventory/bulk")
+async def create_inventory_bulk(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: DBSession = Depends(get_db)
+):
+    """Create many inventory items from a JSON array or NDJSON body"""
+    return await create_bulk(
+        request, background_tasks, db, inventory_table, InventoryCreate
+    )
+
 # Sales API
 @app.get("/api/sales", response_model=List[Sale])
-def get_sales(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@conditional_get("sales")
+async def get_sales(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    db: DBSession = Depends(get_db)
+):
     """Get all sales"""
-    return [
+    return trusted_json([
         {
             "id": str(uuid.uuid4()),
             "product_id": str(uuid.uuid4()),
@@ -214,36 +1305,157 @@ def get_sales(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
             "notes": "Sample sale",
             "created_at": datetime.now()
         }
-    ]
+    ], response)
 
 @app.post("/api/sales", response_model=Sale)
-def create_sale(sale: SaleCreate, db: Session = Depends(get_db)):
+async def create_sale(sale: SaleCreate, db: DBSession = Depends(get_db)):
     """Create a new sale"""
+    response_cache.invalidate()
     return {
         "id": str(uuid.uuid4()),
         **sale.dict(),
         "created_at": datetime.now()
     }
 
+@app.get("/api/sales/export")
+async def export_sales(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Stream sales as CSV or NDJSON, optionally limited to a date_sold range"""
+    filters, params = [], {}
+    if date_from:
+        filters.append("s.date_sold >= :date_from")
+        params["date_from"] = date_from
+    if date_to:
+        filters.append("s.date_sold <= :date_to")
+        params["date_to"] = date_to
+    where = "WHERE " + " AND ".join(filters) if filters else ""
+    statement = text(SALES_EXPORT_QUERY.format(where=where))
+    return export_response("sales", statement, params, export_format)
+
+@app.post("/api/sales/bulk")
+async def create_sales_bulk(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: DBSession = Depends(get_db)
+):
+    """Create many sales from a JSON array or NDJSON body, e.g. a POS export"""
+    return await create_bulk(request, background_tasks, db, sales_table, SaleCreate)
+
 # Analytics API
+# Aggregates are read from materialized views (see schema_v2.sql) that are refreshed
+# after ingestion and API writes; the live queries are the fallback for databases
+# created before the views existed
+TOP_PRODUCTS_VIEW = """
+SELECT product_name, revenue, units_sold
+FROM mv_top_products
+ORDER BY revenue DESC
+LIMIT 10
+"""
+
+TOP_PRODUCTS_LIVE = """
+SELECT 
+    p.name as product_name,
+    COALESCE(SUM(s.sell_price * s.quantity_sold), 0) as revenue,
+    COALESCE(SUM(s.quantity_sold), 0) as units_sold
+FROM products p
+LEFT JOIN sales s ON p.id = s.product_id
+GROUP BY p.id, p.name
+ORDER BY revenue DESC
+LIMIT 10
+"""
+
+BRAND_PROFIT_VIEW = """
+SELECT brand, total_profit, avg_margin, total_sales
+FROM mv_brand_profit
+ORDER BY total_profit DESC
+"""
+
+BRAND_PROFIT_LIVE = """
+SELECT 
+    b.name as brand,
+    COALESCE(SUM(s.net_profit_loss), 0) as total_profit,
+    COALESCE(AVG(s.percent_profit), 0) as avg_margin,
+    COUNT(s.id) as total_sales
+FROM brands b
+LEFT JOIN products p ON b.id = p.brand_id
+LEFT JOIN sales s ON p.id = s.product_id
+GROUP BY b.id, b.name
+ORDER BY total_profit DESC
+"""
+
+SUMMARY_VIEW = """
+SELECT total_products, total_sales, total_revenue, total_profit, avg_margin
+FROM mv_analytics_summary
+"""
+
+# One scan of sales; the product count is a separate index-only count
+SUMMARY_LIVE = """
+SELECT
+    (SELECT COUNT(*) FROM products) as total_products,
+    COUNT(*) as total_sales,
+    COALESCE(SUM(s.sell_price * s.quantity_sold), 0) as total_revenue,
+    COALESCE(SUM(s.net_profit_loss), 0) as total_profit,
+    COALESCE(AVG(s.percent_profit), 0) as avg_margin
+FROM sales s
+"""
+
+async def query_analytics(db: DBSession, view_query, live_query, params=None):
+    """Read an aggregate from its materialized view, or live if the view is missing"""
+    try:
+        return await execute(db, text(view_query), params)
+    except ProgrammingError as e:
+        # Counted like other handled errors so a missing view shows up in /metrics
+        report_error("query_analytics", e)
+        await rollback(db)
+        return await execute(db, text(live_query), params)
+
+async def refresh_analytics_views(db: DBSession):
+    """Refresh the materialized analytics views without blocking readers"""
+    try:
+        await execute(db, text("SELECT refresh_analytics_views()"))
+        await commit(db)
+        return True
+    except Exception as e:
+        report_error("refresh_analytics_views", e)
+        await rollback(db)
+        return False
+
+# One refresh at a time; requests arriving meanwhile are folded into one more run
+analytics_refresh = {"running": False, "pending": False}
+
+async def refresh_analytics_in_background():
+    """Refresh the analytics views on a session of its own
+
+    Runs after the response is sent.
+    """
+    if analytics_refresh["running"]:
+        analytics_refresh["pending"] = True
+        return
+    analytics_refresh["running"] = True
+    try:
+        while True:
+            analytics_refresh["pending"] = False
+            async for db in get_db():
+                await refresh_analytics_views(db)
+            if not analytics_refresh["pending"]:
+                break
+    finally:
+        analytics_refresh["running"] = False
+
 @app.get("/api/analytics/top-products")
-def get_top_products(db: Session = Depends(get_db)):
+@conditional_get(*ANALYTICS_TABLES)
+@cached_response
+async def get_top_products(
+    request: Request,
+    response: Response,
+    db: DBSession = Depends(get_db)
+):
     """Get top selling products by revenue"""
     try:
-        # Query top products by revenue from sales
-        query = text("""
-        SELECT 
-            p.name as product_name,
-            COALESCE(SUM(s.sell_price * s.quantity_sold), 0) as revenue,
-            COALESCE(SUM(s.quantity_sold), 0) as units_sold
-        FROM products p
-        LEFT JOIN sales s ON p.id = s.product_id
-        GROUP BY p.id, p.name
-        ORDER BY revenue DESC
-        LIMIT 10
-        """)
-        
-        result = db.execute(query)
+        result = await query_analytics(db, TOP_PRODUCTS_VIEW, TOP_PRODUCTS_LIVE)
         top_by_revenue = [
             {
                 "product_name": row.product_name,
@@ -255,28 +1467,20 @@ def get_top_products(db: Session = Depends(get_db)):
         
         return {"top_by_revenue": top_by_revenue}
     except Exception as e:
-        print(f"Error in get_top_products: {e}")
-        return {"top_by_revenue": []}
+        report_error("get_top_products", e)
+        raise HTTPException(status_code=500, detail="Top products could not be loaded")
 
 @app.get("/api/analytics/profit-analysis")
-def get_profit_analysis(db: Session = Depends(get_db)):
+@conditional_get(*ANALYTICS_TABLES)
+@cached_response
+async def get_profit_analysis(
+    request: Request,
+    response: Response,
+    db: DBSession = Depends(get_db)
+):
     """Get profit analysis by brand (categories removed from schema)"""
     try:
-        # Query profit by brand
-        brand_query = text("""
-        SELECT 
-            b.name as brand,
-            COALESCE(SUM(s.net_profit_loss), 0) as total_profit,
-            COALESCE(AVG(s.percent_profit), 0) as avg_margin,
-            COUNT(s.id) as total_sales
-        FROM brands b
-        LEFT JOIN products p ON b.id = p.brand_id
-        LEFT JOIN sales s ON p.id = s.product_id
-        GROUP BY b.id, b.name
-        ORDER BY total_profit DESC
-        """)
-        
-        brand_result = db.execute(brand_query)
+        brand_result = await query_analytics(db, BRAND_PROFIT_VIEW, BRAND_PROFIT_LIVE)
         by_brand = [
             {
                 "brand": row.brand,
@@ -288,22 +1492,12 @@ def get_profit_analysis(db: Session = Depends(get_db)):
         ]
         
         # Since categories table was removed, we'll provide a summary instead
-        summary_query = text("""
-        SELECT 
-            COUNT(DISTINCT p.id) as total_products,
-            COUNT(s.id) as total_sales,
-            COALESCE(SUM(s.net_profit_loss), 0) as total_profit,
-            COALESCE(AVG(s.percent_profit), 0) as avg_margin
-        FROM products p
-        LEFT JOIN sales s ON p.id = s.product_id
-        """)
-        
-        summary_result = db.execute(summary_query).fetchone()
+        row = (await query_analytics(db, SUMMARY_VIEW, SUMMARY_LIVE)).fetchone()
         summary = {
-            "total_products": int(summary_result.total_products) if summary_result else 0,
-            "total_sales": int(summary_result.total_sales) if summary_result else 0,
-            "total_profit": float(summary_result.total_profit) if summary_result else 0,
-            "avg_margin": float(summary_result.avg_margin) if summary_result else 0
+            "total_products": int(row.total_products) if row else 0,
+            "total_sales": int(row.total_sales) if row else 0,
+            "total_profit": float(row.total_profit) if row else 0,
+            "avg_margin": float(row.avg_margin) if row else 0
         }
         
         return {
@@ -311,67 +1505,255 @@ def get_profit_analysis(db: Session = Depends(get_db)):
             "summary": summary
         }
     except Exception as e:
-        print(f"Error in get_profit_analysis: {e}")
-        return {
-            "by_brand": [],
-            "summary": {
-                "total_products": 0,
-                "total_sales": 0,
-                "total_profit": 0,
-                "avg_margin": 0
-            }
-        }
+        report_error("get_profit_analysis", e)
+        raise HTTPException(
+            status_code=500, detail="Profit analysis could not be loaded"
+        )
 
 @app.get("/api/analytics/summary")
-def get_analytics_summary(db: Session = Depends(get_db)):
+@conditional_get(*ANALYTICS_TABLES)
+@cached_response
+async def get_analytics_summary(
+    request: Request,
+    response: Response,
+    db: DBSession = Depends(get_db)
+):
     """Get summary statistics"""
     try:
-        # Total revenue
-        revenue_query = text("""
-        SELECT COALESCE(SUM(s.sell_price * s.quantity_sold), 0) as total_revenue
-        FROM sales s
-        """)
-        revenue_result = db.execute(revenue_query).fetchone()
-        total_revenue = float(revenue_result.total_revenue) if revenue_result else 0
-        
-        # Total profit
-        profit_query = text("""
-        SELECT COALESCE(SUM(s.net_profit_loss), 0) as total_profit
-        FROM sales s
-        """)
-        profit_result = db.execute(profit_query).fetchone()
-        total_profit = float(profit_result.total_profit) if profit_result else 0
-        
-        # Total products
-        products_query = text("""
-        SELECT COUNT(*) as total_products
-        FROM products
-        """)
-        products_result = db.execute(products_query).fetchone()
-        total_products = int(products_result.total_products) if products_result else 0
-        
-        # Total sales
-        sales_query = text("""
-        SELECT COUNT(*) as total_sales
-        FROM sales
-        """)
-        sales_result = db.execute(sales_query).fetchone()
-        total_sales = int(sales_result.total_sales) if sales_result else 0
-        
+        row = (await query_analytics(db, SUMMARY_VIEW, SUMMARY_LIVE)).fetchone()
         return {
-            "totalRevenue": total_revenue,
-            "totalProfit": total_profit,
-            "totalProducts": total_products,
-            "totalSales": total_sales
+            "totalRevenue": float(row.total_revenue) if row else 0,
+            "totalProfit": float(row.total_profit) if row else 0,
+            "totalProducts": int(row.total_products) if row else 0,
+            "totalSales": int(row.total_sales) if row else 0
         }
     except Exception as e:
-        print(f"Error in get_analytics_summary: {e}")
-        return {
-            "totalRevenue": 0,
-            "totalProfit": 0,
-            "totalProducts": 0,
-            "totalSales": 0
-        }
+        report_error("get_analytics_summary", e)
+        raise HTTPException(status_code=500, detail="Summary could not be loaded")
+
+# Daily sales series, read from the trigger-maintained sales_daily_rollup (a few rows
+# per day) instead of scanning sales. Every day in the range is present, zero-filled,
+# and the moving averages also see the days just before date_from
+SALES_DAILY_SOURCES = {
+    "rollup": """
+    SELECT sale_date, SUM(revenue) AS revenue, SUM(net_profit) AS profit,
+           SUM(units_sold) AS units, SUM(sales_count) AS sales
+    FROM sales_daily_rollup
+    WHERE sale_date BETWEEN :series_from AND :date_to {brand_filter}
+    GROUP BY sale_date
+    """,
+    "live": """
+    SELECT s.date_sold AS sale_date, SUM(s.sell_price * s.quantity_sold) AS revenue,
+           COALESCE(SUM(s.net_profit_loss), 0) AS profit,
+           SUM(s.quantity_sold) AS units, COUNT(*) AS sales
+    FROM sales s
+    JOIN products p ON p.id = s.product_id
+    WHERE s.date_sold BETWEEN :series_from AND :date_to {brand_filter}
+    GROUP BY s.date_sold
+    """,
+}
+
+SALES_DAILY_SERIES = """
+SELECT * FROM (
+    SELECT
+        day.sale_date,
+        COALESCE(daily.revenue, 0) AS revenue,
+        COALESCE(daily.profit, 0) AS profit,
+        COALESCE(daily.units, 0) AS units,
+        COALESCE(daily.sales, 0) AS sales,
+        AVG(COALESCE(daily.revenue, 0)) OVER moving AS revenue_ma,
+        AVG(COALESCE(daily.profit, 0)) OVER moving AS profit_ma,
+        AVG(COALESCE(daily.units, 0)) OVER moving AS units_ma
+    FROM (
+        SELECT CAST(day AS date) AS sale_date
+        FROM generate_series(
+            CAST(:series_from AS date), CAST(:date_to AS date), interval '1 day'
+        ) AS day
+    ) day
+    LEFT JOIN ({source}) daily ON daily.sale_date = day.sale_date
+    WINDOW moving AS (
+        ORDER BY day.sale_date ROWS BETWEEN {preceding} PRECEDING AND CURRENT ROW
+    )
+) series
+WHERE sale_date >= :date_from
+ORDER BY sale_date
+"""
+
+# Longest range one request may ask for
+SALES_DAILY_MAX_DAYS = 3660
+
+def sales_daily_query(source, brand_filter, window):
+    """Series query over one daily source; window is a validated int"""
+    daily = SALES_DAILY_SOURCES[source].format(brand_filter=brand_filter)
+    return SALES_DAILY_SERIES.format(source=daily, preceding=window - 1)
+
+@app.get("/api/analytics/sales/daily")
+@conditional_get(*ANALYTICS_TABLES)
+@cached_response
+async def get_sales_daily(
+    request: Request,
+    response: Response,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    brand_id: Optional[str] = None,
+    window: int = Query(7, ge=1, le=365),
+    db: DBSession = Depends(get_db)
+):
+    """Revenue, profit and units per day
+
+    Each day also carries trailing moving averages over window days.
+    """
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=89)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=400, detail="date_from must not be after date_to"
+        )
+    if (date_to - date_from).days >= SALES_DAILY_MAX_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Date range is limited to {SALES_DAILY_MAX_DAYS} days"
+        )
+
+    params = {
+        "date_from": date_from,
+        "date_to": date_to,
+        "series_from": date_from - timedelta(days=window - 1),
+    }
+    rollup_filter = live_filter = ""
+    if brand_id:
+        try:
+            params["brand_id"] = str(uuid.UUID(brand_id))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid brand_id")
+        rollup_filter = "AND brand_id = CAST(:brand_id AS uuid)"
+        live_filter = "AND p.brand_id = CAST(:brand_id AS uuid)"
+
+    result = {
+        "date_from": date_from.isoformat(),
+        "date_to": date_to.isoformat(),
+        "brand_id": params.get("brand_id"),
+        "window": window,
+        "days": []
+    }
+    try:
+        rows = await query_analytics(
+            db,
+            sales_daily_query("rollup", rollup_filter, window),
+            sales_daily_query("live", live_filter, window),
+            params
+        )
+        result["days"] = [
+            {
+                "date": row.sale_date.isoformat(),
+                "revenue": float(row.revenue),
+                "profit": float(row.profit),
+                "units": int(row.units),
+                "sales": int(row.sales),
+                "revenue_ma": round(float(row.revenue_ma), 2),
+                "profit_ma": round(float(row.profit_ma), 2),
+                "units_ma": round(float(row.units_ma), 2)
+            }
+            for row in rows
+        ]
+    except Exception as e:
+        report_error("get_sales_daily", e)
+        raise HTTPException(status_code=500, detail="Daily sales could not be loaded")
+    return result
+
+# Inventory aging
+# Stock on hand (quantity > 0 and never sold) bucketed by days since purchase. Every
+# bucket is a purchase_date range over idx_inventory_purchase_date, so the whole
+# histogram is a handful of index range scans rather than a pass over inventory
+AGING_BUCKET_QUERY = """
+SELECT {bucket} AS bucket, COUNT(*) AS items,
+       COALESCE(SUM(i.purchase_price * i.quantity), 0) AS capital
+FROM inventory i
+WHERE i.quantity > 0 AND {condition}
+  AND NOT EXISTS (SELECT 1 FROM sales s WHERE s.product_id = i.product_id)
+"""
+
+def parse_aging_buckets(spec):
+    """Bucket (label, min_days, max_days) list from ascending day boundaries
+
+    e.g. 30,60,90
+    """
+    try:
+        bounds = [int(value) for value in spec.split(",")]
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="buckets must be comma-separated day counts"
+        )
+    ascending = all(a < b for a, b in zip(bounds, bounds[1:]))
+    if not 1 <= len(bounds) <= 12 or bounds[0] < 1 or not ascending:
+        raise HTTPException(
+            status_code=400,
+            detail="buckets must be 1 to 12 ascending positive day counts"
+        )
+
+    lower = [0] + [bound + 1 for bound in bounds]
+    buckets = [(f"{low}-{high}", low, high) for low, high in zip(lower, bounds)]
+    buckets.append((f"{lower[-1]}+", lower[-1], None))
+    return buckets
+
+@app.get("/api/analytics/inventory/aging")
+@conditional_get(*ANALYTICS_TABLES)
+@cached_response
+async def get_inventory_aging(
+    request: Request,
+    response: Response,
+    as_of: Optional[date] = None,
+    buckets: str = "30,60,90,180,365",
+    deadstock_days: int = Query(90, ge=1),
+    db: DBSession = Depends(get_db)
+):
+    """Unsold items and capital tied up per age bucket
+
+    Also reports deadstock, items older than deadstock_days.
+    """
+    as_of = as_of or date.today()
+    aging_buckets = parse_aging_buckets(buckets)
+
+    # Ages become purchase_date bounds: age between low and high days
+    params = {"deadstock_before": as_of - timedelta(days=deadstock_days)}
+    selects = []
+    for index, (_, low, high) in enumerate(aging_buckets):
+        params[f"to_{index}"] = as_of - timedelta(days=low)
+        if high is None:
+            condition = f"i.purchase_date <= :to_{index}"
+        else:
+            params[f"from_{index}"] = as_of - timedelta(days=high)
+            condition = f"i.purchase_date BETWEEN :from_{index} AND :to_{index}"
+        selects.append(AGING_BUCKET_QUERY.format(bucket=index, condition=condition))
+    unknown, deadstock = len(aging_buckets), len(aging_buckets) + 1
+    selects.append(AGING_BUCKET_QUERY.format(
+        bucket=unknown, condition="i.purchase_date IS NULL"
+    ))
+    selects.append(AGING_BUCKET_QUERY.format(
+        bucket=deadstock, condition="i.purchase_date <= :deadstock_before"
+    ))
+
+    totals = {index: {"items": 0, "capital": 0.0} for index in range(deadstock + 1)}
+    try:
+        for row in await execute(db, text(" UNION ALL ".join(selects)), params):
+            totals[row.bucket] = {
+                "items": int(row.items), "capital": float(row.capital)
+            }
+    except Exception as e:
+        report_error("get_inventory_aging", e)
+        raise HTTPException(
+            status_code=500, detail="Inventory aging could not be loaded"
+        )
+
+    return {
+        "as_of": as_of.isoformat(),
+        "buckets": [
+            {"label": label, "min_days": low, "max_days": high, **totals[index]}
+            for index, (label, low, high) in enumerate(aging_buckets)
+        ],
+        "unknown_purchase_date": totals[unknown],
+        "deadstock": {"days": deadstock_days, **totals[deadstock]}
+    }
 
 if __name__ == "__main__":
     import uvicorn
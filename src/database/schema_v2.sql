@@ -50,6 +50,7 @@ CREATE TABLE inventory (
     quantity INTEGER NOT NULL DEFAULT 0,
     purchase_price DECIMAL(10,2),
     list_price DECIMAL(10,2),
+    purchase_date DATE,
     is_listed BOOLEAN DEFAULT FALSE,
     notes TEXT,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
@@ -76,15 +77,55 @@ CREATE TABLE sales (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- =====================================================
+-- INGESTION BOOKKEEPING
+-- =====================================================
+
+-- Per-item row fingerprints from the last CSV load (incremental weekly syncs)
+CREATE TABLE ingest_fingerprints (
+    item_inventory_number VARCHAR(50) PRIMARY KEY,
+    row_hash BIGINT NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Per-stage watermarks of interrupted CSV loads (--resume)
+CREATE TABLE ingest_checkpoints (
+    source VARCHAR(500) NOT NULL,
+    stage VARCHAR(50) NOT NULL,
+    watermark BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (source, stage)
+);
+
+-- =====================================================
+-- CHANGE TRACKING
+-- =====================================================
+
+-- Change counter per table, bumped once per writing statement; cached API results
+-- are reused until the counters of the tables they read move
+CREATE TABLE data_versions (
+    table_name VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    changed_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO data_versions (table_name) VALUES
+('brands'), ('products'), ('inventory'), ('sales'), ('analytics_views');
+
 -- =====================================================
 -- INDEXES FOR PERFORMANCE
 -- =====================================================
 
 CREATE INDEX idx_products_item_inventory_number ON products(item_inventory_number);
-CREATE INDEX idx_products_brand_id ON products(brand_id);
+-- Keyset pagination walks (created_at, id), optionally within one brand
+CREATE INDEX idx_products_created_at_id ON products(created_at, id);
+CREATE INDEX idx_products_brand_id ON products(brand_id, created_at, id);
 
 CREATE INDEX idx_inventory_product_id ON inventory(product_id);
 CREATE INDEX idx_inventory_is_listed ON inventory(is_listed);
+-- Inventory aging: each age bucket is a range scan over in-stock rows, covered by the index
+CREATE INDEX idx_inventory_purchase_date ON inventory(purchase_date)
+    INCLUDE (product_id, quantity, purchase_price) WHERE quantity > 0;
 
 CREATE INDEX idx_sales_product_id ON sales(product_id);
 CREATE INDEX idx_sales_date_sold ON sales(date_sold);
@@ -111,6 +152,195 @@ CREATE TRIGGER update_products_updated_at BEFORE UPDATE ON products FOR EACH ROW
 CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON users FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 CREATE TRIGGER update_inventory_updated_at BEFORE UPDATE ON inventory FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Function to bump a table's change counter (statement level, so bulk loads bump once)
+CREATE OR REPLACE FUNCTION bump_data_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO data_versions (table_name, version) VALUES (TG_TABLE_NAME, 1)
+    ON CONFLICT (table_name) DO UPDATE
+    SET version = data_versions.version + 1, changed_at = CURRENT_TIMESTAMP;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Triggers for change counters
+CREATE TRIGGER bump_brands_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON brands FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+CREATE TRIGGER bump_products_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON products FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+CREATE TRIGGER bump_inventory_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON inventory FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+CREATE TRIGGER bump_sales_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON sales FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+
+-- =====================================================
+-- MATERIALIZED ANALYTICS VIEWS
+-- =====================================================
+
+-- Revenue and units per product (/api/analytics/top-products)
+CREATE MATERIALIZED VIEW mv_top_products AS
+SELECT
+    p.id AS product_id,
+    p.name AS product_name,
+    COALESCE(SUM(s.sell_price * s.quantity_sold), 0) AS revenue,
+    COALESCE(SUM(s.quantity_sold), 0) AS units_sold
+FROM products p
+LEFT JOIN sales s ON p.id = s.product_id
+GROUP BY p.id, p.name;
+
+-- Profit per brand (/api/analytics/profit-analysis)
+CREATE MATERIALIZED VIEW mv_brand_profit AS
+SELECT
+    b.id AS brand_id,
+    b.name AS brand,
+    COALESCE(SUM(s.net_profit_loss), 0) AS total_profit,
+    COALESCE(AVG(s.percent_profit), 0) AS avg_margin,
+    COUNT(s.id) AS total_sales
+FROM brands b
+LEFT JOIN products p ON b.id = p.brand_id
+LEFT JOIN sales s ON p.id = s.product_id
+GROUP BY b.id, b.name;
+
+-- Single-row totals (/api/analytics/summary and the profit-analysis summary)
+CREATE MATERIALIZED VIEW mv_analytics_summary AS
+SELECT
+    1 AS id,
+    (SELECT COUNT(*) FROM products) AS total_products,
+    COUNT(s.id) AS total_sales,
+    COALESCE(SUM(s.sell_price * s.quantity_sold), 0) AS total_revenue,
+    COALESCE(SUM(s.net_profit_loss), 0) AS total_profit,
+    COALESCE(AVG(s.percent_profit), 0) AS avg_margin
+FROM sales s;
+
+-- Unique indexes are required for REFRESH ... CONCURRENTLY
+CREATE UNIQUE INDEX idx_mv_top_products_product_id ON mv_top_products(product_id);
+CREATE INDEX idx_mv_top_products_revenue ON mv_top_products(revenue DESC);
+CREATE UNIQUE INDEX idx_mv_brand_profit_brand_id ON mv_brand_profit(brand_id);
+CREATE UNIQUE INDEX idx_mv_analytics_summary_id ON mv_analytics_summary(id);
+
+-- Refresh every analytics view without blocking readers, then bump their version
+CREATE OR REPLACE FUNCTION refresh_analytics_views()
+RETURNS VOID AS $$
+BEGIN
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_top_products;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_brand_profit;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_analytics_summary;
+
+    INSERT INTO data_versions (table_name, version) VALUES ('analytics_views', 1)
+    ON CONFLICT (table_name) DO UPDATE
+    SET version = data_versions.version + 1, changed_at = CURRENT_TIMESTAMP;
+END;
+$$ language 'plpgsql';
+
+-- =====================================================
+-- DAILY SALES ROLLUP
+-- =====================================================
+
+-- Sales totals per day and brand (/api/analytics/sales/daily), kept current by the
+-- statement-level triggers below; unbranded products roll up under uuid_nil()
+CREATE TABLE sales_daily_rollup (
+    sale_date DATE NOT NULL,
+    brand_id UUID NOT NULL,
+    sales_count INTEGER NOT NULL DEFAULT 0,
+    units_sold INTEGER NOT NULL DEFAULT 0,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+    gross_earned DECIMAL(14,2) NOT NULL DEFAULT 0,
+    net_profit DECIMAL(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (sale_date, brand_id)
+);
+
+CREATE INDEX idx_sales_daily_rollup_brand ON sales_daily_rollup(brand_id, sale_date);
+
+-- Upsert that adds a signed set of sale rows (sale_date, brand_id, sign, quantity_sold,
+-- sell_price, gross_amount_earned, net_profit_loss) to the rollup. Trigger functions
+-- EXECUTE it themselves, because transition tables are only visible to their own queries
+CREATE OR REPLACE FUNCTION sales_rollup_upsert_sql(delta TEXT)
+RETURNS TEXT AS $$
+    SELECT format($sql$
+        INSERT INTO sales_daily_rollup AS r
+            (sale_date, brand_id, sales_count, units_sold, revenue, gross_earned, net_profit)
+        SELECT
+            sale_date,
+            COALESCE(brand_id, uuid_nil()),
+            SUM(sign),
+            SUM(sign * quantity_sold),
+            SUM(sign * sell_price * quantity_sold),
+            SUM(sign * COALESCE(gross_amount_earned, 0)),
+            SUM(sign * COALESCE(net_profit_loss, 0))
+        FROM (%s) delta
+        WHERE sale_date IS NOT NULL
+        GROUP BY 1, 2
+        ON CONFLICT (sale_date, brand_id) DO UPDATE SET
+            sales_count = r.sales_count + EXCLUDED.sales_count,
+            units_sold = r.units_sold + EXCLUDED.units_sold,
+            revenue = r.revenue + EXCLUDED.revenue,
+            gross_earned = r.gross_earned + EXCLUDED.gross_earned,
+            net_profit = r.net_profit + EXCLUDED.net_profit
+    $sql$, delta);
+$$ language 'sql' IMMUTABLE;
+
+-- Add inserted rows and subtract deleted ones, once per statement
+CREATE OR REPLACE FUNCTION maintain_sales_rollup()
+RETURNS TRIGGER AS $$
+DECLARE
+    sale_rows CONSTANT TEXT := 'SELECT s.date_sold AS sale_date, p.brand_id, %s AS sign, s.quantity_sold, '
+        's.sell_price, s.gross_amount_earned, s.net_profit_loss FROM %I s JOIN products p ON p.id = s.product_id';
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        EXECUTE sales_rollup_upsert_sql(format(sale_rows, 1, 'new_sales'));
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        EXECUTE sales_rollup_upsert_sql(format(sale_rows, -1, 'old_sales'));
+        DELETE FROM sales_daily_rollup WHERE sales_count = 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Move a product's sales to its new brand when brand_id changes (e.g. extract_brands.py)
+CREATE OR REPLACE FUNCTION rebrand_sales_rollup()
+RETURNS TRIGGER AS $$
+DECLARE
+    moved_sales CONSTANT TEXT := 'SELECT s.date_sold AS sale_date, %s.brand_id, %s AS sign, s.quantity_sold, '
+        's.sell_price, s.gross_amount_earned, s.net_profit_loss FROM new_products n '
+        'JOIN old_products o ON o.id = n.id JOIN sales s ON s.product_id = n.id '
+        'WHERE n.brand_id IS DISTINCT FROM o.brand_id';
+BEGIN
+    EXECUTE sales_rollup_upsert_sql(format(moved_sales, 'o', -1));
+    EXECUTE sales_rollup_upsert_sql(format(moved_sales, 'n', 1));
+    DELETE FROM sales_daily_rollup WHERE sales_count = 0;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Recompute the rollup from sales, e.g. for a database created before it existed
+CREATE OR REPLACE FUNCTION rebuild_sales_rollup()
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM sales_daily_rollup;
+    EXECUTE sales_rollup_upsert_sql(
+        'SELECT s.date_sold AS sale_date, p.brand_id, 1 AS sign, s.quantity_sold, s.sell_price, '
+        's.gross_amount_earned, s.net_profit_loss FROM sales s JOIN products p ON p.id = s.product_id'
+    );
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION clear_sales_rollup()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM sales_daily_rollup;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Transition tables allow one event per trigger
+CREATE TRIGGER sales_rollup_insert AFTER INSERT ON sales
+    REFERENCING NEW TABLE AS new_sales FOR EACH STATEMENT EXECUTE FUNCTION maintain_sales_rollup();
+CREATE TRIGGER sales_rollup_update AFTER UPDATE ON sales
+    REFERENCING OLD TABLE AS old_sales NEW TABLE AS new_sales FOR EACH STATEMENT EXECUTE FUNCTION maintain_sales_rollup();
+CREATE TRIGGER sales_rollup_delete AFTER DELETE ON sales
+    REFERENCING OLD TABLE AS old_sales FOR EACH STATEMENT EXECUTE FUNCTION maintain_sales_rollup();
+CREATE TRIGGER sales_rollup_truncate AFTER TRUNCATE ON sales
+    FOR EACH STATEMENT EXECUTE FUNCTION clear_sales_rollup();
+CREATE TRIGGER products_rollup_rebrand AFTER UPDATE ON products
+    REFERENCING OLD TABLE AS old_products NEW TABLE AS new_products FOR EACH STATEMENT EXECUTE FUNCTION rebrand_sales_rollup();
+
 -- =====================================================
 -- SAMPLE DATA
 -- =====================================================
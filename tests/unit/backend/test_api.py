@@ -4,18 +4,43 @@ Unit tests for FastAPI backend
 """
 
 import pytest
+import asyncio
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 import sys
 import os
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from sqlalchemy import create_engine
+from sqlalchemy.exc import ProgrammingError, TimeoutError as PoolTimeoutError
 
 # Add the backend directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../src/backend'))
 
-from main import app
+from main import (
+    app, get_db, encode_cursor, decode_cursor, pool_stats, TimedQueuePool,
+    response_cache
+)
+import main
 
 client = TestClient(app)
 
+def get_uncached(url, execute):
+    """GET url against a mocked session, bypassing the response cache
+
+    execute is the session's execute side effect: a function or an exception.
+    Returns (response, session).
+    """
+    db = MagicMock()
+    db.execute.side_effect = execute
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        with patch.object(main, "table_versions", AsyncMock(return_value=None)):
+            return client.get(url), db
+    finally:
+        app.dependency_overrides.clear()
+
 class TestHealthEndpoints:
     """Test health and basic endpoints"""
     
@@ -39,7 +64,21 @@ class TestProductsAPI:
     
     def test_get_products(self):
         """Test getting all products"""
-        response = client.get("/api/products")
+        db = MagicMock()
+        db.execute.return_value.mappings.return_value.all.return_value = [{
+            "id": "00000000-0000-0000-0000-000000000001",
+            "item_inventory_number": "LV001",
+            "name": "Sample Product",
+            "description": None,
+            "brand_id": None,
+            "created_at": datetime(2025, 1, 1, tzinfo=timezone.utc),
+            "updated_at": datetime(2025, 1, 1, tzinfo=timezone.utc)
+        }]
+        app.dependency_overrides[get_db] = lambda: db
+        try:
+            response = client.get("/api/products")
+        finally:
+            app.dependency_overrides.clear()
         assert response.status_code == 200
         products = response.json()
         assert isinstance(products, list)
@@ -79,6 +118,119 @@ class TestProductsAPI:
         product = response.json()
         assert product["id"] == product_id
 
+class TestProductsPagination:
+    """Test keyset pagination for the products listing"""
+
+    def make_rows(self, count):
+        """Build product rows as the database would return them"""
+        return [
+            {
+                "id": f"00000000-0000-0000-0000-{i:012d}",
+                "item_inventory_number": f"LV{i:03d}",
+                "name": f"Product {i}",
+                "description": None,
+                "brand_id": None,
+                "created_at": datetime(2025, 1, 1, tzinfo=timezone.utc),
+                "updated_at": datetime(2025, 1, 1, tzinfo=timezone.utc)
+            }
+            for i in range(count)
+        ]
+
+    def query_products(self, rows, url):
+        """Call the products endpoint against a mocked session"""
+        db = MagicMock()
+        db.execute.return_value.mappings.return_value.all.return_value = rows
+        app.dependency_overrides[get_db] = lambda: db
+        try:
+            return client.get(url), db
+        finally:
+            app.dependency_overrides.clear()
+
+    def test_next_cursor_when_more_rows(self):
+        """Test a full page returns the cursor of its last row"""
+        response, _ = self.query_products(self.make_rows(3), "/api/products?limit=2")
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+        created_at, product_id = decode_cursor(response.headers["X-Next-Cursor"])
+        assert product_id == "00000000-0000-0000-0000-000000000001"
+
+    def test_last_page_has_no_cursor(self):
+        """Test the last page omits the cursor header"""
+        response, _ = self.query_products(self.make_rows(2), "/api/products?limit=2")
+        assert response.status_code == 200
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_cursor_seeks_past_previous_page(self):
+        """Test the cursor becomes a keyset condition rather than an offset"""
+        cursor = encode_cursor(
+            datetime(2025, 1, 1, tzinfo=timezone.utc),
+            "00000000-0000-0000-0000-000000000001"
+        )
+        _, db = self.query_products([], f"/api/products?cursor={cursor}")
+        query, params = db.execute.call_args[0]
+        assert "(created_at, id) >" in str(query)
+        assert "OFFSET" not in str(query)
+        assert params["after_id"] == "00000000-0000-0000-0000-000000000001"
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is rejected"""
+        response = client.get("/api/products?cursor=not-a-cursor")
+        assert response.status_code == 400
+
+    def test_database_error_has_no_validators(self):
+        """Test a failed query is a 500 without an ETag clients could revalidate"""
+        db = MagicMock()
+        db.execute.side_effect = RuntimeError("connection lost")
+        app.dependency_overrides[get_db] = lambda: db
+        try:
+            versions = AsyncMock(return_value={"products": 1})
+            with patch.object(main, "table_versions", versions):
+                response = client.get("/api/products")
+        finally:
+            app.dependency_overrides.clear()
+        assert response.status_code == 500
+        assert "ETag" not in response.headers
+
+class TestTrustedJSONResponse:
+    """Test the fast serialization path used by list routes"""
+
+    def test_encodes_database_types(self):
+        """Test DECIMAL, timestamp and UUID values encode like the validated path"""
+        body = main.TrustedJSONResponse([{
+            "price": Decimal("45.50"),
+            "sold": datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            "day": date(2025, 1, 2),
+            "id": main.uuid.UUID("00000000-0000-0000-0000-000000000001")
+        }]).body
+        row = json.loads(body)[0]
+        assert row["price"] == 45.5
+        assert row["sold"].startswith("2025-01-02T03:04:05")
+        assert row["day"] == "2025-01-02"
+        assert row["id"] == "00000000-0000-0000-0000-000000000001"
+
+    def test_json_fallback_without_orjson(self):
+        """Test the standard library encoder is used when orjson is missing"""
+        with patch.object(main, "orjson", None):
+            body = main.TrustedJSONResponse({"price": Decimal("1.25")}).body
+        assert body == b'{"price":1.25}'
+
+    def test_list_route_keeps_headers(self):
+        """Test headers set on the injected response survive the fast path"""
+        rows = TestProductsPagination().make_rows(3)
+        response, _ = TestProductsPagination().query_products(
+            rows, "/api/products?limit=2"
+        )
+        assert response.headers["content-type"] == "application/json"
+        assert "X-Next-Cursor" in response.headers
+        assert int(response.headers["content-length"]) == len(response.content)
+
+    def test_openapi_keeps_response_model(self):
+        """Test the documented response schema is unchanged"""
+        schema = client.get("/openapi.json").json()
+        content = schema["paths"]["/api/products"]["get"]["responses"]["200"]["content"]
+        items = content["application/json"]["schema"]["items"]
+        assert items["$ref"].endswith("/Product")
+
 class TestInventoryAPI:
     """Test inventory API endpoints"""
     
@@ -136,6 +288,186 @@ class TestSalesAPI:
         assert sale["sell_price"] == 45.00
         assert "id" in sale
 
+class TestBulkCreate:
+    """Test bulk sales and inventory endpoints"""
+
+    PRODUCT_ID = "11111111-1111-1111-1111-111111111111"
+
+    def make_db(self):
+        """Mocked session that knows one product and returns ids for inserted rows"""
+        db = MagicMock()
+
+        def execute(statement, params=None):
+            result = MagicMock()
+            if "FROM products" in str(statement):
+                result.scalars.return_value.all.return_value = [self.PRODUCT_ID]
+            else:
+                result.scalars.return_value.all.return_value = [
+                    f"00000000-0000-0000-0000-{i:012d}" for i in range(100)
+                ]
+            return result
+        db.execute.side_effect = execute
+        return db
+
+    def post(self, url, **kwargs):
+        """POST against a mocked session with the view refresh stubbed out"""
+        db = self.make_db()
+        app.dependency_overrides[get_db] = lambda: db
+        try:
+            with patch.object(
+                main, "refresh_analytics_in_background", AsyncMock()
+            ) as refresh:
+                response = client.post(url, **kwargs)
+        finally:
+            app.dependency_overrides.clear()
+        return response, db, refresh
+
+    def test_json_array_per_row_results(self):
+        """Test valid rows are created and invalid ones reported by index"""
+        records = [
+            {"product_id": self.PRODUCT_ID, "sell_price": 45.0},
+            {"product_id": self.PRODUCT_ID},
+            {"product_id": "not-a-uuid", "sell_price": 10.0},
+            {"product_id": "22222222-2222-2222-2222-222222222222", "sell_price": 10.0},
+        ]
+        response, db, refresh = self.post("/api/sales/bulk", json=records)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 1
+        assert data["failed"] == 3
+        statuses = [r["status"] for r in data["results"]]
+        assert statuses == ["created", "error", "error", "error"]
+        assert "sell_price" in data["results"][1]["error"]
+        assert "unknown product" in data["results"][3]["error"]
+        refresh.assert_called_once()
+
+    def test_ndjson_stream(self):
+        """Test NDJSON bodies are read line by line, including malformed lines"""
+        body = (
+            json.dumps({"product_id": self.PRODUCT_ID, "quantity": 1}) + "\n"
+            + "{not json\n"
+            + json.dumps({"product_id": self.PRODUCT_ID, "quantity": 2})
+        )
+        response, db, _ = self.post(
+            "/api/inventory/bulk", content=body,
+            headers={"Content-Type": "application/x-ndjson"}
+        )
+        data = response.json()
+        assert data["created"] == 2
+        assert data["results"][1]["error"].startswith("Invalid JSON")
+
+    def test_ndjson_lines_split_across_chunks(self):
+        """Test lines are reassembled however the body is chunked"""
+        chunks = [b'{"a": ', b'1}\n\n{"a"', b': 2}\n{', b'"a": 3}']
+        request = MagicMock()
+        request.headers = {"content-type": "application/x-ndjson"}
+
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+
+        async def collect():
+            return [item async for item in main.iter_bulk_records(request)]
+
+        request.stream = stream
+        records = asyncio.run(collect())
+        assert records == [({"a": 1}, None), ({"a": 2}, None), ({"a": 3}, None)]
+
+    def test_one_insert_per_batch(self):
+        """Test a batch is written with a single multi-row INSERT"""
+        records = [
+            {"product_id": self.PRODUCT_ID, "sell_price": float(i + 1)}
+            for i in range(5)
+        ]
+        _, db, _ = self.post("/api/sales/bulk", json=records)
+        inserts = [
+            c for c in db.execute.call_args_list if "INSERT INTO sales" in str(c[0][0])
+        ]
+        assert len(inserts) == 1
+        db.commit.assert_called_once()
+
+    def test_rejects_non_array(self):
+        """Test a JSON object body is rejected"""
+        response, _, _ = self.post(
+            "/api/sales/bulk", json={"product_id": self.PRODUCT_ID}
+        )
+        assert response.status_code == 400
+
+class TestExports:
+    """Test streaming CSV and NDJSON exports"""
+
+    def export(self, url, partitions):
+        """Call an export endpoint with a mocked streaming session"""
+        db = MagicMock()
+        db.execute.return_value.keys.return_value = ["id", "sell_price", "date_sold"]
+        result = db.execute.return_value
+        result.mappings.return_value.partitions.return_value = iter(partitions)
+        with patch.object(main, "ASYNC_DB", False), \
+             patch.object(main, "SessionLocal", return_value=db):
+            response = client.get(url)
+        return response, db
+
+    def rows(self):
+        """Two batches of sale rows"""
+        return [
+            [{"id": "s1", "sell_price": Decimal("45.00"),
+              "date_sold": date(2025, 5, 9)},
+             {"id": "s2", "sell_price": Decimal("12.50"), "date_sold": None}],
+            [{"id": "s3", "sell_price": Decimal("9.99"),
+              "date_sold": date(2025, 5, 10)}],
+        ]
+
+    def test_csv_export(self):
+        """Test CSV has one header and every row across batches"""
+        response, db = self.export("/api/sales/export", self.rows())
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        lines = response.text.strip().splitlines()
+        assert lines == [
+            "id,sell_price,date_sold", "s1,45.00,2025-05-09", "s2,12.50,",
+            "s3,9.99,2025-05-10"
+        ]
+
+        # Rows come from a server-side cursor, not a buffered result
+        options = db.execute.call_args.kwargs["execution_options"]
+        assert options["stream_results"] is True
+        db.close.assert_called_once()
+
+    def test_empty_csv_export_has_header(self):
+        """Test an export with no rows still has its header line"""
+        response, _ = self.export("/api/sales/export", [])
+        assert response.text.strip().splitlines() == ["id,sell_price,date_sold"]
+
+    def test_error_mid_stream_aborts(self):
+        """Test a failure after the first batch is raised, not ended as a short file"""
+        def partitions():
+            yield self.rows()[0]
+            raise RuntimeError("connection lost")
+        with pytest.raises(RuntimeError):
+            self.export("/api/sales/export", partitions())
+
+    def test_ndjson_export(self):
+        """Test NDJSON has one JSON object per row, with money columns as numbers"""
+        response, _ = self.export("/api/inventory/export?format=ndjson", self.rows())
+        lines = response.text.strip().splitlines()
+        assert len(lines) == 3
+        assert json.loads(lines[0]) == {
+            "id": "s1", "sell_price": 45.0, "date_sold": "2025-05-09"
+        }
+
+    def test_date_range_filter(self):
+        """Test date_from and date_to become bound filters"""
+        _, db = self.export(
+            "/api/sales/export?date_from=2025-05-01&date_to=2025-05-31", []
+        )
+        statement, params = db.execute.call_args[0]
+        assert "s.date_sold >= :date_from" in str(statement)
+        assert params == {"date_from": date(2025, 5, 1), "date_to": date(2025, 5, 31)}
+
+    def test_invalid_format(self):
+        """Test unsupported formats are rejected"""
+        assert client.get("/api/sales/export?format=xml").status_code == 422
+
 class TestAnalyticsAPI:
     """Test analytics API endpoints"""
     
@@ -159,6 +491,527 @@ class TestAnalyticsAPI:
         assert isinstance(data["by_brand"], list)
         assert isinstance(data["by_category"], list)
 
+class TestAnalyticsViews:
+    """Test analytics endpoints read from materialized views"""
+
+    def test_reads_materialized_view(self):
+        """Test top products come from mv_top_products"""
+        row = MagicMock(product_name="Gucci Tote", revenue=120.0, units_sold=1)
+        response, db = get_uncached(
+            "/api/analytics/top-products", lambda statement, params=None: [row]
+        )
+        assert response.json()["top_by_revenue"][0]["product_name"] == "Gucci Tote"
+        assert "mv_top_products" in str(db.execute.call_args_list[0][0][0])
+        assert db.execute.call_count == 1
+
+    def test_falls_back_to_live_query(self):
+        """Test databases without the views still get live results"""
+        row = MagicMock(product_name="Gucci Tote", revenue=120.0, units_sold=1)
+
+        def execute(statement, params=None):
+            if "mv_top_products" in str(statement):
+                raise ProgrammingError(
+                    str(statement), params, Exception("relation does not exist")
+                )
+            return [row]
+        with patch.object(main, "metrics", main.Metrics()):
+            response, db = get_uncached("/api/analytics/top-products", execute)
+            body = main.metrics.render()
+        assert response.json()["top_by_revenue"][0]["revenue"] == 120.0
+        db.rollback.assert_called_once()
+        assert ('lv_handler_errors_total{handler="query_analytics",'
+                'exception="ProgrammingError"} 1') in body
+
+class TestSalesDaily:
+    """Test the daily sales series endpoint"""
+
+    def make_row(self, day, revenue):
+        return MagicMock(
+            sale_date=day, revenue=Decimal(revenue), profit=Decimal("10.00"),
+            units=2, sales=2, revenue_ma=Decimal(revenue) / 2,
+            profit_ma=Decimal("5.00"), units_ma=Decimal("1.0")
+        )
+
+    def test_reads_rollup(self):
+        """Test the series comes from the rollup with the window's lead-in days"""
+        row = self.make_row(date(2025, 3, 2), "300.00")
+        response, db = get_uncached(
+            "/api/analytics/sales/daily"
+            "?date_from=2025-03-02&date_to=2025-03-02&window=7",
+            lambda statement, params=None: [row]
+        )
+        data = response.json()
+        assert data["window"] == 7
+        assert data["days"] == [{
+            "date": "2025-03-02", "revenue": 300.0, "profit": 10.0, "units": 2,
+            "sales": 2,
+            "revenue_ma": 150.0, "profit_ma": 5.0, "units_ma": 1.0
+        }]
+        statement, params = db.execute.call_args_list[0][0]
+        assert "sales_daily_rollup" in str(statement)
+        assert "6 PRECEDING" in str(statement)
+        assert params["series_from"] == date(2025, 2, 24)
+        assert db.execute.call_count == 1
+
+    def test_falls_back_to_live_query(self):
+        """Test databases without the rollup aggregate sales directly"""
+        def execute(statement, params=None):
+            if "sales_daily_rollup" in str(statement):
+                raise ProgrammingError(
+                    str(statement), params, Exception("relation does not exist")
+                )
+            return [self.make_row(date(2025, 3, 2), "80.00")]
+        response, db = get_uncached(
+            "/api/analytics/sales/daily?date_from=2025-03-01&date_to=2025-03-02",
+            execute
+        )
+        assert response.json()["days"][0]["revenue"] == 80.0
+        assert "FROM sales s" in str(db.execute.call_args_list[1][0][0])
+
+    def test_database_error(self):
+        """Test a failed query is a 500, not an empty series"""
+        def execute(statement, params=None):
+            raise RuntimeError("connection lost")
+        response, _ = get_uncached("/api/analytics/sales/daily", execute)
+        assert response.status_code == 500
+
+    def test_brand_filter(self):
+        """Test a brand narrows the series"""
+        brand_id = "00000000-0000-0000-0000-000000000007"
+        _, db = get_uncached(
+            f"/api/analytics/sales/daily?brand_id={brand_id}",
+            lambda statement, params=None: []
+        )
+        statement, params = db.execute.call_args_list[0][0]
+        assert "brand_id = CAST(:brand_id AS uuid)" in str(statement)
+        assert params["brand_id"] == brand_id
+
+    def test_invalid_ranges(self):
+        """Test reversed ranges, oversized ranges and bad brand ids are rejected"""
+        url = "/api/analytics/sales/daily"
+        assert client.get(
+            f"{url}?date_from=2025-03-02&date_to=2025-03-01"
+        ).status_code == 400
+        assert client.get(
+            f"{url}?date_from=2000-01-01&date_to=2025-01-01"
+        ).status_code == 400
+        assert client.get(f"{url}?brand_id=gucci").status_code == 400
+        assert client.get(f"{url}?window=0").status_code == 422
+
+class TestInventoryAging:
+    """Test the inventory aging histogram"""
+
+    def test_parse_buckets(self):
+        """Test day boundaries become closed buckets plus an open-ended one"""
+        assert main.parse_aging_buckets("30,90") == [
+            ("0-30", 0, 30), ("31-90", 31, 90), ("91+", 91, None)
+        ]
+
+    def test_buckets_are_purchase_date_ranges(self):
+        """Test each bucket is a range over purchase_date, answered in one round trip"""
+        rows = [
+            MagicMock(bucket=0, items=4, capital=Decimal("400.00")),
+            MagicMock(bucket=2, items=1, capital=Decimal("120.02")),
+            MagicMock(bucket=4, items=1, capital=Decimal("120.02")),
+        ]
+        response, db = get_uncached(
+            "/api/analytics/inventory/aging?as_of=2025-06-30&buckets=30,90",
+            lambda statement, params=None: rows
+        )
+        data = response.json()
+        labels = [bucket["label"] for bucket in data["buckets"]]
+        assert labels == ["0-30", "31-90", "91+"]
+        assert data["buckets"][0]["items"] == 4
+        assert data["buckets"][1] == {
+            "label": "31-90", "min_days": 31, "max_days": 90, "items": 0,
+            "capital": 0.0
+        }
+        assert data["buckets"][2]["capital"] == 120.02
+        assert data["deadstock"] == {"days": 90, "items": 1, "capital": 120.02}
+
+        assert db.execute.call_count == 1
+        statement, params = db.execute.call_args[0]
+        assert "i.purchase_date BETWEEN :from_1 AND :to_1" in str(statement)
+        assert "i.purchase_date <= :to_2" in str(statement)
+        assert params["from_1"] == date(2025, 4, 1)
+        assert params["to_1"] == date(2025, 5, 30)
+        assert params["deadstock_before"] == date(2025, 4, 1)
+
+    def test_database_error(self):
+        """Test a failed query is a 500, not an all-zero histogram"""
+        response, _ = get_uncached(
+            "/api/analytics/inventory/aging", RuntimeError("connection lost")
+        )
+        assert response.status_code == 500
+
+    def test_invalid_buckets(self):
+        """Test malformed or unordered boundaries are rejected"""
+        url = "/api/analytics/inventory/aging"
+        assert client.get(f"{url}?buckets=30,thirty").status_code == 400
+        assert client.get(f"{url}?buckets=90,30").status_code == 400
+        assert client.get(f"{url}?buckets=0,30").status_code == 400
+
+class TestAnalyticsResponseCache:
+    """Test the data-versioned analytics response cache and ETags"""
+
+    def make_db(self, versions, failures=0):
+        """Mocked session returning the given data versions, then a summary row
+
+        The first failures summary queries raise, like a transient database error.
+        """
+        versions = iter(versions)
+        failures = iter(range(failures))
+        db = MagicMock()
+
+        def execute(statement, params=None):
+            result = MagicMock()
+            if "data_versions" in str(statement):
+                result.all.return_value = [("sales", next(versions))]
+            elif next(failures, None) is not None:
+                raise RuntimeError("connection lost")
+            else:
+                result.fetchone.return_value = MagicMock(
+                    total_revenue=100.0, total_profit=40.0, total_sales=2,
+                    total_products=5
+                )
+            return result
+        db.execute.side_effect = execute
+        return db
+
+    def summary_queries(self, db):
+        """Number of summary (non-version) queries run against the session"""
+        return sum(
+            "data_versions" not in str(call[0][0])
+            for call in db.execute.call_args_list
+        )
+
+    def get_summaries(self, db, count):
+        """Request the summary count times with a fresh data version check each time"""
+        app.dependency_overrides[get_db] = lambda: db
+        try:
+            with patch.object(main, "DATA_VERSION_INTERVAL", 0):
+                for _ in range(count):
+                    response = client.get("/api/analytics/summary")
+                    assert response.status_code == 200
+                    assert response.json()["totalRevenue"] == 100.0
+        finally:
+            app.dependency_overrides.clear()
+
+    def test_cached_until_version_changes(self):
+        """Test the summary is recomputed only when the data version moves"""
+        response_cache.invalidate()
+        db = self.make_db([1, 1, 2])
+        self.get_summaries(db, 3)
+        assert self.summary_queries(db) == 2
+
+    def test_api_writes_invalidate(self):
+        """Test a write through the API makes cached responses stale"""
+        response_cache.invalidate()
+        db = self.make_db([1, 1])
+        self.get_summaries(db, 1)
+        client.post("/api/sales", json={"product_id": "p1", "sell_price": 10.0})
+        self.get_summaries(db, 1)
+        assert self.summary_queries(db) == 2
+
+    def test_errors_are_not_cached(self):
+        """Test a failed summary is a 500 and the next request queries again"""
+        response_cache.invalidate()
+        db = self.make_db([1, 1], failures=1)
+        app.dependency_overrides[get_db] = lambda: db
+        try:
+            with patch.object(main, "DATA_VERSION_INTERVAL", 0):
+                assert client.get("/api/analytics/summary").status_code == 500
+        finally:
+            app.dependency_overrides.clear()
+        self.get_summaries(db, 1)
+        assert self.summary_queries(db) == 2
+
+    def test_lru_and_ttl_eviction(self):
+        """Test the oldest entry is evicted and expired entries miss"""
+        cache = main.ResponseCache(maxsize=2, ttl=60)
+        cache.set("a", 1, "A")
+        cache.set("b", 1, "B")
+        cache.get("a", 1)
+        cache.set("c", 1, "C")
+        assert cache.get("b", 1) is None
+        assert cache.get("a", 1) == "A"
+        assert cache.get("a", 2) is None
+
+        expired = main.ResponseCache(maxsize=2, ttl=0)
+        expired.set("a", 1, "A")
+        assert expired.get("a", 1) is None
+
+    def test_conditional_get(self):
+        """Test a matching If-None-Match gets 304 without running the query"""
+        response_cache.invalidate()
+        db = self.make_db([7, 7])
+        app.dependency_overrides[get_db] = lambda: db
+        try:
+            with patch.object(main, "DATA_VERSION_INTERVAL", 0):
+                first = client.get("/api/analytics/summary")
+                etag = first.headers["ETag"]
+                second = client.get(
+                    "/api/analytics/summary", headers={"If-None-Match": etag}
+                )
+        finally:
+            app.dependency_overrides.clear()
+        assert second.status_code == 304
+        assert second.headers["ETag"] == etag
+        assert self.summary_queries(db) == 1
+
+    def test_no_etag_on_errors(self):
+        """Test a failed request carries no validators, so it cannot be revalidated"""
+        response_cache.invalidate()
+        db = self.make_db([3, 3], failures=1)
+        app.dependency_overrides[get_db] = lambda: db
+        try:
+            with patch.object(main, "DATA_VERSION_INTERVAL", 0):
+                failed = client.get("/api/analytics/summary")
+                recovered = client.get("/api/analytics/summary")
+        finally:
+            app.dependency_overrides.clear()
+        assert failed.status_code == 500
+        assert "ETag" not in failed.headers
+        assert recovered.status_code == 200
+        assert recovered.headers["ETag"]
+
+    def test_etag_matches(self):
+        """Test weak comparison, lists and wildcards"""
+        assert main.etag_matches('W/"abc"', 'W/"abc"')
+        assert main.etag_matches('"x", "abc"', 'W/"abc"')
+        assert main.etag_matches('*', 'W/"abc"')
+        assert not main.etag_matches(None, 'W/"abc"')
+        assert not main.etag_matches('W/"abd"', 'W/"abc"')
+
+    def test_cache_stats_endpoint(self):
+        """Test hit and miss counts are exposed"""
+        data = client.get("/api/admin/cache").json()
+        assert "hits" in data and "misses" in data
+
+class TestConnectionPool:
+    """Test pool statistics"""
+
+    def test_pool_stats_endpoint(self):
+        """Test pool saturation fields are reported"""
+        response = client.get("/api/admin/pool")
+        assert response.status_code == 200
+        data = response.json()
+        for key in ["pool_size", "checked_out", "overflow", "checkouts", "timeouts",
+                    "wait_ms_p95"]:
+            assert key in data
+
+    def test_checkouts_and_timeouts_are_counted(self):
+        """Test the timed pool records waits and exhaustion"""
+        engine = create_engine(
+            "sqlite://", poolclass=TimedQueuePool, pool_size=1, max_overflow=0,
+            pool_timeout=0.05
+        )
+        before = pool_stats.snapshot()
+
+        held = engine.connect()
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        held.close()
+        engine.dispose()
+
+        after = pool_stats.snapshot()
+        assert after["checkouts"] == before["checkouts"] + 1
+        assert after["timeouts"] == before["timeouts"] + 1
+
+class TestMetrics:
+    """Test request metrics and the /metrics endpoint"""
+
+    def test_requests_labelled_by_route_template(self):
+        """Test counts and latency are keyed on the route, not the raw path"""
+        with patch.object(main, "metrics", main.Metrics()):
+            client.get("/health")
+            client.get("/health")
+            client.get("/does-not-exist")
+            body = client.get("/metrics").text
+        assert ('lv_http_requests_total{method="GET",route="/health",status="200"} 2'
+                in body)
+        assert ('lv_http_requests_total{method="GET",route="unmatched",status="404"} 1'
+                in body)
+        assert ('lv_http_request_duration_seconds_count{method="GET",route="/health"} 2'
+                in body)
+        assert 'lv_http_requests_in_flight{method="GET",route="/metrics"} 1' in body
+
+    def test_metrics_content_type(self):
+        """Test the endpoint speaks the text exposition format"""
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE lv_http_request_duration_seconds histogram" in response.text
+        assert "lv_db_pool_size " in response.text
+
+    def test_histogram_and_errors(self):
+        """Test buckets are cumulative and 5xx responses count as errors"""
+        registry = main.Metrics()
+        for duration in [0.004, 0.2, 20.0]:
+            registry.request_started("GET", "/api/sales")
+            registry.request_finished("GET", "/api/sales", 503, duration)
+        body = registry.render()
+        bucket = ('lv_http_request_duration_seconds_bucket'
+                  '{method="GET",route="/api/sales"')
+        assert f'{bucket},le="0.005"}} 1' in body
+        assert f'{bucket},le="0.25"}} 2' in body
+        assert f'{bucket},le="+Inf"}} 3' in body
+        assert 'lv_http_request_errors_total{method="GET",route="/api/sales"} 3' in body
+
+    def test_handler_errors_are_counted(self):
+        """Test analytics failures are visible in the metrics"""
+        db = MagicMock()
+        db.execute.side_effect = RuntimeError("connection lost")
+        app.dependency_overrides[get_db] = lambda: db
+        try:
+            with patch.object(main, "metrics", main.Metrics()), \
+                 patch.object(main, "table_versions", AsyncMock(return_value=None)):
+                assert client.get("/api/analytics/summary").status_code == 500
+                body = client.get("/metrics").text
+        finally:
+            app.dependency_overrides.clear()
+        assert ('lv_handler_errors_total{handler="get_analytics_summary",'
+                'exception="RuntimeError"} 1') in body
+
+    def test_session_wait_is_recorded(self):
+        """Test pool checkouts feed the session wait histogram"""
+        engine = create_engine(
+            "sqlite://", poolclass=TimedQueuePool, pool_size=1, max_overflow=0
+        )
+        with patch.object(main, "metrics", main.Metrics()):
+            engine.connect().close()
+            assert main.metrics.db_wait.count == 1
+        engine.dispose()
+
+class TestSlowQueryLog:
+    """Test statement timing, the slow query buffer and EXPLAIN capture"""
+
+    def run_statements(self, statements, threshold_ms=0, sample_rate=0.0):
+        """Run statements on a watched SQLite engine; returns the log they land in"""
+        engine = create_engine("sqlite://")
+        main.watch_statements(engine)
+        log = main.SlowQueryLog(size=2)
+        plan = MagicMock(return_value=["Seq Scan on sales"])
+        with patch.object(main, "slow_query_log", log), \
+             patch.object(main, "SLOW_QUERY_MS", threshold_ms), \
+             patch.object(main, "EXPLAIN_SAMPLE_RATE", sample_rate), \
+             patch.object(main, "capture_plan", plan) as capture:
+            with engine.connect() as conn:
+                for statement, params in statements:
+                    conn.execute(main.text(statement), params)
+        engine.dispose()
+        return log, capture
+
+    def test_records_statements_with_parameters(self):
+        """Test slow statements are kept with parameter types, in a bounded buffer"""
+        log, capture = self.run_statements([("SELECT :a", {"a": i}) for i in range(3)])
+        entries = log.slowest(10)
+        assert len(entries) == 2
+        assert entries[0]["statement"] == "SELECT ?"
+        assert [entry["parameters"] for entry in entries] == [["int"], ["int"]]
+        capture.assert_not_called()
+
+    def test_parameter_values_are_redacted(self):
+        """Test bound values never reach the log, only their names and types"""
+        assert main.redact_parameters({"email": "a@b.c", "id": 1}) == {
+            "email": "str", "id": "int"
+        }
+        assert main.redact_parameters([{"price": 1.5}] * 3) == {
+            "rows": 3, "first": {"price": "float"}
+        }
+        assert main.redact_parameters(None) is None
+        conn = MagicMock()
+        conn.dialect.name = "postgresql"
+        conn.connection.cursor.return_value.fetchall.return_value = [
+            ("Filter: ((name)::text = 'Speedy ''30'''::text)",)
+        ]
+        plan = main.capture_plan(
+            conn, "SELECT * FROM products WHERE name = %(name)s", {}
+        )
+        assert plan == ["Filter: ((name)::text = '?'::text)"]
+
+    def test_fast_statements_are_skipped(self):
+        """Test statements under the threshold are only counted"""
+        log, _ = self.run_statements([("SELECT 1", {})], threshold_ms=60000)
+        assert log.slowest(10) == []
+
+    def test_sampled_explain(self):
+        """Test a sampled slow statement carries its plan"""
+        log, capture = self.run_statements([("SELECT 1", {})], sample_rate=1.0)
+        assert log.slowest(1)[0]["plan"] == ["Seq Scan on sales"]
+        capture.assert_called_once()
+
+    def test_capture_plan_uses_a_savepoint(self):
+        """Test EXPLAIN runs in a savepoint and failures leave the transaction usable"""
+        conn = MagicMock()
+        conn.dialect.name = "postgresql"
+        cursor = conn.connection.cursor.return_value
+        cursor.fetchall.return_value = [
+            ("Index Scan using idx_sales_date_sold on sales",)
+        ]
+        plan = main.capture_plan(
+            conn, "SELECT * FROM sales WHERE id = %(id)s", {"id": 1}
+        )
+        assert plan == ["Index Scan using idx_sales_date_sold on sales"]
+        executed = [call[0][0] for call in cursor.execute.call_args_list]
+        assert executed[0] == "SAVEPOINT explain_capture"
+        assert executed[1].startswith("EXPLAIN (ANALYZE, BUFFERS) SELECT")
+        assert executed[2] == "RELEASE SAVEPOINT explain_capture"
+
+        def execute(sql, params=None):
+            if sql.startswith("EXPLAIN"):
+                raise RuntimeError("canceling statement due to statement timeout")
+        cursor.execute.reset_mock()
+        cursor.execute.side_effect = execute
+        assert main.capture_plan(conn, "SELECT 1", {}) is None
+        last = cursor.execute.call_args_list[-1][0][0]
+        assert last == "ROLLBACK TO SAVEPOINT explain_capture"
+
+    def test_side_effects_get_plain_explain(self):
+        """Test ANALYZE only re-runs reads of known tables without function calls"""
+        conn = MagicMock()
+        conn.dialect.name = "postgresql"
+        cursor = conn.connection.cursor.return_value
+        cursor.fetchall.return_value = [("Result",)]
+        for statement in [
+            "SELECT refresh_analytics_views()",
+            "SELECT * FROM sales WHERE id = %(id)s FOR UPDATE",
+            "SELECT * INTO sales_copy FROM sales",
+            "SELECT * FROM some_view",
+        ]:
+            cursor.execute.reset_mock()
+            main.capture_plan(conn, statement, {})
+            assert cursor.execute.call_args_list[1][0][0] == "EXPLAIN " + statement
+
+    def test_app_queries_are_analyzed(self):
+        """Test the app's own read queries stay on the ANALYZE allowlist"""
+        for statement in [
+            main.SUMMARY_LIVE, main.TOP_PRODUCTS_VIEW, main.BRAND_PROFIT_LIVE,
+            main.SALES_EXPORT_QUERY.format(where=""),
+            main.sales_daily_query("live", "", 7),
+            "SELECT id::text FROM products WHERE id = ANY(CAST(%(ids)s AS uuid[]))",
+        ]:
+            assert main.explain_analyze_safe(statement)
+
+    def test_writes_are_never_explained(self):
+        """Test ANALYZE is not used on statements that would change data"""
+        conn = MagicMock()
+        conn.dialect.name = "postgresql"
+        assert main.capture_plan(conn, "INSERT INTO sales VALUES (1)", {}) is None
+        conn.connection.cursor.assert_not_called()
+
+    def test_slow_queries_endpoint(self):
+        """Test the admin endpoint lists the slowest statements first"""
+        log = main.SlowQueryLog()
+        log.record("SELECT 1", {}, 0.5)
+        log.record("SELECT 2", {}, 1.5)
+        with patch.object(main, "slow_query_log", log):
+            data = client.get("/api/admin/slow-queries?limit=1").json()
+            assert data["statements"][0]["statement"] == "SELECT 2"
+            assert len(data["statements"]) == 1
+            client.delete("/api/admin/slow-queries")
+            assert log.slowest(10) == []
+
 class TestErrorHandling:
     """Test error handling"""
     
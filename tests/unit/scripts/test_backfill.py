@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Unit tests for merging backfill snapshots
+"""
+
+import pytest
+import pandas as pd
+import sys
+import os
+
+# Add the scripts directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../scripts'))
+
+from backfill import resolve_conflicts
+
+
+def snapshot(item_numbers, price):
+    """One normalized file's rows, all at the same price"""
+    return pd.DataFrame({
+        'item_number': item_numbers,
+        'purchase_price': [price] * len(item_numbers),
+    })
+
+
+class TestResolveConflicts:
+    """Test newest-file-wins merging of per-file frames"""
+
+    def test_newest_file_wins(self):
+        """Test an item in several files keeps only the newest file's rows"""
+        merged = resolve_conflicts([
+            snapshot(['1', '2', '3'], 100.0),
+            snapshot(['2', '4'], 200.0),
+            snapshot(['3'], 300.0),
+        ])
+        assert merged.to_dict('list') == {
+            'item_number': ['1', '2', '4', '3'],
+            'purchase_price': [100.0, 200.0, 200.0, 300.0],
+        }
+
+    def test_repeated_rows_in_the_winning_file_are_kept_in_order(self):
+        """Test every row of the winning file is kept, in its original order"""
+        merged = resolve_conflicts([
+            snapshot(['1'], 100.0),
+            pd.DataFrame({'item_number': ['1', '1'], 'purchase_price': [2.0, 1.0]}),
+        ])
+        assert merged['purchase_price'].tolist() == [2.0, 1.0]
+        assert list(merged.index) == [0, 1]
+
+    def test_missing_item_numbers_are_one_group(self):
+        """Test rows without an item number also come from the newest file only"""
+        merged = resolve_conflicts([
+            snapshot([None, '1'], 100.0),
+            snapshot([None], 200.0),
+        ])
+        assert merged['purchase_price'].tolist() == [100.0, 200.0]
+
+    def test_inputs_are_not_modified(self):
+        """Test the caller's frames do not gain a file_rank column"""
+        frames = [snapshot(['1'], 100.0), snapshot(['1'], 200.0)]
+        merged = resolve_conflicts(frames)
+        assert 'file_rank' not in merged.columns
+        columns = ['item_number', 'purchase_price']
+        assert all(list(df.columns) == columns for df in frames)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the compiled brand matcher
+"""
+
+import pytest
+import pandas as pd
+import sys
+import os
+
+# Add the scripts directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../scripts'))
+
+from brand_matcher import BrandMatcher, compile_brand_pattern
+
+class TestBrandMatcher:
+    """Test single-name matching"""
+
+    def test_longest_brand_wins(self):
+        """Test Christian Dior is preferred over Dior"""
+        matcher = BrandMatcher()
+        assert matcher.match('Christian Dior Saddle Bag') == 'Christian Dior'
+        assert matcher.match('Dior Book Tote') == 'Dior'
+
+    def test_aliases_and_case(self):
+        """Test aliases resolve to the canonical brand regardless of case"""
+        matcher = BrandMatcher()
+        assert matcher.match('ysl Kate Clutch') == 'Saint Laurent'
+        assert matcher.match('Chloe Drew Bag') == 'Chloé'
+        assert matcher.match('HERMES Birkin') == 'Hermès'
+
+    def test_whole_words_only(self):
+        """Test brands inside other words are not matched"""
+        assert BrandMatcher().match('Diorama Print Scarf') is None
+
+    def test_first_word_fallback(self):
+        """Test unknown brands fall back to a capitalised first word when enabled"""
+        assert BrandMatcher().match('Coach Tabby') is None
+        assert BrandMatcher(guess_first_word=True).match('Coach Tabby') == 'Coach'
+        assert BrandMatcher(guess_first_word=True).match(None) is None
+
+    def test_large_dictionary(self):
+        """Test one compiled pattern covers thousands of brands"""
+        brands = [f'Brand {i}' for i in range(5000)] + ['Brand 12 Deluxe']
+        matcher = BrandMatcher(brands=brands, aliases={})
+        assert matcher.match('Brand 12 Deluxe Tote') == 'Brand 12 Deluxe'
+        assert matcher.match('Brand 4999 Wallet') == 'Brand 4999'
+
+class TestMatchColumn:
+    """Test whole-column matching"""
+
+    def test_match_column(self):
+        """Test a Series keeps its index and missing names map to None"""
+        names = pd.Series(
+            ['Gucci Marmont', None, 'Gucci Marmont', 'Plain Tote'],
+            index=[10, 11, 12, 13]
+        )
+        brands = BrandMatcher().match_column(names)
+        assert brands.tolist() == ['Gucci', None, 'Gucci', None]
+        assert list(brands.index) == [10, 11, 12, 13]
+
+    def test_compile_brand_pattern(self):
+        """Test the pattern captures the casefolded brand"""
+        pattern = compile_brand_pattern(['dior', 'christian dior'])
+        assert pattern.search('christian dior bag').group(1) == 'christian dior'
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
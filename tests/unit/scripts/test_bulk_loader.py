@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the COPY-based bulk loader
+"""
+
+import pytest
+import csv
+import io
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Add the scripts directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../scripts'))
+
+from bulk_loader import BulkLoader, _RowStream
+
+
+def copied_text(rows, size=-1):
+    """Everything COPY would read from a row stream, in reads of size characters"""
+    stream = _RowStream(rows)
+    chunks = []
+    while True:
+        chunk = stream.read(size)
+        if not chunk:
+            return ''.join(chunks)
+        chunks.append(chunk)
+
+
+class TestRowStream:
+    """Test rows are encoded the way COPY ... WITH (FORMAT csv) reads them"""
+
+    def test_none_is_an_unquoted_empty_field(self):
+        """Test None becomes an empty unquoted field, which COPY reads as NULL"""
+        assert copied_text([('LV001', None, None)]) == 'LV001,,\n'
+
+    def test_tabs_newlines_and_quotes_round_trip(self):
+        """Test embedded tabs, newlines and quotes survive CSV quoting"""
+        row = ('LV001', 'Speedy\t30', 'Line one\nLine "two"')
+        text = copied_text([row])
+        assert text == 'LV001,Speedy\t30,"Line one\nLine ""two"""\n'
+        assert next(csv.reader(io.StringIO(text))) == list(row)
+
+    def test_decimals_dates_and_booleans(self):
+        """Test Decimal values keep their exact digits next to dates and booleans"""
+        row = ('LV001', 1, Decimal('120.02'), Decimal('-9.21'), True, date(2025, 1, 2))
+        assert copied_text([row]) == 'LV001,1,120.02,-9.21,True,2025-01-02\n'
+
+    def test_small_reads_return_every_row(self):
+        """Test reads smaller than a line still yield every row in order"""
+        rows = [(str(i), Decimal(i) / 4, None) for i in range(50)]
+        assert copied_text(rows, size=7) == copied_text(rows)
+        assert copied_text(rows).count('\n') == 50
+
+    def test_empty_rows(self):
+        """Test an empty row set reads as end of file"""
+        assert _RowStream([]).read() == ''
+
+
+class TestBulkLoader:
+    """Test staging, merging and transaction handling"""
+
+    def make_connection(self):
+        """Mocked connection whose statements each affect two rows"""
+        connection = MagicMock()
+        connection.cursor.return_value.rowcount = 2
+        return connection
+
+    def statements(self, connection):
+        """SQL executed on the connection's cursors, in order"""
+        execute = connection.cursor.return_value.execute
+        return [call[0][0] for call in execute.call_args_list]
+
+    def test_load_merges_and_commits(self):
+        """Test every entity is staged with COPY and merged in one transaction"""
+        connection = self.make_connection()
+        counts = BulkLoader(connection).load(
+            products=[('LV001', 'Speedy', 'Product: Speedy', None)]
+        )
+        assert counts == {'products': 2, 'inventory': 2, 'sales': 2}
+        copies = connection.cursor.return_value.copy_expert.call_args_list
+        assert [call[0][0].split()[1] for call in copies] == [
+            'staging_products', 'staging_inventory', 'staging_sales'
+        ]
+        connection.commit.assert_called_once()
+
+    def test_product_conflicts_update_or_keep(self):
+        """Test keep_existing leaves loaded products alone instead of updating them"""
+        connection = self.make_connection()
+        loader = BulkLoader(connection)
+        loader.merge_products()
+        loader.merge_products(keep_existing=True)
+        update, keep = self.statements(connection)
+        assert 'DISTINCT ON (s.item_inventory_number)' in update
+        assert 'DO UPDATE' in update
+        assert 'DO NOTHING' in keep and 'DO UPDATE' not in keep
+
+    def test_failed_load_rolls_back(self):
+        """Test a failure rolls back when the loader owns the transaction"""
+        connection = self.make_connection()
+        connection.cursor.return_value.copy_expert.side_effect = RuntimeError("bad row")
+        with pytest.raises(RuntimeError):
+            BulkLoader(connection).load()
+        connection.rollback.assert_called_once()
+        connection.commit.assert_not_called()
+
+    def test_caller_owned_transaction_is_left_alone(self):
+        """Test commit=False neither commits nor rolls back"""
+        connection = self.make_connection()
+        BulkLoader(connection).load(commit=False)
+        connection.cursor.return_value.copy_expert.side_effect = RuntimeError("bad row")
+        with pytest.raises(RuntimeError):
+            BulkLoader(connection).load(commit=False)
+        connection.commit.assert_not_called()
+        connection.rollback.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Unit tests for migration checkpoints and adaptive batch sizing
+"""
+
+import pytest
+from unittest.mock import patch
+import sys
+import os
+
+# Add the scripts directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../scripts'))
+
+import checkpoints
+from checkpoints import BatchSizer, CheckpointStore
+
+
+class FakeConnection:
+    """Connection holding ingest_checkpoints rows; writes are visible after commit"""
+
+    def __init__(self):
+        self.committed = {}
+        self.pending = {}
+        self.created = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed = dict(self.pending)
+
+    def rollback(self):
+        self.pending = dict(self.committed)
+
+
+class FakeCursor:
+    """Cursor answering the checkpoint store's statements"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.result = []
+
+    def execute(self, query, params=None):
+        rows = self.connection.pending
+        if 'CREATE TABLE' in query:
+            self.connection.created = True
+        elif query.lstrip().startswith('INSERT'):
+            source, stage, watermark = params
+            rows[(source, stage)] = watermark
+        elif query.startswith('SELECT'):
+            self.result = [
+                (stage, watermark) for (source, stage), watermark in rows.items()
+                if source == params[0]
+            ]
+        elif query.startswith('DELETE'):
+            for key in [key for key in rows if key[0] == params[0]]:
+                del rows[key]
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class TestCheckpointStore:
+    """Test watermarks are saved, loaded and cleared per source"""
+
+    def test_save_is_committed_with_the_batch(self):
+        """Test a watermark only becomes durable when the caller commits"""
+        connection = FakeConnection()
+        store = CheckpointStore(connection, 'data/inputs/base.csv')
+        store.ensure_table()
+        assert connection.created
+
+        store.save(connection.cursor(), 'products', 500)
+        connection.rollback()
+        assert store.load() == {}
+
+        store.save(connection.cursor(), 'products', 500)
+        store.save(connection.cursor(), 'products', 1000)
+        store.save(connection.cursor(), 'inventory', 500)
+        connection.commit()
+        assert store.load() == {'products': 1000, 'inventory': 500}
+
+    def test_sources_are_kept_apart(self):
+        """Test each CSV file has its own watermarks, keyed by absolute path"""
+        connection = FakeConnection()
+        first = CheckpointStore(connection, 'first.csv')
+        second = CheckpointStore(connection, 'second.csv')
+        assert first.source == os.path.abspath('first.csv')
+
+        first.save(connection.cursor(), 'stream', 10)
+        second.save(connection.cursor(), 'stream', 20)
+        connection.commit()
+        first.clear()
+        assert first.load() == {}
+        assert second.load() == {'stream': 20}
+
+
+class TestBatchSizer:
+    """Test fixed and adaptive batch sizes"""
+
+    def finish_after(self, sizer, seconds, rows=100):
+        """Finish a batch that took the given number of seconds"""
+        with patch.object(checkpoints.time, 'perf_counter', side_effect=[0.0, seconds]):
+            sizer.start()
+            return sizer.finish(rows)
+
+    def test_fixed_size(self):
+        """Test the size never changes unless adaptive"""
+        sizer = BatchSizer(500)
+        assert self.finish_after(sizer, 10.0) == 500
+        assert self.finish_after(sizer, 0.01) == 500
+
+    def test_adapts_toward_target(self):
+        """Test slow commits shrink the batch and fast ones grow it"""
+        sizer = BatchSizer(1000, adaptive=True, target_seconds=1.0)
+        assert self.finish_after(sizer, 1.25) == 800
+        assert self.finish_after(sizer, 0.8) == 1000
+
+    def test_changes_are_bounded(self):
+        """Test one batch at most halves or doubles the size, within min and max"""
+        sizer = BatchSizer(1000, adaptive=True, minimum=300, maximum=3000)
+        assert self.finish_after(sizer, 100.0) == 500
+        assert self.finish_after(sizer, 100.0) == 300
+        assert self.finish_after(sizer, 0.001) == 600
+        assert self.finish_after(sizer, 0.001) == 1200
+        assert self.finish_after(sizer, 0.001) == 2400
+        assert self.finish_after(sizer, 0.001) == 3000
+
+    def test_unstarted_or_empty_batches_keep_the_size(self):
+        """Test a batch without timing or rows leaves the size alone"""
+        sizer = BatchSizer(1000, adaptive=True)
+        assert sizer.finish(100) == 1000
+        assert self.finish_after(sizer, 5.0, rows=0) == 1000
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Unit tests for vectorized CSV column normalization
+"""
+
+import pytest
+import pandas as pd
+from decimal import Decimal
+import sys
+import os
+
+# Add the scripts directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../scripts'))
+
+from csv_normalize import (
+    normalize_frame,
+    parse_date_column,
+    parse_days_held_column,
+    parse_money_column,
+    parse_percent_column,
+)
+
+class TestMoneyParsing:
+    """Test accounting-formatted money columns"""
+
+    def test_parse_money_column(self):
+        """Test dollars, dashes, parentheses and blanks"""
+        values = pd.Series(
+            [' $ 120.02 ', ' $ -   ', ' $ (9.21)', None, '$ 1,234.50', 'abc']
+        )
+        parsed = parse_money_column(values)
+        assert parsed.dtype == 'float64'
+        assert parsed[0] == 120.02
+        assert pd.isna(parsed[1])
+        assert parsed[2] == -9.21
+        assert pd.isna(parsed[3])
+        assert parsed[4] == 1234.50
+        assert pd.isna(parsed[5])
+
+    def test_parse_money_column_as_decimal(self):
+        """Test exact Decimal output with None for missing values"""
+        values = pd.Series([' $ 120.02 ', ' $ -   ', '(1.23)'])
+        parsed = parse_money_column(values, as_decimal=True)
+        assert parsed.tolist() == [Decimal('120.02'), None, Decimal('-1.23')]
+
+class TestOtherColumns:
+    """Test percent, date and days held columns"""
+
+    def test_parse_percent_column(self):
+        """Test percent values default to zero when blank"""
+        parsed = parse_percent_column(pd.Series(['11%', '-48%', None]))
+        assert parsed.tolist() == [11.0, -48.0, 0.0]
+
+    def test_parse_date_column(self):
+        """Test M/D/YYYY dates with invalid values as NaT"""
+        parsed = parse_date_column(pd.Series(['5/9/2025', None, 'bad']))
+        assert parsed[0] == pd.Timestamp(2025, 5, 9)
+        assert pd.isna(parsed[1])
+        assert pd.isna(parsed[2])
+
+    def test_parse_days_held_column(self):
+        """Test padded day counts with zero treated as missing"""
+        parsed = parse_days_held_column(pd.Series(['  52.00 ', '0', None]))
+        assert parsed[0] == 52
+        assert pd.isna(parsed[1])
+        assert pd.isna(parsed[2])
+
+class TestNormalizeFrame:
+    """Test whole-frame normalization"""
+
+    def test_normalize_frame(self):
+        """Test header renaming, trimming and typed columns"""
+        df = pd.DataFrame({
+            'Item Inventory #': ['1'],
+            ' Purchase Price ': [' $ 120.02 '],
+            'Brand': ['  '],
+            'Date Sold': ['5/9/2025'],
+        })
+        normalized = normalize_frame(df)
+        assert list(normalized.columns) == [
+            'item_number', 'purchase_price', 'brand', 'date_sold'
+        ]
+        assert normalized['purchase_price'][0] == 120.02
+        assert normalized['brand'][0] is None
+        assert normalized['date_sold'][0] == pd.Timestamp(2025, 5, 9)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
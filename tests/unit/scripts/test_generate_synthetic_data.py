@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the synthetic benchmark data generator
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add the scripts directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../scripts'))
+
+from csv_normalize import normalize_frame
+from generate_synthetic_data import HEADERS, format_money, generate_frame, scale_frame
+
+class TestFormatting:
+    """Test export-style value formatting"""
+
+    def test_format_money(self):
+        """Test positive, negative, zero and missing amounts"""
+        formatted = format_money(np.array([1234.5, -9.21, 0.0, np.nan]))
+        assert formatted == [' $ 1,234.50 ', ' $ (9.21)', ' $ -   ', None]
+
+class TestGenerateFrame:
+    """Test generated frames match the Platform Luxx export"""
+
+    def test_headers_and_row_count(self):
+        """Test the export headers and requested size"""
+        df = generate_frame(200, seed=1)
+        assert list(df.columns) == HEADERS
+        assert len(df) == 200
+        assert df['Item Inventory #'].is_unique
+
+    def test_round_trips_through_normalizer(self):
+        """Test generated values parse back into typed columns"""
+        normalized = normalize_frame(generate_frame(500, seed=1).astype(object))
+        assert normalized['purchase_price'].notna().all()
+
+        # Unsold rows leave every sale field blank
+        unsold = normalized['sell_price'].isna()
+        assert unsold.any() and not unsold.all()
+        assert normalized.loc[unsold, 'date_sold'].isna().all()
+        assert normalized.loc[~unsold, 'date_sold'].notna().all()
+
+    def test_seeded_output_is_repeatable(self):
+        """Test the same seed produces the same file"""
+        pd.testing.assert_frame_equal(
+            generate_frame(50, seed=7), generate_frame(50, seed=7)
+        )
+
+class TestScaleFrame:
+    """Test scaling up a real export"""
+
+    def test_repeats_rows_with_unique_item_numbers(self):
+        """Test rows cycle through the source and item numbers stay unique"""
+        source = generate_frame(3, seed=1).astype(str)
+        scaled = scale_frame(source, 7)
+        assert len(scaled) == 7
+        assert scaled['Item Inventory #'].is_unique
+        names = scaled['Brand + Product Name']
+        assert list(names[:3]) == list(names[3:6])
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Unit tests for surrogate key maps
+"""
+
+import pytest
+from unittest.mock import patch
+import sys
+import os
+
+# Add the scripts directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../scripts'))
+
+import key_maps
+from key_maps import ensure_key_map, fetch_key_map
+
+
+class FakeCursor:
+    """Cursor over one in-memory table of key -> id for the key map queries"""
+
+    def __init__(self, existing):
+        self.table = dict(existing)
+        self.queries = []
+        self.result = []
+
+    def execute(self, query, params=None):
+        self.queries.append((query, params))
+        if params is None:
+            self.result = list(self.table.items())
+        else:
+            wanted = params[0]
+            self.result = [
+                (key, id_) for key, id_ in self.table.items() if key in wanted
+            ]
+
+    def fetchall(self):
+        return self.result
+
+
+def fake_execute_values(cursor, query, rows, page_size=100, fetch=False):
+    """Insert rows keyed by their first column, skipping keys that exist"""
+    inserted = []
+    for row in rows:
+        if row[0] not in cursor.table:
+            cursor.table[row[0]] = f"id-{row[0]}"
+            inserted.append((row[0], cursor.table[row[0]]))
+    return inserted
+
+
+class TestKeyMaps:
+    """Test natural keys resolve to ids in a constant number of queries"""
+
+    def test_fetch_all_or_some_keys(self):
+        """Test an unrestricted fetch maps every row, a restricted one only the keys"""
+        cursor = FakeCursor({'Gucci': 'id-1', 'Prada': 'id-2'})
+        assert fetch_key_map(cursor, 'brands', 'name') == {
+            'Gucci': 'id-1', 'Prada': 'id-2'
+        }
+        assert fetch_key_map(cursor, 'brands', 'name', {'Prada'}) == {'Prada': 'id-2'}
+        query, params = cursor.queries[-1]
+        assert query == "SELECT name, id FROM brands WHERE name = ANY(%s)"
+        assert params == (['Prada'],)
+
+    def test_ensure_inserts_only_missing_keys(self):
+        """Test existing keys are fetched and only the missing rows are inserted"""
+        cursor = FakeCursor({'Gucci': 'id-1'})
+        rows = [('Gucci', 'Brand: Gucci'), ('Prada', 'Brand: Prada')]
+        with patch.object(
+            key_maps, 'execute_values', side_effect=fake_execute_values
+        ) as insert:
+            key_map, inserted = ensure_key_map(
+                cursor, 'brands', ['name', 'description'], rows, 'name'
+            )
+        assert key_map == {'Gucci': 'id-1', 'Prada': 'id-Prada'}
+        assert inserted == ['Prada']
+        assert insert.call_args[0][2] == [('Prada', 'Brand: Prada')]
+        assert 'ON CONFLICT (name) DO NOTHING' in insert.call_args[0][1]
+        assert len(cursor.queries) == 1
+
+    def test_ensure_with_every_key_present(self):
+        """Test nothing is inserted when every key already has an id"""
+        cursor = FakeCursor({'Gucci': 'id-1'})
+        with patch.object(key_maps, 'execute_values') as insert:
+            key_map, inserted = ensure_key_map(
+                cursor, 'brands', ['name', 'description'],
+                [('Gucci', 'Brand: Gucci')], 'name'
+            )
+        assert key_map == {'Gucci': 'id-1'}
+        assert inserted == []
+        insert.assert_not_called()
+
+    def test_key_column_need_not_be_first(self):
+        """Test the key is read from its position in columns"""
+        cursor = FakeCursor({'seller1': 'id-1'})
+        rows = [('seller', 'seller1'), ('seller', 'seller2')]
+        with patch.object(
+            key_maps, 'execute_values', return_value=[('seller2', 'id-2')]
+        ) as insert:
+            key_map, _ = ensure_key_map(
+                cursor, 'users', ['user_type', 'username'], rows, 'username'
+            )
+        assert key_map == {'seller1': 'id-1', 'seller2': 'id-2'}
+        assert insert.call_args[0][2] == [('seller', 'seller2')]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the API load test harness
+"""
+
+import pytest
+import asyncio
+import httpx
+import sys
+import os
+
+# Add the scripts directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../scripts'))
+
+import load_test
+from load_test import (
+    build_endpoints, compare_to_baseline, percentile, run_endpoint, summarize
+)
+
+class TestSummaries:
+    """Test latency percentiles and per-endpoint summaries"""
+
+    def test_percentile_nearest_rank(self):
+        """Test percentiles pick an observed value"""
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 99) == 99
+        assert percentile([7], 99) == 7
+        assert percentile([], 50) is None
+
+    def test_summarize(self):
+        """Test throughput and milliseconds"""
+        result = summarize(
+            "GET /api/sales", [0.010, 0.020, 0.030, 0.040], errors=1, seconds=2.0
+        )
+        assert result["requests"] == 5
+        assert result["rps"] == 2.0
+        assert result["p50_ms"] == 20.0
+        assert result["max_ms"] == 40.0
+
+class TestBaseline:
+    """Test regressions are detected against a saved run"""
+
+    def make_result(self, endpoint, p95, rps, errors=0):
+        return {"endpoint": endpoint, "p95_ms": p95, "rps": rps, "errors": errors}
+
+    def test_within_tolerance(self):
+        """Test small changes are not flagged"""
+        baseline = {"results": [self.make_result("GET /api/sales", 100.0, 50.0)]}
+        results = [self.make_result("GET /api/sales", 115.0, 45.0)]
+        assert compare_to_baseline(results, baseline) == []
+
+    def test_flags_latency_throughput_and_errors(self):
+        """Test slower, lower-throughput or failing endpoints are flagged"""
+        baseline = {"results": [self.make_result("GET /api/sales", 100.0, 50.0)]}
+        results = [self.make_result("GET /api/sales", 150.0, 30.0, errors=2)]
+        regressions = compare_to_baseline(results, baseline)
+        metrics = [metric for _, metric, _, _ in regressions]
+        assert metrics == ["p95_ms", "rps", "errors"]
+
+    def test_new_endpoints_are_ignored(self):
+        """Test endpoints missing from the baseline are not compared"""
+        results = [self.make_result("GET /api/new", 500.0, 1.0)]
+        assert compare_to_baseline(results, {"results": []}) == []
+
+class TestRunEndpoint:
+    """Test the concurrent request driver"""
+
+    def test_counts_requests_and_errors(self):
+        """Test every measured request is sent once and failures are counted"""
+        seen = []
+
+        def handler(request):
+            seen.append(request.url.path)
+            status = 500 if request.url.path.endswith("/13") else 200
+            return httpx.Response(status, json={})
+
+        async def run():
+            transport = httpx.MockTransport(handler)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://api"
+            ) as client:
+                endpoint = (
+                    "GET /api/products/{id}", "GET",
+                    lambda i: (f"/api/products/{i}", None)
+                )
+                return await run_endpoint(
+                    client, endpoint, requests=20, concurrency=4, warmup=5
+                )
+
+        result = asyncio.run(run())
+        assert len(seen) == 25
+        assert len(set(seen)) == 25
+        assert result["requests"] == 20
+        assert result["errors"] == 1
+
+    def test_every_api_route_is_covered(self):
+        """Test reads and writes are both driven when writes are requested"""
+        endpoints = build_endpoints(["p1"], run_id=1, include_writes=True)
+        names = [name for name, _, _ in endpoints]
+        assert "GET /api/analytics/summary" in names
+        assert "POST /api/sales/bulk" in names
+
+    def test_writes_are_opt_in(self):
+        """Test only GET routes run by default, and writes need a server of our own"""
+        read_only = [name for name, _, _ in build_endpoints(["p1"], run_id=1)]
+        assert all(name.startswith("GET") for name in read_only)
+        with pytest.raises(ValueError):
+            load_test.main(include_writes=True)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
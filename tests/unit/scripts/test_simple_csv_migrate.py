@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Unit tests for per-row savepoints in the simple CSV migration
+"""
+
+import pytest
+import sys
+import os
+
+# Add the scripts directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../scripts'))
+
+from simple_csv_migrate import execute_row
+
+
+class FakeCursor:
+    """Cursor that records statements and fails the ones containing 'bad'"""
+
+    def __init__(self):
+        self.statements = []
+        self.description = None
+
+    def execute(self, query, params=None):
+        self.statements.append(query)
+        self.description = ('id',) if 'RETURNING' in query else None
+        if 'bad' in query:
+            raise ValueError("row rejected")
+
+    def fetchone(self):
+        return ('new-id',)
+
+
+class TestExecuteRow:
+    """Test that each row runs in its own savepoint"""
+
+    def test_successful_row_is_released(self):
+        """Test the RETURNING row comes back and the savepoint is released"""
+        cursor = FakeCursor()
+        returned = execute_row(
+            cursor, "INSERT INTO brands VALUES (%s) RETURNING id", ('x',)
+        )
+        assert returned == ('new-id',)
+        assert cursor.statements[0] == "SAVEPOINT migrate_row"
+        assert cursor.statements[-1] == "RELEASE SAVEPOINT migrate_row"
+
+    def test_row_without_returning(self):
+        """Test statements without RETURNING return None"""
+        cursor = FakeCursor()
+        assert execute_row(cursor, "INSERT INTO sales VALUES (%s)", (1,)) is None
+
+    def test_failed_row_rolls_back_to_savepoint(self):
+        """Test a failing row is rolled back alone and the error is raised"""
+        cursor = FakeCursor()
+        with pytest.raises(ValueError):
+            execute_row(cursor, "INSERT INTO bad VALUES (%s)", (1,))
+        assert cursor.statements[-1] == "ROLLBACK TO SAVEPOINT migrate_row"
+        assert "RELEASE SAVEPOINT migrate_row" not in cursor.statements
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])